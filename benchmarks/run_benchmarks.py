@@ -0,0 +1,283 @@
+"""Benchmarks du chargement des données, de la zone habitable, des modèles et des pages Streamlit.
+
+Pour chaque taille de catalogue, un catalogue synthétique est généré dans un dossier
+temporaire, les données dérivées y sont construites par le pipeline, puis un processus
+dédié (pointé sur ce dossier par OUTER_PLANETS_DATA_DIR) chronomètre chaque étape.
+Les temps sont comparés à une référence enregistrée et les régressions sont signalées.
+
+Utilisation, depuis la racine du projet :
+
+    python benchmarks/run_benchmarks.py --save-baseline          # enregistre la référence
+    python benchmarks/run_benchmarks.py                          # compare à la référence
+    python benchmarks/run_benchmarks.py --scales 4575 --only hz_  # sous-ensemble rapide
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / 'src'))
+
+DEFAULT_SCALES = [4_575, 100_000, 1_000_000]
+DEFAULT_BASELINE = ROOT / 'benchmarks' / 'baseline.json'
+# Au-delà de ce ratio par rapport à la référence, un benchmark est signalé comme régression
+DEFAULT_THRESHOLD = 1.2
+
+BENCHMARKS = {}
+
+
+def benchmark(name, repeat=3):
+    """Enregistre une fonction `(data_dir) -> None` à chronométrer."""
+    def decorator(func):
+        BENCHMARKS[name] = (func, repeat)
+        return func
+    return decorator
+
+
+@benchmark('load_csv')
+def bench_load_csv(data_dir):
+    import pandas as pd
+
+    pd.read_csv(data_dir / 'all_exoplanets_with_goldilock_zone.csv')
+
+
+@benchmark('load_feather')
+def bench_load_feather(data_dir):
+    from outer_planets.columnar import columnar_path, read_columnar
+
+    read_columnar(columnar_path(data_dir / 'all_exoplanets_with_goldilock_zone.csv'))
+
+
+def _catalog():
+    from outer_planets.data import load_goldilock_zone
+
+    return load_goldilock_zone()
+
+
+@benchmark('hz_goldilock')
+def bench_hz_goldilock(data_dir):
+    # Modèle de goldilock.py
+    from outer_planets.habitable_zone import in_habitable_zone
+
+    in_habitable_zone(_catalog(), model='luminosity')
+
+
+@benchmark('hz_training')
+def bench_hz_training(data_dir):
+    # Modèle de training.py
+    from outer_planets.habitable_zone import in_habitable_zone
+
+    in_habitable_zone(_catalog(), model='teff')
+
+
+@benchmark('hz_monte_carlo', repeat=1)
+def bench_hz_monte_carlo(data_dir):
+    # 100 tirages par planète, sur un seul processus (débit par cœur)
+    from outer_planets.hz_uncertainty import hz_probability
+
+    hz_probability(_catalog(), n_samples=100, jobs=1)
+
+
+@benchmark('kepler_orbits')
+def bench_kepler_orbits(data_dir):
+    # 1000 planètes × 1000 instants, résolus en un seul tableau
+    import numpy as np
+
+    from outer_planets.orbits import orbit_positions, orbital_elements
+
+    elements = orbital_elements(_catalog().iloc[:1000])
+    orbit_positions(elements.semi_major_axis, elements.eccentricity, elements.period, np.linspace(0, 1e4, 1000))
+
+
+@benchmark('esi')
+def bench_esi(data_dir):
+    from outer_planets.habitability import earth_similarity
+
+    earth_similarity(_catalog())
+
+
+@benchmark('esi_top_k')
+def bench_esi_top_k(data_dir):
+    # Tableau des meilleures candidates de la page Goldilock Zone (classement construit au premier passage)
+    from outer_planets.habitability import habitability_ranking
+
+    ranking = habitability_ranking()
+    ranking.top(20, goldilock_only=True)
+    ranking.top(20, method='Transit')
+
+
+@benchmark('kmeans', repeat=1)
+def bench_kmeans(data_dir):
+    # Étape de clustering de la page Goldilock Zone
+    from sklearn.cluster import KMeans
+    from sklearn.preprocessing import StandardScaler
+
+    from outer_planets.pipeline import CLUSTER_FEATURES
+    from outer_planets.quality import complete_rows
+
+    data = _catalog()
+    features = data.loc[complete_rows(data, CLUSTER_FEATURES), CLUSTER_FEATURES]
+    KMeans(n_clusters=5, n_init=10, random_state=42).fit_predict(StandardScaler().fit_transform(features))
+
+
+_previous_clusters = {}
+
+
+@benchmark('kmeans_incremental')
+def bench_kmeans_incremental(data_dir):
+    # Mise à jour du clustering après l'ajout de 500 planètes (le clustering précédent est calculé au premier passage)
+    from outer_planets.clustering import fit_clusters, update_clusters
+    from outer_planets.pipeline import CLUSTER_FEATURES
+
+    data = _catalog()
+    if 'clusters' not in _previous_clusters:
+        _previous_clusters['clusters'] = fit_clusters(data.iloc[:-500], CLUSTER_FEATURES, 5)
+    update_clusters(_previous_clusters['clusters'], data, CLUSTER_FEATURES)
+
+
+@benchmark('logistic_regression', repeat=1)
+def bench_logistic_regression(data_dir):
+    # Modèle de classification de la page Goldilock Zone
+    from sklearn.linear_model import LogisticRegression
+
+    from outer_planets.pipeline import CLASSIFIER_FEATURES
+    from outer_planets.quality import complete_rows
+
+    data = _catalog()
+    data = data.loc[complete_rows(data, CLASSIFIER_FEATURES), CLASSIFIER_FEATURES + ['In Goldilock Zone']]
+    LogisticRegression().fit(data[CLASSIFIER_FEATURES], data['In Goldilock Zone'])
+
+
+@benchmark('random_forest', repeat=1)
+def bench_random_forest(data_dir):
+    # Modèle de training.py
+    from sklearn.ensemble import RandomForestClassifier
+
+    features = ['Orbit Semi-Major Axis', 'Stellar Effective Temperature', 'Insolation Flux']
+    data = _catalog()[features + ['In Goldilock Zone']].dropna()
+    RandomForestClassifier(n_estimators=100, random_state=42).fit(data[features], data['In Goldilock Zone'])
+
+
+def _page_benchmark(page):
+    def run(data_dir):
+        from streamlit.testing.v1 import AppTest
+
+        at = AppTest.from_file(str(page), default_timeout=600).run()
+        if at.exception:
+            raise RuntimeError(f"{page.name} : {at.exception[0].value}")
+    return run
+
+
+for _page in sorted((ROOT / 'src' / 'pages').glob('*.py')):
+    # Première exécution (chargement compris) puis réexécutions avec les caches du processus chauds
+    BENCHMARKS[f'page_{_page.name.split("_")[0]}'] = (_page_benchmark(_page), 3)
+
+
+def prepare_data_dir(data_dir, rows, seed=0):
+    """Génère un catalogue synthétique de `rows` planètes et ses données dérivées dans `data_dir`."""
+    data_dir.mkdir(parents=True, exist_ok=True)
+    shutil.copy(ROOT / 'data' / 'solar_system.csv', data_dir / 'solar_system.csv')
+    env = dict(os.environ, OUTER_PLANETS_DATA_DIR=str(data_dir), PYTHONPATH=str(ROOT / 'src'))
+    commands = [
+        ['outer_planets.synthetic', str(rows), str(data_dir / 'all_exoplanets_2021.csv'), '--seed', str(seed)],
+        ['outer_planets.pipeline'],
+        ['outer_planets.columnar'],
+    ]
+    for command in commands:
+        subprocess.run([sys.executable, '-m', *command], env=env, cwd=ROOT, check=True, stdout=subprocess.DEVNULL)
+
+
+def run_worker(data_dir, names):
+    """Chronomètre les benchmarks `names` dans ce processus, et retourne les temps en secondes."""
+    from outer_planets.data import use_copy_on_write
+
+    # Mêmes vues sans copie que dans les pages
+    use_copy_on_write()
+    results = {}
+    for name in names:
+        func, repeat = BENCHMARKS[name]
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func(data_dir)
+            timings.append(time.perf_counter() - start)
+        results[name] = {'first': timings[0], 'median': statistics.median(timings), 'runs': len(timings)}
+    return results
+
+
+def run_scale(rows, names, seed=0):
+    with tempfile.TemporaryDirectory(prefix=f'outer_planets_bench_{rows}_') as tmp:
+        data_dir = Path(tmp) / 'data'
+        prepare_data_dir(data_dir, rows, seed=seed)
+        env = dict(os.environ, OUTER_PLANETS_DATA_DIR=str(data_dir))
+        output = subprocess.run([sys.executable, __file__, '--worker', str(data_dir), '--only', *names],
+                                env=env, cwd=ROOT, check=True, capture_output=True, text=True).stdout
+        return json.loads(output.strip().splitlines()[-1])
+
+
+def compare(results, baseline, threshold):
+    """Lignes du rapport et liste des régressions par rapport à `baseline`."""
+    lines = [f"{'benchmark':<24}{'rows':>10}{'median (s)':>14}{'baseline (s)':>14}{'ratio':>8}"]
+    regressions = []
+    for scale, timings in results.items():
+        for name, timing in timings.items():
+            reference = baseline.get(scale, {}).get(name)
+            ratio = timing['median'] / reference['median'] if reference else None
+            flag = ''
+            if ratio is not None and ratio > threshold:
+                flag = '  REGRESSION'
+                regressions.append((name, scale, ratio))
+            lines.append(f"{name:<24}{scale:>10}{timing['median']:>14.4f}"
+                         f"{reference['median'] if reference else float('nan'):>14.4f}"
+                         f"{ratio if ratio is not None else float('nan'):>8.2f}{flag}")
+    return lines, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks Outer Planets, comparés à une référence.")
+    parser.add_argument('--scales', type=int, nargs='+', default=DEFAULT_SCALES, help="tailles de catalogue")
+    parser.add_argument('--only', nargs='+', default=[], help="préfixes des benchmarks à exécuter")
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help="enregistre les résultats comme référence")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument('--output', type=Path, help="fichier JSON où écrire les résultats")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--worker', type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    names = [name for name in BENCHMARKS if not args.only or name.startswith(tuple(args.only))]
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, names)))
+        return 0
+
+    results = {}
+    for rows in args.scales:
+        print(f"{rows} lignes...", file=sys.stderr)
+        results[str(rows)] = run_scale(rows, names, seed=args.seed)
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    lines, regressions = compare(results, baseline, args.threshold)
+    print('\n'.join(lines))
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    if args.save_baseline:
+        # Les nouvelles mesures remplacent la référence benchmark par benchmark
+        for scale, timings in results.items():
+            baseline.setdefault(scale, {}).update(timings)
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True))
+        print(f"Référence enregistrée dans {args.baseline}")
+    elif regressions:
+        print(f"{len(regressions)} régression(s) au-delà de x{args.threshold}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,19 +1,19 @@
-# Fonction pour calculer la zone habitable
-def is_in_goldilock_zone(row):
-    T_star = row['Stellar Effective Temperature']  # Température effective de l'étoile
-    R_star = row['Stellar Radius']  # Rayon stellaire
-    a_planet = row['Orbit Semi-Major Axis']  # Axe semi-major de l'orbite de la planète
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'src'))
+from outer_planets.habitable_zone import in_habitable_zone  # noqa: E402
+from outer_planets.hz_uncertainty import hz_probability  # noqa: E402
 
-    if pd.isna(T_star) or pd.isna(R_star) or pd.isna(a_planet):
-        return 0
 
-    # Calcul de la luminosité stellaire en unités solaires
-    T_sun = 5778  # Température effective du Soleil en Kelvin
-    L_star = (R_star**2) * ((T_star / T_sun)**4)
+# Fonction pour calculer la zone habitable
+def is_in_goldilock_zone(data):
+    # Calcul vectorisé sur tout le DataFrame : luminosité stellaire déduite du rayon et de la
+    # température, zone habitable entre 0.75 et 1.77 × √L, 0 si une valeur est manquante
+    return in_habitable_zone(data, model='luminosity')
 
-    # Calcul des distances de la zone habitable
-    inner_hz = np.sqrt(L_star) * 0.75
-    outer_hz = np.sqrt(L_star) * 1.77
 
-    # Vérification si la planète est dans la zone habitable
-    return 1 if inner_hz <= a_planet <= outer_hz else 0
+# Probabilité d'être dans la zone habitable, compte tenu des incertitudes sur l'étoile et l'orbite
+def goldilock_zone_probability(data, n_samples=10_000):
+    # Tirages Monte Carlo des entrées, calculés par blocs sur tous les cœurs
+    return hz_probability(data, n_samples, model='luminosity')
@@ -0,0 +1 @@
+"""Briques partagées par les pages Streamlit et les scripts du projet Outer Planets."""
@@ -0,0 +1,302 @@
+"""Mise à jour incrémentale du catalogue depuis une archive TAP (NASA Exoplanet Archive).
+
+Au lieu de retélécharger tout le catalogue, seules les planètes ajoutées ou modifiées
+depuis la dernière synchronisation (colonne `rowupdate` de la table `pscomppars`)
+sont demandées au service TAP synchrone, en CSV :
+
+- la période à couvrir est découpée en fenêtres de dates interrogées en parallèle
+  (asyncio, au plus `--concurrency` requêtes en cours) ;
+- une fenêtre dont la réponse atteint `--page-size` lignes est coupée en deux ; une
+  fenêtre d'un seul jour est lue par pages successives, triées par nom de planète ;
+- les erreurs réseau et les réponses 429/5xx sont réessayées avec un délai croissant.
+
+Les lignes reçues sont fusionnées dans `all_exoplanets_2021.csv` (une planète déjà
+connue garde son numéro `No.`, une nouvelle en reçoit un), puis le pipeline
+(`outer_planets.pipeline`) ne recalcule que les données dérivées touchées. La date de
+la dernière ligne reçue est gardée dans `data/archive_sync.json`.
+
+`--serve` lance une archive locale de remplacement (pour les essais, sans réseau) : elle
+sert un CSV aux colonnes de `pscomppars`, et sait répondre aux requêtes de ce client.
+Les tests (`python -m pytest tests`) la démarrent dans un thread avec `make_server`.
+
+Utilisation, depuis la racine du projet :
+
+    PYTHONPATH=src python -m outer_planets.archive [--endpoint URL] [--since 2021-01-01] [--concurrency 8]
+        [--page-size 2000] [--dry-run] [--no-pipeline]
+    PYTHONPATH=src python -m outer_planets.archive --serve archive.csv [--port 8765] [--fail-rate 0.2]
+"""
+import argparse
+import asyncio
+import datetime
+import io
+import json
+import random
+import re
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from outer_planets.data import DATA_DIR, EXOPLANETS_CSV
+
+DEFAULT_ENDPOINT = 'https://exoplanetarchive.ipac.caltech.edu/TAP/sync'
+TABLE = 'pscomppars'
+SYNC_STATE = DATA_DIR / 'archive_sync.json'
+# Date du catalogue figé, point de départ de la première synchronisation
+SNAPSHOT_DATE = datetime.date(2021, 1, 1)
+UPDATED = 'rowupdate'
+RETRIES = 4
+# Délai avant le premier réessai (s), doublé à chaque tentative
+BACKOFF = 0.5
+TIMEOUT = 60
+
+# Colonnes de `pscomppars` et colonnes correspondantes du catalogue local
+ARCHIVE_COLUMNS = {
+    'pl_name': 'Planet Name',
+    'hostname': 'Planet Host',
+    'sy_snum': 'Num Stars',
+    'sy_pnum': 'Num Planets',
+    'discoverymethod': 'Discovery Method',
+    'disc_year': 'Discovery Year',
+    'disc_facility': 'Discovery Facility',
+    'pl_orbper': 'Orbital Period Days',
+    'pl_orbsmax': 'Orbit Semi-Major Axis',
+    'pl_bmasse': 'Mass',
+    'pl_orbeccen': 'Eccentricity',
+    'pl_insol': 'Insolation Flux',
+    'pl_eqt': 'Equilibrium Temperature',
+    'st_spectype': 'Spectral Type',
+    'st_teff': 'Stellar Effective Temperature',
+    'st_rad': 'Stellar Radius',
+    'st_mass': 'Stellar Mass',
+    'st_met': 'Stellar Metallicity',
+    'st_metratio': 'Stellar Metallicity Ratio',
+    'st_logg': 'Stellar Surface Gravity',
+    'sy_dist': 'Distance',
+    'sy_gaiamag': 'Gaia Magnitude',
+}
+
+
+def _quote(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def delta_query(start, end, page_size, after=None):
+    """Requête ADQL des lignes mises à jour dans ]start, end], après la planète `after` si elle est donnée."""
+    conditions = [f'{UPDATED} > {_quote(start)}', f'{UPDATED} <= {_quote(end)}']
+    if after is not None:
+        conditions.append(f'pl_name > {_quote(after)}')
+    columns = ', '.join(list(ARCHIVE_COLUMNS) + [UPDATED])
+    return f"SELECT TOP {page_size} {columns} FROM {TABLE} WHERE {' AND '.join(conditions)} ORDER BY pl_name"
+
+
+def _get(url):
+    with urllib.request.urlopen(url, timeout=TIMEOUT) as response:
+        return response.read().decode()
+
+
+class ArchiveClient:
+    """Client asynchrone du service TAP : requêtes concurrentes bornées, réessais et découpage des fenêtres."""
+
+    def __init__(self, endpoint=DEFAULT_ENDPOINT, concurrency=8, page_size=2000, retries=RETRIES, backoff=BACKOFF):
+        self.endpoint = endpoint
+        self.concurrency = concurrency
+        self.page_size = page_size
+        self.retries = retries
+        self.backoff = backoff
+        self.requests = 0
+        self._semaphore = None
+
+    async def query(self, adql):
+        """Résultat CSV de la requête `adql`, en DataFrame."""
+        url = f"{self.endpoint}?{urllib.parse.urlencode({'query': adql, 'format': 'csv'})}"
+        for attempt in range(self.retries + 1):
+            try:
+                async with self._semaphore:
+                    self.requests += 1
+                    text = await asyncio.to_thread(_get, url)
+                return pd.read_csv(io.StringIO(text), dtype={'pl_name': str, UPDATED: str})
+            except urllib.error.HTTPError as error:
+                if error.code != 429 and error.code < 500 or attempt == self.retries:
+                    raise
+            except (urllib.error.URLError, TimeoutError, ConnectionError):
+                if attempt == self.retries:
+                    raise
+            # Délai croissant, avec une part aléatoire pour ne pas relancer toutes les requêtes ensemble
+            await asyncio.sleep(self.backoff * 2 ** attempt * (1 + random.random()))
+
+    async def _window(self, start, end, after=None):
+        page = await self.query(delta_query(start, end, self.page_size, after))
+        if len(page) < self.page_size:
+            return [page]
+        if after is None and (end - start).days > 1:
+            middle = start + (end - start) / 2
+            halves = await asyncio.gather(self._window(start, middle), self._window(middle, end))
+            return halves[0] + halves[1]
+        return [page] + await self._window(start, end, after=page['pl_name'].iloc[-1])
+
+    async def fetch_delta(self, since, until):
+        """Lignes de l'archive mises à jour dans ]since, until], une par planète (la plus récente)."""
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        span = max((until - since).days, 1)
+        n_windows = min(self.concurrency, span)
+        bounds = [since + datetime.timedelta(days=span * i // n_windows) for i in range(n_windows)] + [until]
+        windows = await asyncio.gather(*(self._window(start, end) for start, end in zip(bounds, bounds[1:])))
+        pages = [page for window in windows for page in window if len(page)]
+        delta = pd.concat(pages, ignore_index=True) if pages else pd.DataFrame(columns=list(ARCHIVE_COLUMNS) + [UPDATED])
+        return delta.sort_values(UPDATED, kind='stable').drop_duplicates('pl_name', keep='last')
+
+
+def merge_delta(catalog, delta):
+    """Texte du CSV `catalog` avec les lignes de `delta` (colonnes de l'archive), et nombres de planètes ajoutées et
+    mises à jour.
+
+    Les lignes des planètes mises à jour sont remplacées sur place et les nouvelles ajoutées à la fin : les autres
+    lignes restent identiques, octet pour octet.
+    """
+    local = pd.read_csv(catalog, usecols=['No.', 'Planet Name'])
+    lines = Path(catalog).read_text().splitlines(keepends=True)
+    header = pd.read_csv(catalog, nrows=0).columns
+
+    rows = delta.rename(columns=ARCHIVE_COLUMNS)[list(ARCHIVE_COLUMNS.values())]
+    known = pd.Index(local['Planet Name']).get_indexer(rows['Planet Name'])
+    new = known < 0
+    numbers = local['No.'].to_numpy()[known]
+    numbers[new] = local['No.'].max() + 1 + np.arange(new.sum())
+    rows.insert(0, 'No.', numbers)
+    formatted = rows[header].to_csv(index=False, header=False).splitlines(keepends=True)
+    for position, line in zip(known[~new], np.asarray(formatted, dtype=object)[~new]):
+        # Ligne 0 : l'en-tête
+        lines[position + 1] = line
+    if lines and not lines[-1].endswith('\n'):
+        lines[-1] += '\n'
+    lines.extend(np.asarray(formatted, dtype=object)[new])
+    return ''.join(lines), int(new.sum()), int((~new).sum())
+
+
+def load_state(path=SYNC_STATE):
+    return json.loads(path.read_text()) if path.exists() else {}
+
+
+def save_state(state, path=SYNC_STATE):
+    tmp_path = path.with_suffix('.tmp')
+    tmp_path.write_text(json.dumps(state, indent=2))
+    tmp_path.replace(path)
+
+
+def refresh(endpoint=DEFAULT_ENDPOINT, since=None, concurrency=8, page_size=2000, dry_run=False, run_pipeline=True,
+            catalog=EXOPLANETS_CSV):
+    """Synchronise le catalogue local avec l'archive ; retourne un résumé de la synchronisation."""
+    state = load_state()
+    if since is None:
+        # Le jour de la dernière ligne reçue est relu : d'autres lignes ont pu être mises à jour ce jour-là depuis
+        last_update = state.get('last_update')
+        since = datetime.date.fromisoformat(last_update) - datetime.timedelta(days=1) if last_update else SNAPSHOT_DATE
+    until = datetime.date.today() + datetime.timedelta(days=1)
+    client = ArchiveClient(endpoint, concurrency, page_size)
+    start = time.perf_counter()
+    delta = asyncio.run(client.fetch_delta(since, until))
+    summary = {'since': since.isoformat(), 'rows': len(delta), 'requests': client.requests,
+               'seconds': time.perf_counter() - start, 'added': 0, 'updated': 0, 'pipeline': {}}
+    if dry_run or delta.empty:
+        return summary
+
+    content, summary['added'], summary['updated'] = merge_delta(catalog, delta)
+    # Fichier inchangé (lignes relues identiques) : pas de réécriture, les données dérivées restent à jour
+    if content != Path(catalog).read_text():
+        tmp_path = Path(catalog).with_suffix('.tmp')
+        tmp_path.write_text(content)
+        tmp_path.replace(catalog)
+    # La date de la dernière ligne reçue : la prochaine synchronisation repart de là
+    save_state({'endpoint': endpoint, 'last_update': delta[UPDATED].str[:10].max(),
+                'synced_at': datetime.datetime.now().isoformat(timespec='seconds')})
+    if run_pipeline:
+        from outer_planets.pipeline import run
+
+        summary['pipeline'] = run()
+    return summary
+
+
+# Archive locale de remplacement
+
+_CONDITION = re.compile(r"(\w+) (>|<=) '((?:[^']|'')*)'")
+
+
+def _answer(archive, query):
+    """Réponse d'une archive (DataFrame aux colonnes de `pscomppars`) à une requête de `delta_query`."""
+    top = int(re.search(r'TOP (\d+)', query).group(1))
+    rows = archive
+    for column, operator, value in _CONDITION.findall(query):
+        value = value.replace("''", "'")
+        rows = rows[rows[column] > value] if operator == '>' else rows[rows[column] <= value]
+    return rows.sort_values('pl_name').head(top)
+
+
+def make_server(archive, port=8765, fail_rate=0.0):
+    """Serveur HTTP (non démarré) de l'archive `archive` (DataFrame aux colonnes de `pscomppars`) ; `port=0` choisit
+    un port libre. Les requêtes reçues et les échecs simulés sont comptés dans `queries` et `failures`."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if random.random() < fail_rate:
+                self.server.failures += 1
+                self.send_error(503, "Échec simulé")
+                return
+            query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)['query'][0]
+            self.server.queries.append(query)
+            body = _answer(archive, query).to_csv(index=False).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/csv')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('localhost', port), Handler)
+    server.queries = []
+    server.failures = 0
+    return server
+
+
+def serve(archive_csv, port=8765, fail_rate=0.0):
+    """Sert `archive_csv` comme un service TAP synchrone sur `http://localhost:<port>/TAP/sync`."""
+    archive = pd.read_csv(archive_csv, dtype={'pl_name': str, UPDATED: str})
+    server = make_server(archive, port, fail_rate)
+    print(f"Archive locale sur http://localhost:{port}/TAP/sync ({len(archive)} planètes)")
+    server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Met à jour le catalogue depuis une archive TAP (lignes modifiées).")
+    parser.add_argument('--endpoint', default=DEFAULT_ENDPOINT, help="URL du service TAP synchrone")
+    parser.add_argument('--since', type=datetime.date.fromisoformat,
+                        help="date de départ (par défaut : dernière synchronisation)")
+    parser.add_argument('--concurrency', type=int, default=8, help="nombre maximal de requêtes simultanées")
+    parser.add_argument('--page-size', type=int, default=2000, help="nombre maximal de lignes par requête")
+    parser.add_argument('--dry-run', action='store_true', help="compte les lignes à récupérer sans rien écrire")
+    parser.add_argument('--no-pipeline', action='store_true', help="ne recalcule pas les données dérivées")
+    parser.add_argument('--serve', type=Path, help="lance une archive locale servant ce CSV")
+    parser.add_argument('--port', type=int, default=8765, help="port de l'archive locale")
+    parser.add_argument('--fail-rate', type=float, default=0.0, help="part de requêtes en échec de l'archive locale")
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        serve(args.serve, args.port, args.fail_rate)
+        return
+    summary = refresh(args.endpoint, args.since, args.concurrency, args.page_size, args.dry_run,
+                      run_pipeline=not args.no_pipeline)
+    print(f"{summary['rows']} planètes modifiées depuis le {summary['since']} ({summary['requests']} requêtes, "
+          f"{summary['seconds']:.2f} s) : {summary['added']} ajoutées, {summary['updated']} mises à jour")
+    for name, stage_status in summary['pipeline'].items():
+        print(f"{name}: {stage_status}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+"""Clustering des exoplanètes, complet ou incrémental.
+
+Un clustering complet normalise les caractéristiques et entraîne un K-means sur toutes
+les planètes ; le nombre de clusters peut être choisi automatiquement (score de silhouette
+calculé pour chaque k en parallèle, sur un échantillon).
+
+Un clustering incrémental repart d'un clustering précédent : la normalisation est
+conservée, les planètes déjà connues (par nom) gardent leur cluster, les centroïdes
+sont affinés par mini-lots sur les nouvelles planètes seulement (moyenne pondérée par
+l'effectif déjà affecté à chaque cluster, qui est conservé dans l'artefact) et les
+nouvelles planètes sont affectées au centroïde le plus proche. Le déplacement maximal
+des centroïdes et la part des planètes connues qu'ils affecteraient ailleurs sont
+retournés pour contrôle. Une mise à jour de quelques centaines de planètes ne
+réentraîne donc pas tout le catalogue et ne renumérote pas les clusters existants.
+
+Les labels sont enregistrés dans l'ordre des lignes du catalogue d'entraînement, avec
+les noms des planètes (`cluster_keys`) : `align_labels` les retrouve par nom pour un
+catalogue lu dans un autre ordre.
+"""
+import copy
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from outer_planets.quality import complete_rows
+
+KEY = 'Planet Name'
+K_RANGE = range(2, 11)
+SILHOUETTE_SAMPLE = 10_000
+BATCH_SIZE = 1024
+
+
+def cluster_mask(data, features):
+    """Lignes dont toutes les caractéristiques de clustering sont renseignées (bit de qualité du catalogue)."""
+    return complete_rows(data, features)
+
+
+# Matrice normalisée d'un processus du choix de k, envoyée une fois par le pool
+_worker_data = {}
+
+
+def _init_worker(X):
+    _worker_data['X'] = X
+
+
+def _silhouette(k, random_state):
+    from sklearn.cluster import KMeans
+    from sklearn.metrics import silhouette_score
+
+    X = _worker_data['X']
+    labels = KMeans(n_clusters=k, n_init=3, random_state=random_state).fit_predict(X)
+    return float(silhouette_score(X, labels, sample_size=min(len(X), SILHOUETTE_SAMPLE), random_state=random_state))
+
+
+def choose_k(X, k_values=K_RANGE, random_state=42, jobs=None):
+    """Nombre de clusters au meilleur score de silhouette, et les scores de chaque k (un processus par k)."""
+    k_values = [k for k in k_values if k < len(X)]
+    with ProcessPoolExecutor(max_workers=jobs or os.cpu_count(), initializer=_init_worker, initargs=(X,)) as pool:
+        scores = dict(zip(k_values, pool.map(_silhouette, k_values, [random_state] * len(k_values))))
+    return max(scores, key=scores.get), scores
+
+
+def fit_clusters(data, features, n_clusters, random_state=42, jobs=None):
+    """Clustering complet de `data` ; `n_clusters='auto'` choisit k par score de silhouette."""
+    from sklearn.cluster import KMeans
+    from sklearn.preprocessing import StandardScaler
+
+    clustered = cluster_mask(data, features)
+    scaler = StandardScaler()
+    scaled_features = scaler.fit_transform(data.loc[clustered, features])
+    k_scores = None
+    if n_clusters == 'auto':
+        n_clusters, k_scores = choose_k(scaled_features, random_state=random_state, jobs=jobs)
+    kmeans = KMeans(n_clusters=n_clusters, n_init=10, random_state=random_state)
+    labels = np.full(len(data), -1, dtype=np.int8)
+    labels[clustered] = kmeans.fit_predict(scaled_features)
+    return {
+        'scaler': scaler,
+        'kmeans': kmeans,
+        'n_clusters': n_clusters,
+        'k_scores': k_scores,
+        'cluster_labels': labels,
+        'cluster_keys': data[KEY].to_numpy(),
+        'cluster_counts': np.bincount(labels[clustered], minlength=n_clusters),
+    }
+
+
+def _occurrences(names):
+    # Nom et rang parmi les homonymes : identifie chaque ligne même quand un nom est en double
+    names = pd.Series(names, dtype=object).fillna('')
+    return pd.MultiIndex.from_arrays([names, names.groupby(names, sort=False).cumcount()])
+
+
+def align_labels(artifact, data):
+    """Clusters de l'artefact `artifact` pour les lignes de `data`, retrouvés par nom de planète (-1 pour une planète
+    non clusterisée ou absente de l'artefact).
+
+    Les labels sont rangés dans l'ordre du catalogue d'entraînement (`cluster_keys`) : ils ne sont repris tels
+    quels que si `data` est dans le même ordre.
+    """
+    labels, keys = artifact['cluster_labels'], artifact['cluster_keys']
+    names = data[KEY].to_numpy(dtype=object)
+    if len(names) == len(keys) and pd.Index(names).equals(pd.Index(keys)):
+        return labels
+    positions = _occurrences(keys).get_indexer(_occurrences(names))
+    return np.where(positions >= 0, labels[positions], -1).astype(labels.dtype)
+
+
+def update_clusters(previous, data, features, random_state=42, batch_size=BATCH_SIZE):
+    """Clustering de `data` repris de `previous` : seules les planètes nouvelles (ou nouvellement complètes) sont traitées.
+
+    Chaque centroïde est la moyenne de toutes les planètes qui lui ont été affectées : un lot de nouvelles planètes
+    le déplace en proportion de leur nombre face à l'effectif déjà affecté, au lieu de le remplacer.
+    """
+    clustered = cluster_mask(data, features)
+    labels = np.full(len(data), -1, dtype=np.int8)
+
+    # Clusters déjà connus, retrouvés par nom de planète
+    known = pd.Series(previous['cluster_labels'], index=previous['cluster_keys'])
+    known = known[(known >= 0) & ~known.index.duplicated()]
+    positions = known.index.get_indexer(data[KEY])
+    found = clustered & (positions >= 0)
+    labels[found] = known.to_numpy()[positions[found]]
+
+    kmeans = previous['kmeans']
+    counts = previous.get('cluster_counts')
+    if counts is None:
+        # Artefact antérieur aux effectifs enregistrés : ceux de ses affectations
+        counts = np.bincount(previous['cluster_labels'][previous['cluster_labels'] >= 0],
+                             minlength=previous['n_clusters'])
+    counts = np.asarray(counts, dtype=np.int64).copy()
+    new_rows = np.flatnonzero(clustered & ~found)
+    centroid_shift = relabelled = 0.0
+    if len(new_rows):
+        new_features = previous['scaler'].transform(data.iloc[new_rows][features])
+        kmeans = copy.deepcopy(kmeans)
+        centers = kmeans.cluster_centers_.astype(np.float64)
+        previous_centers = centers.copy()
+        for start in range(0, len(new_features), batch_size):
+            batch = new_features[start:start + batch_size]
+            batch_labels = kmeans.predict(batch)
+            # Moyenne pondérée : effectif déjà affecté × ancien centroïde + somme des nouvelles planètes
+            sums = np.zeros_like(centers)
+            np.add.at(sums, batch_labels, batch)
+            batch_counts = np.bincount(batch_labels, minlength=len(centers))
+            touched = batch_counts > 0
+            centers[touched] = ((centers[touched] * counts[touched, None] + sums[touched])
+                                / (counts[touched] + batch_counts[touched])[:, None])
+            counts += batch_counts
+            kmeans.cluster_centers_ = centers.astype(kmeans.cluster_centers_.dtype)
+        labels[new_rows] = kmeans.predict(new_features)
+        centroid_shift = float(np.linalg.norm(centers - previous_centers, axis=1).max())
+        # Contrôle : part des planètes déjà connues qu'un clustering avec les nouveaux centroïdes affecterait ailleurs
+        if found.any():
+            known_features = previous['scaler'].transform(data.loc[found, features])
+            relabelled = float((kmeans.predict(known_features) != labels[found]).mean())
+    return dict(previous, kmeans=kmeans, cluster_labels=labels, cluster_keys=data[KEY].to_numpy(),
+                cluster_counts=counts, new_planets=len(new_rows), centroid_shift=centroid_shift,
+                relabelled=relabelled)
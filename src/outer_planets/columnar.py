@@ -0,0 +1,87 @@
+"""Conversion des CSV du dossier `data/` en fichiers Feather (Arrow) colonnaires.
+
+Les colonnes sont stockées avec des types serrés (catégories pour les colonnes
+textuelles répétitives, entiers courts pour les compteurs et l'année de découverte)
+et sans compression, ce qui permet de les relire par memory-map au lieu de
+re-parser le CSV.
+
+Utilisation, depuis la racine du projet :
+
+    PYTHONPATH=src python -m outer_planets.columnar
+"""
+import argparse
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.feather as feather
+
+from outer_planets.data import DATA_DIR
+
+COLUMNAR_DIR = DATA_DIR / 'columnar'
+
+# CSV convertis par défaut : le catalogue brut et ses variantes dérivées
+SOURCES = [
+    'all_exoplanets_2021.csv',
+    'all_exoplanets_with_solar_system.csv',
+    'all_exoplanets_with_goldilock_zone.csv',
+    'solar_system.csv',
+]
+
+CATEGORY_COLUMNS = ['Planet Host', 'Discovery Method', 'Discovery Facility', 'Spectral Type',
+                    'Stellar Metallicity Ratio']
+INTEGER_COLUMNS = {'No.': 'int32', 'Num Stars': 'int8', 'Num Planets': 'int8', 'Discovery Year': 'int16',
+                   'In Goldilock Zone': 'int8', 'Quality': 'uint16'}
+TEXT_COLUMNS = ['Planet Name'] + CATEGORY_COLUMNS
+
+
+def columnar_path(csv_path):
+    """Chemin du fichier Feather correspondant à un CSV de `data/`."""
+    return COLUMNAR_DIR / (Path(csv_path).stem + '.feather')
+
+
+def compact_dtypes(df):
+    """Retourne `df` avec les types serrés du format colonnaire."""
+    df = df.copy()
+    for column in CATEGORY_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    for column, dtype in INTEGER_COLUMNS.items():
+        if column in df.columns:
+            # Les entiers numpy n'acceptent pas les valeurs manquantes : type nullable dans ce cas
+            df[column] = df[column].astype(dtype if df[column].notna().all() else dtype.capitalize())
+    # Quelques valeurs saisies à la main sont mal formées (ex. '-26.74.0') : elles deviennent NaN
+    for column in df.columns.difference(TEXT_COLUMNS):
+        if df[column].dtype == object:
+            df[column] = pd.to_numeric(df[column], errors='coerce')
+    return df
+
+
+def convert(csv_path, out_path=None):
+    """Convertit un CSV en fichier Feather non compressé et retourne le chemin écrit."""
+    out_path = Path(out_path) if out_path is not None else columnar_path(csv_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    df = compact_dtypes(pd.read_csv(csv_path))
+    # Écriture dans un fichier temporaire puis renommage : un lecteur ne voit jamais de fichier partiel
+    tmp_path = out_path.with_suffix('.tmp')
+    feather.write_feather(df, tmp_path, compression='uncompressed')
+    tmp_path.replace(out_path)
+    return out_path
+
+
+def read_columnar(path, columns=None):
+    """Lit un fichier Feather par memory-map."""
+    return feather.read_table(path, columns=columns, memory_map=True).to_pandas()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Construit les fichiers Feather à partir des CSV de data/.")
+    parser.add_argument('csv', nargs='*', help="CSV à convertir (par défaut : les jeux de données du projet)")
+    args = parser.parse_args(argv)
+
+    for csv_path in args.csv or [DATA_DIR / name for name in SOURCES]:
+        out_path = convert(csv_path)
+        print(f"{csv_path} -> {out_path} ({out_path.stat().st_size / 1024:.0f} Ko)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""Accès aux jeux de données, partagé par toutes les pages.
+
+Chaque fichier n'est lu qu'une fois par processus : le DataFrame parsé est gardé
+en mémoire, indexé par chemin et date de modification, et les pages reçoivent une
+vue en lecture seule (copie superficielle, Copy-on-Write) au lieu de relire le CSV
+à chaque interaction.
+
+Copy-on-Write est une option globale de pandas : l'importer ne l'active pas. Les pages
+l'activent pour leur processus (`use_copy_on_write`, appelée par
+`instrumentation.start_rerun`) ; ailleurs (training.py, scripts), `load_dataset`
+retourne une copie complète, que l'appelant peut modifier sans toucher au cache.
+
+Si le jeu de données a été publié en mémoire partagée (`python -m outer_planets.shared`),
+c'est cette version, partagée par tous les processus de la machine, qui est lue.
+"""
+import os
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+# Dossier des données, remplaçable (ex. par les benchmarks) avec la variable d'environnement OUTER_PLANETS_DATA_DIR
+DATA_DIR = Path(os.environ.get('OUTER_PLANETS_DATA_DIR') or Path(__file__).resolve().parents[2] / 'data').resolve()
+
+EXOPLANETS_CSV = DATA_DIR / 'all_exoplanets_2021.csv'
+GOLDILOCK_ZONE_CSV = DATA_DIR / 'all_exoplanets_with_goldilock_zone.csv'
+SOLAR_SYSTEM_CSV = DATA_DIR / 'solar_system.csv'
+
+_cache = {}
+_lock = threading.Lock()
+
+
+def use_copy_on_write():
+    """Active Copy-on-Write pour tout le processus : les vues de `load_dataset` partagent alors la mémoire du
+    cache, et toute écriture dans une vue copie la colonne concernée au lieu de modifier le cache."""
+    pd.set_option('mode.copy_on_write', True)
+
+
+def resolve_source(path):
+    """Fichier réellement lu pour `path` : le pointeur de sa version partagée ou sa version Feather si elles sont à
+    jour, sinon le CSV."""
+    from outer_planets.columnar import columnar_path
+    from outer_planets.shared import pointer_path
+
+    path = Path(path)
+    shared_pointer = pointer_path(path)
+    if shared_pointer.exists() and shared_pointer.stat().st_mtime_ns >= path.stat().st_mtime_ns:
+        return shared_pointer
+    feather_path = columnar_path(path)
+    if feather_path.exists() and feather_path.stat().st_mtime_ns >= path.stat().st_mtime_ns:
+        return feather_path
+    return path
+
+
+def _read(path):
+    from outer_planets.columnar import read_columnar
+    from outer_planets.shared import POINTER, attach
+
+    if path.name == POINTER:
+        return attach(path)
+    if path.suffix == '.feather':
+        return read_columnar(path)
+    return pd.read_csv(path)
+
+
+def dataset_version(path):
+    """Version courante d'un jeu de données : fichier réellement lu et date de modification."""
+    source = resolve_source(Path(path).resolve())
+    return source, source.stat().st_mtime_ns
+
+
+def load_dataset(path):
+    """Retourne une vue en lecture seule du fichier `path` (une copie sans Copy-on-Write), parsé une seule fois par
+    processus.
+
+    Si `python -m outer_planets.columnar` a produit une version Feather à jour du CSV,
+    c'est elle qui est lue.
+    """
+    path = Path(path).resolve()
+    key = dataset_version(path)
+    with _lock:
+        entry = _cache.get(path)
+        if entry is None or entry[0] != key:
+            # Fichier jamais lu ou modifié depuis : on (re)parse et on remplace l'entrée
+            entry = (key, _read(key[0]))
+            _cache[path] = entry
+    if pd.options.mode.copy_on_write is True:
+        return entry[1].copy(deep=False)
+    # Sans Copy-on-Write, une écriture dans une vue superficielle modifierait le cache
+    return entry[1].copy()
+
+
+def load_exoplanets():
+    return load_dataset(EXOPLANETS_CSV)
+
+
+def load_goldilock_zone():
+    return load_dataset(GOLDILOCK_ZONE_CSV)
+
+
+def load_solar_system():
+    return load_dataset(SOLAR_SYSTEM_CSV)
+
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
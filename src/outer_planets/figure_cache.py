@@ -0,0 +1,199 @@
+"""Cache sur disque des figures Plotly des pages, en JSON.
+
+Une figure est identifiée par sa page, l'état des filtres qui la produit (système,
+case à cocher, curseurs, zone sélectionnée...) et le hash du contenu du jeu de
+données ; celles qui montrent un modèle ajoutent la clé de son artefact à leur état.
+Elle est partagée entre sessions, entre processus et entre redémarrages.
+Au lieu de reconstruire la figure (la validation de Plotly coûte plus que le calcul
+des données), une figure en cache est relue telle quelle, sans revalidation.
+
+Le cache est borné en taille (`MAX_BYTES`) : au-delà, les figures les moins
+récemment lues sont supprimées (LRU sur la date de modification, mise à jour à
+chaque lecture). Les fichiers sont écrits de façon atomique.
+
+`--warm` précalcule au déploiement les vues « Tous les systèmes » et celles des
+`--top` systèmes qui ont le plus de planètes, avec et sans le filtre de zone
+habitable, ainsi que les figures de la page Goldilock Zone sans sélection.
+
+Utilisation, depuis la racine du projet :
+
+    PYTHONPATH=src python -m outer_planets.figure_cache --warm [--top 20]
+    PYTHONPATH=src python -m outer_planets.figure_cache --clear
+"""
+import argparse
+import dataclasses
+import functools
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import plotly.graph_objects as go
+
+from outer_planets.data import DATA_DIR, GOLDILOCK_ZONE_CSV
+from outer_planets.pipeline import file_hash
+
+FIGURE_CACHE_DIR = DATA_DIR / 'figures'
+MAX_BYTES = 64 * 1024 * 1024
+# À incrémenter quand la construction d'une figure change, pour ignorer les figures déjà en cache
+CACHE_VERSION = 2
+
+
+@functools.lru_cache(maxsize=8)
+def _content_hash(path, mtime_ns):
+    return file_hash(path)
+
+
+def content_hash(path):
+    """Hash du contenu du fichier `path`, calculé une fois par date de modification."""
+    path = Path(path).resolve()
+    return _content_hash(path, path.stat().st_mtime_ns)
+
+
+def _jsonable(value):
+    if dataclasses.is_dataclass(value):
+        return dataclasses.asdict(value)
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"valeur non sérialisable dans une clé de figure : {value!r}")
+
+
+class FigureCache:
+    """Figures sérialisées en JSON dans `directory`, au plus `max_bytes` au total."""
+
+    def __init__(self, directory=FIGURE_CACHE_DIR, max_bytes=MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = self.misses = 0
+        # Taille totale estimée ; recalculée depuis le dossier (partagé entre processus) avant toute éviction
+        self._size = None
+        self._lock = threading.Lock()
+
+    def key(self, page, state, dataset):
+        payload = json.dumps([CACHE_VERSION, page, state, dataset], default=_jsonable, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, key):
+        return self.directory / f'{key}.json'
+
+    def get(self, key):
+        """Figure enregistrée sous `key`, ou None."""
+        path = self._path(key)
+        try:
+            content = path.read_bytes()
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        # Figure produite par Plotly lui-même : la revalider propriété par propriété serait du temps perdu
+        return go.Figure(json.loads(content), _validate=False)
+
+    def put(self, key, fig):
+        content = fig.to_json().encode()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=self.directory, suffix='.tmp', delete=False) as f:
+            f.write(content)
+        os.replace(f.name, self._path(key))
+        with self._lock:
+            if self._size is not None:
+                self._size += len(content)
+            if self._size is None or self._size > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.json'):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        return entries
+
+    def _evict(self):
+        entries = sorted(self._entries())
+        size = sum(entry_size for _, entry_size, _ in entries)
+        for _, entry_size, path in entries:
+            if size <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            size -= entry_size
+        self._size = size
+
+    def clear(self):
+        with self._lock:
+            if self.directory.exists():
+                for _, _, path in self._entries():
+                    os.remove(path)
+            self._size = 0
+
+    def stats(self):
+        entries = self._entries() if self.directory.exists() else []
+        return {'figures': len(entries), 'bytes': sum(entry_size for _, entry_size, _ in entries),
+                'hits': self.hits, 'misses': self.misses}
+
+
+_default_cache = FigureCache()
+
+
+def cached_figure(page, state, build, path=GOLDILOCK_ZONE_CSV, cache=None):
+    """Figure de `page` pour l'état `state` (valeurs JSON ou dataclasses), relue du cache ou construite par
+    `build()` et enregistrée."""
+    cache = cache or _default_cache
+    key = cache.key(page, state, content_hash(path))
+    fig = cache.get(key)
+    if fig is None:
+        fig = build()
+        cache.put(key, fig)
+    return fig
+
+
+def warm(top=20, path=GOLDILOCK_ZONE_CSV, cache=None):
+    """Précalcule les vues les plus consultées ; retourne le nombre de figures vues."""
+    from outer_planets.filters import FilterSpec
+    from outer_planets.host_index import ALL_SYSTEMS, host_index
+    from outer_planets.page_figures import HOST_FIGURES, goldilock_zone_figures
+
+    summary = host_index(path).summary
+    hosts = [ALL_SYSTEMS] + summary.sort_values('Planets', ascending=False, kind='stable').index[:top].tolist()
+    count = 0
+    for host in hosts:
+        for goldilock_only in (False, True):
+            spec = FilterSpec(host=host, goldilock_only=goldilock_only)
+            for figure in HOST_FIGURES.values():
+                figure(spec, path=path, cache=cache)
+                count += 1
+    count += len(goldilock_zone_figures(path=path, cache=cache))
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cache des figures des pages.")
+    parser.add_argument('--warm', action='store_true', help="précalcule les vues les plus consultées")
+    parser.add_argument('--top', type=int, default=20, help="nombre de systèmes précalculés, en plus de tous")
+    parser.add_argument('--clear', action='store_true', help="vide le cache")
+    parser.add_argument('--max-mb', type=float, default=MAX_BYTES / 2 ** 20, help="taille maximale du cache (Mo)")
+    args = parser.parse_args(argv)
+
+    cache = FigureCache(max_bytes=int(args.max_mb * 2 ** 20))
+    if args.clear:
+        cache.clear()
+    if args.warm:
+        start = time.perf_counter()
+        count = warm(args.top, cache=cache)
+        print(f"{count} figures ({cache.misses} construites) en {time.perf_counter() - start:.2f} s")
+    stats = cache.stats()
+    print(f"{stats['figures']} figures en cache ({stats['bytes'] / 2 ** 20:.1f} Mo) dans {cache.directory}")
+
+
+if __name__ == '__main__':
+    main()
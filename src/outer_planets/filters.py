@@ -0,0 +1,65 @@
+"""Filtres déclaratifs des pages d'exploration.
+
+Un `FilterSpec` décrit l'état des filtres d'un graphique : système stellaire, planètes
+de la zone habitable seulement, borne sur la période orbitale et bits de qualité à
+exclure (`outer_planets.quality`, ex. `HOT_STAR` ou `WIDE_ORBIT`). `compile_mask` le
+traduit en un seul masque booléen sur des colonnes NumPy calculées une fois (voir
+`HostIndex.filter`, qui garde le résultat en cache par spec).
+
+La classe de zone habitable (`HZ_CLASS`) est elle aussi calculée une fois, en
+catégorie : une planète est « In Goldilock Zone » si elle est dans la zone habitable
+et que son orbite n'est pas trop excentrique (bit `ECCENTRIC`). Elle ne sert qu'à la
+couleur des barres : la case « zone habitable » garde toutes les planètes de la zone
+(colonne `In Goldilock Zone`), les plus excentriques apparaissant en « Other ».
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from outer_planets.quality import ECCENTRIC, QUALITY, flagged
+
+ALL_SYSTEMS = 'Tous les systèmes'
+
+HZ_CLASS = 'HZ Class'
+GOLDILOCK = 'In Goldilock Zone'
+IN_ZONE = 'In Goldilock Zone'
+OTHER = 'Other Exoplanets'
+HZ_COLORS = {IN_ZONE: 'yellow', OTHER: 'lightskyblue'}
+
+# Bornes supérieures de FilterSpec et colonnes auxquelles elles s'appliquent
+BOUNDS = {
+    'max_orbital_period': 'Orbital Period Days',
+}
+
+
+def hz_class(data):
+    """Classe de zone habitable de chaque planète, en catégorie `IN_ZONE` / `OTHER`."""
+    in_zone = (data[GOLDILOCK] == 1).to_numpy() & ~flagged(data, ECCENTRIC)
+    return pd.Categorical.from_codes(np.where(in_zone, 0, 1), categories=[IN_ZONE, OTHER])
+
+
+@dataclass(frozen=True)
+class FilterSpec:
+    """État des filtres d'un graphique ; hashable, il sert de clé de cache."""
+    host: str = ALL_SYSTEMS
+    goldilock_only: bool = False
+    max_orbital_period: float = None
+    # Bits de qualité (outer_planets.quality) dont les planètes sont écartées
+    exclude: int = 0
+
+
+def compile_mask(columns, spec):
+    """Masque combiné des conditions de `spec` sur `columns` (tableaux NumPy), ou None si aucune condition."""
+    conditions = []
+    if spec.goldilock_only:
+        conditions.append(columns[GOLDILOCK] == 1)
+    for bound, column in BOUNDS.items():
+        limit = getattr(spec, bound)
+        if limit is not None:
+            conditions.append(columns[column] <= limit)
+    if spec.exclude:
+        conditions.append((columns[QUALITY] & spec.exclude) == 0)
+    if not conditions:
+        return None
+    return np.logical_and.reduce(conditions)
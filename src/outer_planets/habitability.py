@@ -0,0 +1,116 @@
+"""Indice de similarité avec la Terre (ESI) et classement des planètes les plus habitables.
+
+L'ESI de Schulze-Makuch et al. (2011) compare quatre propriétés x à leur valeur
+terrestre x₀, chacune avec son poids w :
+
+    ESI = Π (1 - |x - x₀| / (x + x₀)) ^ (w / 4)
+
+Le catalogue ne donne pas le rayon des planètes : il est déduit de la masse par la
+relation masse-rayon de Chen & Kipping (2017), puis la densité (M / R³) et la
+vitesse de libération (√(M / R)) en unités terrestres. La température est la
+température d'équilibre déduite du flux reçu, lui-même calculé à partir de la
+luminosité de l'étoile et du demi-grand axe (L / a²), ou à défaut lu dans le
+catalogue. Une planète sans masse ou sans flux connu n'a pas d'ESI (NaN).
+
+Le calcul porte sur des colonnes entières ; l'ESI est ajouté au catalogue Goldilock
+par le pipeline (`outer_planets.pipeline`, colonne `ESI`). `HabitabilityRanking` en
+tire les k meilleures planètes par sélection partielle (`np.argpartition`), filtrées
+par système et par méthode de découverte.
+"""
+import functools
+
+import numpy as np
+import pandas as pd
+
+from outer_planets.data import GOLDILOCK_ZONE_CSV, dataset_version, load_dataset
+from outer_planets.habitable_zone import SEMI_MAJOR_AXIS, STELLAR_RADIUS, TEFF, stellar_luminosity
+
+ESI = 'ESI'
+ALL_METHODS = 'Toutes les méthodes'
+# Température d'équilibre de la Terre en Kelvin (albédo terrestre)
+T_EQ_EARTH = 255
+# Poids de chaque propriété dans l'ESI, valeurs terrestres valant 1 (température exceptée)
+ESI_WEIGHTS = {'radius': 0.57, 'density': 1.07, 'escape_velocity': 0.70, 'temperature': 5.58}
+EARTH = {'radius': 1.0, 'density': 1.0, 'escape_velocity': 1.0, 'temperature': T_EQ_EARTH}
+# Relation masse-rayon de Chen & Kipping (2017) : masses de transition (en masses terrestres) et exposants
+MASS_BREAKS = (2.04, 131.6)
+RADIUS_EXPONENTS = (0.279, 0.589, -0.044)
+
+
+def radius_from_mass(mass):
+    """Rayon (en rayons terrestres) d'une planète de masse `mass` (en masses terrestres)."""
+    # Constantes choisies pour que la relation soit continue aux masses de transition
+    constants = [1.0]
+    for m, before, after in zip(MASS_BREAKS, RADIUS_EXPONENTS, RADIUS_EXPONENTS[1:]):
+        constants.append(constants[-1] * m ** (before - after))
+    regime = np.searchsorted(MASS_BREAKS, mass, side='right')
+    return np.asarray(constants)[regime] * mass ** np.asarray(RADIUS_EXPONENTS)[regime]
+
+
+def insolation(data):
+    """Flux reçu par chaque planète, en flux terrestres : L / a², ou la colonne `Insolation Flux` à défaut."""
+    teff = data[TEFF].to_numpy(dtype=np.float64, na_value=np.nan)
+    radius = data[STELLAR_RADIUS].to_numpy(dtype=np.float64, na_value=np.nan)
+    a_planet = data[SEMI_MAJOR_AXIS].to_numpy(dtype=np.float64, na_value=np.nan)
+    flux = stellar_luminosity(teff, radius) / a_planet ** 2
+    return np.where(np.isfinite(flux), flux, data['Insolation Flux'].to_numpy(dtype=np.float64, na_value=np.nan))
+
+
+def earth_similarity(data):
+    """ESI de chaque planète de `data` (NaN si la masse ou le flux reçu manque)."""
+    mass = data['Mass'].to_numpy(dtype=np.float64, na_value=np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        radius = radius_from_mass(mass)
+        properties = {
+            'radius': radius,
+            'density': mass / radius ** 3,
+            'escape_velocity': np.sqrt(mass / radius),
+            'temperature': T_EQ_EARTH * insolation(data) ** 0.25,
+        }
+        esi = np.ones(len(data))
+        for name, x in properties.items():
+            x0 = EARTH[name]
+            esi *= (1 - np.abs(x - x0) / (x + x0)) ** (ESI_WEIGHTS[name] / len(properties))
+    return esi
+
+
+class HabitabilityRanking:
+    """Classement des planètes par ESI, avec codes du système et de la méthode de découverte pour filtrer."""
+
+    def __init__(self, data):
+        esi = data[ESI].to_numpy(dtype=np.float64, na_value=np.nan) if ESI in data.columns else earth_similarity(data)
+        self.esi = esi
+        self._valid = np.isfinite(esi)
+        self._in_zone = (data['In Goldilock Zone'] == 1).to_numpy()
+        self._hosts, self.hosts = pd.factorize(data['Planet Host'], sort=True)
+        self._methods, self.methods = pd.factorize(data['Discovery Method'], sort=True)
+
+    @staticmethod
+    def _code(values, value):
+        code = values.get_indexer([value])[0]
+        return code if code >= 0 else None
+
+    def top(self, k=20, host=None, method=None, goldilock_only=False):
+        """Positions des `k` planètes d'ESI le plus élevé, de la meilleure à la moins bonne."""
+        mask = self._valid.copy()
+        if host is not None:
+            mask &= self._hosts == self._code(self.hosts, host)
+        if method is not None:
+            mask &= self._methods == self._code(self.methods, method)
+        if goldilock_only:
+            mask &= self._in_zone
+        candidates = np.flatnonzero(mask)
+        if len(candidates) > k:
+            # Sélection partielle : les k meilleures en O(n), seules elles sont ensuite triées
+            candidates = candidates[np.argpartition(-self.esi[candidates], k - 1)[:k]]
+        return candidates[np.argsort(-self.esi[candidates], kind='stable')]
+
+
+@functools.lru_cache(maxsize=4)
+def _habitability_ranking(path, version):
+    return HabitabilityRanking(load_dataset(path))
+
+
+def habitability_ranking(path=GOLDILOCK_ZONE_CSV):
+    """Classement du jeu de données `path`, construit une fois par processus et par version du fichier."""
+    return _habitability_ranking(path, dataset_version(path))
@@ -0,0 +1,113 @@
+"""Calcul vectorisé de la zone habitable (Goldilock Zone).
+
+Chaque modèle calcule, pour des colonnes entières, les limites intérieure et
+extérieure de la zone habitable (en UA) à partir de la température effective et du
+rayon de l'étoile. L'appartenance d'une planète est ensuite un simple test
+`inner <= a <= outer` sur tout le tableau ; une valeur manquante donne 0.
+
+Modèles disponibles (voir `HZ_MODELS`, extensible avec `register_model`) :
+
+- `luminosity` : 0.75 et 1.77 × √L, L déduit du rayon et de la température (goldilock.py) ;
+- `teff` : 0.95 et 1.37 × √(Teff / 5780) (ancien training.py) ;
+- `fixed` : 0.95 – 1.37 UA quelle que soit l'étoile (ancienne page Système Solaire) ;
+- `kopparapu_conservative` / `kopparapu_optimistic` : limites de Kopparapu et al. (2014).
+"""
+import numpy as np
+
+T_SUN = 5778  # Température effective du Soleil en Kelvin
+
+TEFF = 'Stellar Effective Temperature'
+STELLAR_RADIUS = 'Stellar Radius'
+SEMI_MAJOR_AXIS = 'Orbit Semi-Major Axis'
+
+HZ_MODELS = {}
+
+
+def register_model(name):
+    """Enregistre une fonction `(teff, radius) -> (inner, outer)` sous le nom `name`."""
+    def decorator(func):
+        HZ_MODELS[name] = func
+        return func
+    return decorator
+
+
+def stellar_luminosity(teff, radius):
+    """Luminosité stellaire en unités solaires (loi de Stefan-Boltzmann)."""
+    return radius ** 2 * (teff / T_SUN) ** 4
+
+
+@register_model('luminosity')
+def luminosity_boundaries(teff, radius):
+    sqrt_luminosity = np.sqrt(stellar_luminosity(teff, radius))
+    return 0.75 * sqrt_luminosity, 1.77 * sqrt_luminosity
+
+
+@register_model('teff')
+def teff_boundaries(teff, radius):
+    scale = np.sqrt(teff / 5780)
+    return 0.95 * scale, 1.37 * scale
+
+
+# Limites du modèle `fixed`, en UA
+FIXED_HZ = (0.95, 1.37)
+
+
+@register_model('fixed')
+def fixed_boundaries(teff, radius):
+    shape = np.broadcast(teff, radius).shape
+    return np.full(shape, FIXED_HZ[0]), np.full(shape, FIXED_HZ[1])
+
+
+# Coefficients (S_eff du Soleil, a, b, c, d) de Kopparapu et al. (2014), planète de 1 masse terrestre
+KOPPARAPU_LIMITS = {
+    'recent_venus': (1.776, 2.136e-4, 2.533e-8, -1.332e-11, -3.097e-15),
+    'runaway_greenhouse': (1.107, 1.332e-4, 1.580e-8, -8.308e-12, -1.931e-15),
+    'maximum_greenhouse': (0.356, 6.171e-5, 1.698e-9, -3.198e-12, -5.575e-16),
+    'early_mars': (0.320, 5.547e-5, 1.526e-9, -2.874e-12, -5.011e-16),
+}
+# Domaine de validité des ajustements en température effective
+KOPPARAPU_TEFF_RANGE = (2600, 7200)
+
+
+def kopparapu_distance(teff, radius, limit):
+    """Distance (UA) d'une limite de Kopparapu ; NaN hors du domaine de validité."""
+    seff_sun, a, b, c, d = KOPPARAPU_LIMITS[limit]
+    t = teff - 5780
+    seff = seff_sun + a * t + b * t ** 2 + c * t ** 3 + d * t ** 4
+    distance = np.sqrt(stellar_luminosity(teff, radius) / seff)
+    valid = (teff >= KOPPARAPU_TEFF_RANGE[0]) & (teff <= KOPPARAPU_TEFF_RANGE[1])
+    return np.where(valid, distance, np.nan)
+
+
+@register_model('kopparapu_conservative')
+def kopparapu_conservative_boundaries(teff, radius):
+    return (kopparapu_distance(teff, radius, 'runaway_greenhouse'),
+            kopparapu_distance(teff, radius, 'maximum_greenhouse'))
+
+
+@register_model('kopparapu_optimistic')
+def kopparapu_optimistic_boundaries(teff, radius):
+    return (kopparapu_distance(teff, radius, 'recent_venus'),
+            kopparapu_distance(teff, radius, 'early_mars'))
+
+
+def _column(data, name):
+    return np.asarray(data[name], dtype=np.float64)
+
+
+def hz_boundaries(data, model='luminosity'):
+    """Limites intérieure et extérieure de la zone habitable pour chaque ligne de `data`."""
+    with np.errstate(invalid='ignore'):
+        return HZ_MODELS[model](_column(data, TEFF), _column(data, STELLAR_RADIUS))
+
+
+def in_habitable_zone(data, model='luminosity'):
+    """Appartenance (1/0, int8) de chaque planète de `data` à la zone habitable.
+
+    Les lignes dont une des valeurs nécessaires est manquante valent 0.
+    """
+    inner, outer = hz_boundaries(data, model)
+    a_planet = _column(data, SEMI_MAJOR_AXIS)
+    # Les comparaisons avec NaN sont fausses : les valeurs manquantes donnent 0
+    with np.errstate(invalid='ignore'):
+        return ((inner <= a_planet) & (a_planet <= outer)).astype(np.int8)
@@ -0,0 +1,107 @@
+"""Histogrammes calculés côté serveur.
+
+Au lieu d'envoyer toutes les lignes à Plotly pour qu'il les regroupe dans le
+navigateur, les classes et les effectifs par couleur sont calculés ici avec NumPy
+(un seul `bincount` sur le couple classe × couleur), puis seules les barres sont
+envoyées. La taille de la figure ne dépend plus du nombre de planètes. Les résultats
+sont gardés en cache par état des filtres.
+"""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+DEFAULT_NBINS = 50
+CACHE_SIZE = 256
+
+
+@dataclass
+class Histogram:
+    x: str
+    # Centres et largeurs des classes (numérique) ou catégories (largeurs None)
+    positions: np.ndarray
+    widths: np.ndarray
+    # Effectifs, une ligne par couleur
+    counts: np.ndarray
+    colors: list
+
+
+def _color_codes(colors, n):
+    if colors is None:
+        return np.zeros(n, dtype=np.intp), [None]
+    codes, labels = pd.factorize(colors, sort=True)
+    return codes, list(labels)
+
+
+def compute_histogram(data, x, color=None, nbins=DEFAULT_NBINS, discrete=None):
+    """Effectifs de `data[x]` par classe et par valeur de `data[color]`.
+
+    Les colonnes textuelles ou catégorielles donnent une barre par valeur, les colonnes
+    entières de faible étendue (ex. années) une barre par entier, les autres `nbins` classes
+    de même largeur entre le minimum et le maximum.
+    """
+    values = data[x]
+    codes, colors = _color_codes(None if color is None else data[color], len(data))
+    valid = values.notna().to_numpy() & (codes >= 0)
+    codes = codes[valid]
+    n_colors = len(colors)
+
+    if not pd.api.types.is_numeric_dtype(values):
+        bins, categories = pd.factorize(values[valid], sort=True)
+        counts = np.bincount(bins * n_colors + codes, minlength=len(categories) * n_colors)
+        return Histogram(x, np.asarray(categories, dtype=object), None,
+                         counts.reshape(len(categories), n_colors).T, colors)
+
+    values = values.to_numpy(dtype=np.float64)[valid]
+    if not values.size:
+        return Histogram(x, np.empty(0), np.empty(0), np.zeros((n_colors, 0), dtype=np.int64), colors)
+    low, high = values.min(), values.max()
+    if discrete is None:
+        discrete = pd.api.types.is_integer_dtype(data[x]) and high - low <= 200
+    if discrete:
+        edges = np.arange(np.floor(low), np.floor(high) + 2) - 0.5
+    else:
+        edges = np.linspace(low, high if high > low else low + 1, nbins + 1)
+    # Classes fermées à droite pour la dernière, comme np.histogram
+    bins = np.clip(np.searchsorted(edges, values, side='right') - 1, 0, len(edges) - 2)
+    n_bins = len(edges) - 1
+    counts = np.bincount(bins * n_colors + codes, minlength=n_bins * n_colors)
+    return Histogram(x, (edges[:-1] + edges[1:]) / 2, np.diff(edges), counts.reshape(n_bins, n_colors).T, colors)
+
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def cached_histogram(key, data, x, color=None, **kwargs):
+    """`compute_histogram` gardé en cache (LRU) sous `key`, qui doit décrire l'état des filtres de `data`."""
+    full_key = (key, x, color, tuple(sorted(kwargs.items())))
+    with _lock:
+        if full_key in _cache:
+            _cache.move_to_end(full_key)
+            return _cache[full_key]
+    histogram = compute_histogram(data, x, color=color, **kwargs)
+    with _lock:
+        _cache[full_key] = histogram
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return histogram
+
+
+def histogram_figure(histogram, title=None, color_discrete_map=None, labels=None):
+    """Figure Plotly en barres empilées, équivalente à `px.histogram` mais sans les lignes brutes."""
+    color_discrete_map = color_discrete_map or {}
+    fig = go.Figure()
+    for color, counts in zip(histogram.colors, histogram.counts):
+        fig.add_trace(go.Bar(
+            x=histogram.positions, y=counts, width=histogram.widths, name=color,
+            showlegend=color is not None, legendgroup=color,
+            marker_color=color_discrete_map.get(color),
+        ))
+    x_label = (labels or {}).get(histogram.x, histogram.x)
+    fig.update_layout(title=title, barmode='relative', bargap=0 if histogram.widths is not None else None,
+                      xaxis_title=x_label, yaxis_title='count')
+    return fig
@@ -0,0 +1,110 @@
+"""Index des systèmes stellaires pour le sélecteur « Choisissez un système stellaire ».
+
+Le catalogue est trié une fois par étoile hôte (tri stable) : les planètes d'un même
+système occupent alors une plage contiguë de lignes, et sélectionner un système revient
+à découper cette plage au lieu de comparer toute la colonne `Planet Host`. Un résumé
+par système (nombre de planètes, planètes en zone habitable, caractéristiques de
+l'étoile) est calculé en même temps.
+
+Les filtres des pages (`outer_planets.filters.FilterSpec`) sont appliqués sur ce
+catalogue trié : la classe de zone habitable et les colonnes filtrées sont extraites
+une fois en tableaux NumPy, et chaque sélection est gardée en cache par spec.
+"""
+import functools
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from outer_planets.data import GOLDILOCK_ZONE_CSV, dataset_version, load_dataset
+from outer_planets.filters import ALL_SYSTEMS, BOUNDS, GOLDILOCK, HZ_CLASS, compile_mask, hz_class
+from outer_planets.quality import QUALITY, quality_flags
+
+HOST = 'Planet Host'
+FILTER_CACHE_SIZE = 32
+
+
+class HostIndex:
+    """Catalogue trié par étoile hôte, plages de lignes par système et résumé par système."""
+
+    def __init__(self, data):
+        if isinstance(data[HOST].dtype, pd.CategoricalDtype) and not data[HOST].cat.categories.is_monotonic_increasing:
+            # Catégories remises dans l'ordre alphabétique pour que le tri suive les noms d'étoiles
+            host = data[HOST].cat.remove_unused_categories()
+            data = data.assign(**{HOST: host.cat.reorder_categories(sorted(host.cat.categories))})
+        codes, hosts = pd.factorize(data[HOST], sort=True)
+        order = np.argsort(codes, kind='stable')
+        # Les planètes sans étoile hôte (code -1) se retrouvent en tête et ne sont dans aucune plage.
+        # Un catalogue déjà trié est gardé tel quel, sans copie.
+        already_sorted = bool((order == np.arange(len(order))).all())
+        self.data = (data if already_sorted else data.iloc[order]).reset_index(drop=True)
+        if GOLDILOCK in self.data.columns and HZ_CLASS not in self.data.columns:
+            self.data[HZ_CLASS] = hz_class(self.data)
+        self.hosts = list(hosts)
+        bounds = np.searchsorted(codes[order], np.arange(len(hosts) + 1))
+        self.ranges = dict(zip(self.hosts, zip(bounds[:-1].tolist(), bounds[1:].tolist())))
+        self.summary = self._summarize()
+        self._columns = {column: self.data[column].to_numpy(dtype=np.float64, na_value=np.nan)
+                         for column in BOUNDS.values() if column in self.data.columns}
+        if GOLDILOCK in self.data.columns:
+            self._columns[GOLDILOCK] = self.data[GOLDILOCK].to_numpy(dtype=np.float64, na_value=np.nan)
+        # Masque de qualité de l'ingestion, recalculé seulement pour un catalogue qui ne l'a pas
+        self._columns[QUALITY] = (self.data[QUALITY].to_numpy(dtype=np.uint16) if QUALITY in self.data.columns
+                                  else quality_flags(self.data))
+        self._filtered = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _summarize(self):
+        grouped = self.data.groupby(HOST, sort=True, observed=True)
+        summary = pd.DataFrame({
+            'Planets': grouped.size(),
+            'Stellar Effective Temperature': grouped['Stellar Effective Temperature'].first(),
+            'Stellar Radius': grouped['Stellar Radius'].first(),
+            'Stellar Mass': grouped['Stellar Mass'].first(),
+        })
+        if 'In Goldilock Zone' in self.data.columns:
+            summary.insert(1, 'Goldilock Planets', grouped['In Goldilock Zone'].sum().astype('int64'))
+        return summary
+
+    def options(self):
+        """Choix proposés par le sélecteur de système."""
+        return [ALL_SYSTEMS] + self.hosts
+
+    def select(self, host):
+        """Planètes du système `host` (tout le catalogue pour « Tous les systèmes »), sans copie."""
+        if host == ALL_SYSTEMS:
+            return self.data
+        start, stop = self.ranges[host]
+        return self.data.iloc[start:stop]
+
+    def filter(self, spec):
+        """Planètes correspondant à `spec` : la plage du système sans copie si aucune condition n'écarte de ligne,
+        sinon une sélection calculée une fois par spec."""
+        with self._lock:
+            if spec in self._filtered:
+                self._filtered.move_to_end(spec)
+                return self._filtered[spec]
+        start, stop = (0, len(self.data)) if spec.host == ALL_SYSTEMS else self.ranges[spec.host]
+        rows = self.data.iloc[start:stop]
+        mask = compile_mask({name: values[start:stop] for name, values in self._columns.items()}, spec)
+        if mask is not None and not mask.all():
+            rows = rows[mask]
+        with self._lock:
+            self._filtered[spec] = rows
+            while len(self._filtered) > FILTER_CACHE_SIZE:
+                self._filtered.popitem(last=False)
+        return rows
+
+    def system_summary(self, host):
+        return self.summary.loc[host]
+
+
+@functools.lru_cache(maxsize=4)
+def _host_index(path, version):
+    return HostIndex(load_dataset(path))
+
+
+def host_index(path=GOLDILOCK_ZONE_CSV):
+    """Index du jeu de données `path`, construit une fois par processus et par version du fichier."""
+    return _host_index(path, dataset_version(path))
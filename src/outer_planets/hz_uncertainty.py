@@ -0,0 +1,117 @@
+"""Probabilité d'appartenance à la zone habitable, par Monte Carlo.
+
+`in_habitable_zone` classe chaque planète en 0/1 sur les valeurs ponctuelles de la
+température et du rayon de l'étoile et du demi-grand axe. Ici ces trois entrées sont
+tirées `n_samples` fois dans leur distribution d'incertitude et P(zone habitable) est
+la part des tirages qui tombent dans la zone, pour le même modèle (`HZ_MODELS`).
+
+Le catalogue ne donne pas les incertitudes : chaque entrée suit une loi log-normale
+centrée sur la valeur du catalogue, d'écart relatif `UNCERTAINTIES` (remplaçable),
+ce qui garde les tirages positifs.
+
+Le calcul est vectorisé sur des blocs planètes × tirages de `CHUNK_ELEMENTS` valeurs
+au plus (mémoire bornée quel que soit le catalogue), répartis sur un pool de
+processus. Chaque bloc a son propre générateur aléatoire, dérivé de la graine : le
+résultat ne dépend pas du nombre de processus.
+
+Utilisation, depuis la racine du projet :
+
+    PYTHONPATH=src python -m outer_planets.hz_uncertainty [--samples 10000] [--model luminosity] [--jobs 4]
+        [--seed 42] [--output data/derived/hz_probability.csv]
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from outer_planets.data import DATA_DIR, GOLDILOCK_ZONE_CSV, load_dataset
+from outer_planets.habitable_zone import HZ_MODELS, SEMI_MAJOR_AXIS, STELLAR_RADIUS, TEFF
+
+PROBABILITY = 'P(In Goldilock Zone)'
+DEFAULT_OUTPUT = DATA_DIR / 'derived' / 'hz_probability.csv'
+# Écart relatif (1 sigma) supposé de chaque entrée
+UNCERTAINTIES = {TEFF: 0.02, STELLAR_RADIUS: 0.07, SEMI_MAJOR_AXIS: 0.03}
+# Nombre maximal de valeurs planètes × tirages d'un bloc (environ 8 Mo par tableau de tirages)
+CHUNK_ELEMENTS = 2_000_000
+
+
+def _chunk_probability(teff, radius, a_planet, n_samples, model, uncertainties, seed):
+    """P(zone habitable) des planètes d'un bloc, à partir de leurs valeurs ponctuelles."""
+    rng = np.random.default_rng(seed)
+    shape = (len(teff), n_samples)
+
+    def sample(values, column):
+        # Tirages en float32, calculés sur place : deux fois moins de mémoire par bloc
+        samples = rng.standard_normal(shape, dtype=np.float32)
+        samples *= np.float32(uncertainties[column])
+        np.exp(samples, out=samples)
+        samples *= values.astype(np.float32)[:, None]
+        return samples
+
+    with np.errstate(invalid='ignore'):
+        inner, outer = HZ_MODELS[model](sample(teff, TEFF), sample(radius, STELLAR_RADIUS))
+        a_samples = sample(a_planet, SEMI_MAJOR_AXIS)
+        return ((inner <= a_samples) & (a_samples <= outer)).mean(axis=1)
+
+
+def _chunk_probability_star(args):
+    return _chunk_probability(*args)
+
+
+def hz_probability(data, n_samples=10_000, model='luminosity', uncertainties=UNCERTAINTIES, seed=42,
+                   jobs=None, chunk_elements=CHUNK_ELEMENTS):
+    """P(zone habitable) de chaque planète de `data` (NaN si une des entrées manque)."""
+    columns = [data[column].to_numpy(dtype=np.float64, na_value=np.nan) for column in (TEFF, STELLAR_RADIUS,
+                                                                                      SEMI_MAJOR_AXIS)]
+    known = np.flatnonzero(np.isfinite(np.column_stack(columns)).all(axis=1))
+    planets_per_chunk = max(1, chunk_elements // n_samples)
+    starts = range(0, len(known), planets_per_chunk)
+    seeds = np.random.SeedSequence(seed).spawn(len(starts))
+    tasks = [tuple(values[known[start:start + planets_per_chunk]] for values in columns)
+             + (n_samples, model, uncertainties, chunk_seed)
+             for start, chunk_seed in zip(starts, seeds)]
+
+    jobs = min(jobs or os.cpu_count(), len(tasks))
+    if jobs <= 1:
+        chunks = list(map(_chunk_probability_star, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            chunks = list(pool.map(_chunk_probability_star, tasks))
+    probability = np.full(len(data), np.nan)
+    for start, chunk in zip(starts, chunks):
+        probability[known[start:start + len(chunk)]] = chunk
+    return probability
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Probabilité d'appartenance à la zone habitable par Monte Carlo.")
+    parser.add_argument('--samples', type=int, default=10_000, help="nombre de tirages par planète")
+    parser.add_argument('--model', default='luminosity', choices=sorted(HZ_MODELS), help="modèle de zone habitable")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help="nombre de processus")
+    parser.add_argument('--seed', type=int, default=42, help="graine des tirages")
+    parser.add_argument('--output', type=Path, default=DEFAULT_OUTPUT, help="fichier CSV des probabilités")
+    args = parser.parse_args(argv)
+
+    data = load_dataset(GOLDILOCK_ZONE_CSV)
+    start = time.perf_counter()
+    probability = hz_probability(data, args.samples, args.model, seed=args.seed, jobs=args.jobs)
+    elapsed = time.perf_counter() - start
+    evaluations = np.isfinite(probability).sum() * args.samples
+
+    result = pd.DataFrame({'No.': data['No.'], 'Planet Name': data['Planet Name'], PROBABILITY: probability})
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = args.output.with_suffix('.tmp')
+    result.to_csv(tmp_path, index=False)
+    tmp_path.replace(args.output)
+
+    uncertain = ((probability > 0.05) & (probability < 0.95)).sum()
+    print(f"{evaluations:.3g} évaluations en {elapsed:.2f} s ({evaluations / elapsed:.3g} /s, {args.jobs} processus)")
+    print(f"{uncertain} planètes entre 5 % et 95 % de probabilité -> {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,267 @@
+"""Chronométrage des pages Streamlit.
+
+Chaque page ouvre un rerun avec `start_rerun(page)`, entoure ses étapes de
+`with span('load'):` (chargement des données), `'filter'`, `'features'`, `'model'`,
+`'figure'` (construction des figures) et `'render'` (sérialisation et envoi au
+navigateur), puis le ferme avec `finish_rerun()`. Un même nom de span peut être
+utilisé plusieurs fois dans un rerun : les durées s'additionnent.
+
+À la fin de chaque rerun :
+
+- la durée totale et celle de chaque étape sont ajoutées à une fenêtre glissante par
+  page (`WINDOW` derniers reruns), d'où sont tirés les p50/p95 ;
+- une ligne JSON est ajoutée à `data/metrics/reruns.jsonl`, qui passe à
+  `reruns.jsonl.1` (écrasant l'ancien) au-delà de `MAX_LOG_BYTES` ;
+- les p50/p95 sont écrits au format texte de Prometheus dans
+  `data/metrics/outer_planets_<pid>.prom` (un fichier par processus serveur, lisible
+  par le collecteur « textfile » de node_exporter). Le fichier est supprimé à la sortie
+  du processus ; ceux des processus qui n'ont pas pu le faire (arrêt brutal) sont
+  supprimés au premier export d'un nouveau processus ;
+- un panneau de debug repliable dans la sidebar affiche le détail du rerun, la mémoire
+  du processus et les p50/p95 de la page.
+"""
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+import numpy as np
+
+from outer_planets.data import DATA_DIR, use_copy_on_write
+
+METRICS_DIR = DATA_DIR / 'metrics'
+RERUN_LOG = METRICS_DIR / 'reruns.jsonl'
+# Taille au-delà de laquelle le journal est archivé et recommencé (une seule archive est gardée)
+MAX_LOG_BYTES = 10 * 1024 * 1024
+WINDOW = 200
+TOTAL = 'total'
+
+
+class Rerun:
+    def __init__(self, page):
+        self.page = page
+        self.started = time.time()
+        self._start = time.perf_counter()
+        self.spans = defaultdict(float)
+        self.total = None
+        self.memory = None
+
+
+# Rerun en cours de chaque session (Streamlit exécute chaque session dans son propre thread)
+_current = threading.local()
+# Durées des derniers reruns, par page puis par étape
+_history = defaultdict(lambda: defaultdict(lambda: deque(maxlen=WINDOW)))
+_counts = defaultdict(int)
+_sums = defaultdict(float)
+_lock = threading.Lock()
+# Processus dont le fichier Prometheus est déjà suivi (un fork hérite du module, pas du suivi)
+_exporting_pid = None
+
+
+def start_rerun(page):
+    # Les pages lisent les jeux de données en cache par des vues sans copie (voir outer_planets.data)
+    use_copy_on_write()
+    _current.rerun = Rerun(page)
+    return _current.rerun
+
+
+@contextmanager
+def span(name):
+    """Chronomètre le bloc et l'ajoute à l'étape `name` du rerun en cours."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        rerun = getattr(_current, 'rerun', None)
+        if rerun is not None:
+            rerun.spans[name] += time.perf_counter() - start
+
+
+def _peak_memory():
+    """Mémoire résidente maximale du processus en octets, ou None si la plateforme ne la donne pas."""
+    try:
+        # Module Unix seulement : absent sous Windows
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss est en octets sous macOS, en kilo-octets ailleurs
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _current_memory():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, AttributeError, ValueError):
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss
+
+
+def memory_usage():
+    """Mémoire résidente actuelle et maximale du processus, en octets (None si inconnue)."""
+    peak = _peak_memory()
+    rss = _current_memory()
+    return {'rss': rss if rss is not None else peak, 'peak': peak}
+
+
+def percentiles(page):
+    """p50/p95 de la durée totale et de chaque étape sur les derniers reruns de `page`."""
+    with _lock:
+        windows = {name: np.array(durations) for name, durations in _history[page].items()}
+    return {name: {'p50': float(np.percentile(durations, 50)), 'p95': float(np.percentile(durations, 95)),
+                   'n': len(durations)}
+            for name, durations in windows.items()}
+
+
+def prometheus_text():
+    """Métriques de toutes les pages de ce processus, au format texte de Prometheus."""
+    with _lock:
+        pages = list(_history)
+        counts, sums = dict(_counts), dict(_sums)
+    lines = ['# HELP outer_planets_rerun_seconds Durée des reruns de page (fenêtre glissante).',
+             '# TYPE outer_planets_rerun_seconds summary']
+    span_lines = ['# HELP outer_planets_span_seconds Durée des étapes des reruns de page (fenêtre glissante).',
+                  '# TYPE outer_planets_span_seconds gauge']
+    for page in pages:
+        for name, stats in percentiles(page).items():
+            for quantile in ('p50', 'p95'):
+                q = '0.5' if quantile == 'p50' else '0.95'
+                if name == TOTAL:
+                    lines.append(f'outer_planets_rerun_seconds{{page="{page}",quantile="{q}"}} {stats[quantile]:.6f}')
+                else:
+                    span_lines.append(f'outer_planets_span_seconds{{page="{page}",span="{name}",quantile="{q}"}} '
+                                      f'{stats[quantile]:.6f}')
+        lines.append(f'outer_planets_rerun_seconds_sum{{page="{page}"}} {sums[page]:.6f}')
+        lines.append(f'outer_planets_rerun_seconds_count{{page="{page}"}} {counts[page]}')
+    lines += span_lines
+    memory = memory_usage()
+    if memory['rss'] is not None:
+        lines += [
+            '# HELP outer_planets_memory_rss_bytes Mémoire résidente du processus serveur.',
+            '# TYPE outer_planets_memory_rss_bytes gauge',
+            f'outer_planets_memory_rss_bytes {memory["rss"]}',
+        ]
+    return '\n'.join(lines) + '\n'
+
+
+def _prom_path(pid):
+    return METRICS_DIR / f'outer_planets_{pid}.prom'
+
+
+def _remove(path):
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def _alive(pid):
+    if os.name != 'posix':
+        # Sans signal 0, on ne sait pas tester un processus : ses fichiers sont gardés
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def prune_stale_exports():
+    """Supprime les fichiers Prometheus des processus terminés ; retourne le nombre de fichiers supprimés."""
+    removed = 0
+    for path in METRICS_DIR.glob('outer_planets_*.prom'):
+        pid = path.stem.rpartition('_')[2]
+        if pid.isdigit() and int(pid) != os.getpid() and not _alive(int(pid)):
+            _remove(path)
+            removed += 1
+    return removed
+
+
+def _track_export():
+    # Au premier export du processus : ménage des processus morts et suppression de son propre fichier à la sortie
+    global _exporting_pid
+    with _lock:
+        if _exporting_pid == os.getpid():
+            return
+        _exporting_pid = os.getpid()
+    prune_stale_exports()
+    atexit.register(_remove, _prom_path(os.getpid()))
+
+
+def export(rerun):
+    """Ajoute le rerun au journal JSON et réécrit le fichier Prometheus de ce processus."""
+    METRICS_DIR.mkdir(parents=True, exist_ok=True)
+    record = {'time': rerun.started, 'pid': os.getpid(), 'page': rerun.page, 'total': rerun.total,
+              'spans': dict(rerun.spans), 'memory': rerun.memory}
+    try:
+        if RERUN_LOG.stat().st_size > MAX_LOG_BYTES:
+            RERUN_LOG.replace(RERUN_LOG.with_name(RERUN_LOG.name + '.1'))
+    except FileNotFoundError:
+        # Pas encore de journal, ou déjà archivé par un autre processus
+        pass
+    # Une ligne courte écrite en mode append reste entière même avec plusieurs processus
+    with open(RERUN_LOG, 'a') as f:
+        f.write(json.dumps(record) + '\n')
+    _track_export()
+    prom_path = _prom_path(os.getpid())
+    tmp_path = prom_path.with_suffix('.tmp')
+    tmp_path.write_text(prometheus_text())
+    tmp_path.replace(prom_path)
+
+
+def finish_rerun(panel=True):
+    """Termine le rerun en cours : statistiques, exports et panneau de debug."""
+    rerun = getattr(_current, 'rerun', None)
+    if rerun is None:
+        return None
+    _current.rerun = None
+    rerun.total = time.perf_counter() - rerun._start
+    rerun.memory = memory_usage()
+    with _lock:
+        _history[rerun.page][TOTAL].append(rerun.total)
+        for name, seconds in rerun.spans.items():
+            _history[rerun.page][name].append(seconds)
+        _counts[rerun.page] += 1
+        _sums[rerun.page] += rerun.total
+    export(rerun)
+    if panel:
+        debug_panel(rerun)
+    return rerun
+
+
+def debug_panel(rerun):
+    """Panneau repliable de la sidebar : détail du dernier rerun, mémoire et p50/p95 de la page."""
+    import pandas as pd
+    import streamlit as st
+
+    stats = percentiles(rerun.page)
+    breakdown = pd.DataFrame({
+        'dernier (ms)': {name: seconds * 1000 for name, seconds in rerun.spans.items()} | {TOTAL: rerun.total * 1000},
+        'p50 (ms)': {name: values['p50'] * 1000 for name, values in stats.items()},
+        'p95 (ms)': {name: values['p95'] * 1000 for name, values in stats.items()},
+    }).round(1)
+    with st.sidebar.expander("🛠️ Debug : temps du rerun"):
+        st.dataframe(breakdown)
+        memory = rerun.memory
+        if memory['rss'] is None:
+            st.caption(f"{stats[TOTAL]['n']} derniers reruns de la page. Mémoire du processus indisponible.")
+        else:
+            peak = f" (maximum {memory['peak'] / 2**20:.0f} Mo)" if memory['peak'] is not None else ''
+            st.caption(f"{stats[TOTAL]['n']} derniers reruns de la page. Mémoire du processus : "
+                       f"{memory['rss'] / 2**20:.0f} Mo{peak}.")
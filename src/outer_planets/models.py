@@ -0,0 +1,220 @@
+"""Registre des modèles de la page Goldilock Zone.
+
+Le normaliseur, le K-means (graine fixée) et la régression logistique sont entraînés
+hors ligne, avec les affectations de clusters et l'évaluation du classifieur, puis
+enregistrés dans `data/models/`. Un artefact est identifié par le hash du jeu de
+données et les hyperparamètres : la page le recharge en quelques millisecondes et ne
+réentraîne que si les données ou les paramètres changent.
+
+Chaque artefact est accompagné d'un résumé (`.summary`) sans les estimateurs
+scikit-learn : c'est lui que la page recharge, sans avoir à importer scikit-learn.
+
+Quand les données changent, le clustering est repris de l'artefact précédent entraîné
+avec les mêmes paramètres (voir `outer_planets.clustering`) : seules les nouvelles
+planètes sont affectées et les clusters existants ne sont pas renumérotés. `--full`
+force un clustering complet et `--n-clusters auto` choisit le nombre de clusters.
+
+Les hyperparamètres de la dernière exécution (`--n-clusters` compris) sont enregistrés
+dans `data/models/current.json` : c'est ce modèle que la page sert ensuite.
+
+Utilisation, depuis la racine du projet :
+
+    PYTHONPATH=src python -m outer_planets.models [--force] [--full] [--n-clusters auto]
+"""
+import argparse
+import functools
+import hashlib
+import json
+import pickle
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from outer_planets.clustering import fit_clusters, update_clusters
+from outer_planets.data import DATA_DIR, GOLDILOCK_ZONE_CSV, dataset_version, load_dataset
+from outer_planets.pipeline import CLASSIFIER_FEATURES, CLUSTER_FEATURES, file_hash
+from outer_planets.quality import complete_rows
+
+MODELS_DIR = DATA_DIR / 'models'
+# Hyperparamètres choisis par la dernière exécution du module, relus par la page
+CURRENT_PARAMS = MODELS_DIR / 'current.json'
+TARGET = 'In Goldilock Zone'
+
+# Au-delà de cette part de planètes connues affectées ailleurs, une mise à jour incrémentale est signalée
+RELABEL_WARNING = 0.05
+# Estimateurs retirés du résumé chargé par la page (les dépickler importerait scikit-learn)
+ESTIMATORS = ('scaler', 'kmeans', 'classifier')
+
+DEFAULT_PARAMS = {
+    'cluster_features': CLUSTER_FEATURES,
+    'n_clusters': 5,
+    'classifier_features': CLASSIFIER_FEATURES,
+    'test_size': 0.2,
+    'random_state': 42,
+}
+
+
+@functools.lru_cache(maxsize=8)
+def _dataset_hash(path, mtime_ns):
+    return file_hash(path)
+
+
+def dataset_hash(path):
+    """Hash du contenu du CSV `path`, calculé une fois par version du fichier. Ses versions Feather ou partagées ont
+    le même contenu : les publier ne change pas les artefacts."""
+    path = Path(path).resolve()
+    return _dataset_hash(path, path.stat().st_mtime_ns)
+
+
+def current_params():
+    """Hyperparamètres des modèles servis par la page : ceux du dernier `python -m outer_planets.models`, sinon
+    `DEFAULT_PARAMS`."""
+    try:
+        return json.loads(CURRENT_PARAMS.read_text())
+    except FileNotFoundError:
+        return DEFAULT_PARAMS
+
+
+def save_current_params(params):
+    CURRENT_PARAMS.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = CURRENT_PARAMS.with_suffix('.tmp')
+    tmp_path.write_text(json.dumps(params, indent=2, sort_keys=True))
+    tmp_path.replace(CURRENT_PARAMS)
+
+
+def artifact_key(path, params):
+    payload = json.dumps({'dataset': dataset_hash(path), 'params': params}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def fit_goldilock_models(data, params=DEFAULT_PARAMS, previous=None):
+    """Entraîne les modèles de la page Goldilock Zone sur `data`, en reprenant le clustering de `previous` s'il est donné."""
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.metrics import classification_report, confusion_matrix
+    from sklearn.model_selection import train_test_split
+
+    # Clustering : les lignes sans toutes les caractéristiques gardent le label -1
+    if previous is None:
+        clusters = fit_clusters(data, params['cluster_features'], params['n_clusters'], params['random_state'])
+    else:
+        clusters = update_clusters(previous, data, params['cluster_features'], params['random_state'])
+
+    # Classification de l'appartenance à la zone habitable
+    classifier_features = params['classifier_features']
+    classified = data.loc[complete_rows(data, classifier_features), classifier_features + [TARGET]]
+    X_train, X_test, y_train, y_test = train_test_split(classified[classifier_features], classified[TARGET],
+                                                        test_size=params['test_size'],
+                                                        random_state=params['random_state'])
+    classifier = LogisticRegression()
+    classifier.fit(X_train, y_train)
+    y_pred = classifier.predict(X_test)
+
+    return {
+        'params': params,
+        'scaler': clusters['scaler'],
+        'kmeans': clusters['kmeans'],
+        'n_clusters': clusters['n_clusters'],
+        'k_scores': clusters['k_scores'],
+        'cluster_labels': clusters['cluster_labels'],
+        'cluster_keys': clusters['cluster_keys'],
+        'cluster_counts': clusters['cluster_counts'],
+        # Contrôle d'une mise à jour incrémentale (None pour un clustering complet)
+        'centroid_shift': clusters.get('centroid_shift'),
+        'relabelled': clusters.get('relabelled'),
+        'classifier': classifier,
+        'classification_report': classification_report(y_test, y_pred, zero_division=0),
+        'confusion_matrix': confusion_matrix(y_test, y_pred, labels=[0, 1]),
+        'coefficients': pd.DataFrame({'Feature': classifier_features, 'Coefficient': classifier.coef_[0]}),
+    }
+
+
+def save_artifact(artifact, path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix('.tmp')
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(artifact, f, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp_path.replace(path)
+
+
+def summary_path(artifact_path):
+    return artifact_path.with_suffix('.summary')
+
+
+def summarize(artifact):
+    """Artefact sans ses estimateurs : labels, rapport, matrice de confusion et coefficients."""
+    return {name: value for name, value in artifact.items() if name not in ESTIMATORS}
+
+
+def previous_artifact(params):
+    """Dernier artefact enregistré avec ces paramètres (quel que soit le jeu de données), ou None."""
+    for artifact_path in sorted(MODELS_DIR.glob('goldilock_*.pkl'), key=lambda p: p.stat().st_mtime_ns, reverse=True):
+        with open(artifact_path, 'rb') as f:
+            artifact = pickle.load(f)
+        if artifact['params'] == params and 'cluster_keys' in artifact:
+            return artifact
+    return None
+
+
+def load_or_fit(path=GOLDILOCK_ZONE_CSV, params=DEFAULT_PARAMS, force=False, incremental=True):
+    """Artefact enregistré pour ce jeu de données et ces paramètres, entraîné et enregistré s'il manque.
+
+    Avec `incremental`, le clustering d'un artefact manquant est repris du précédent artefact de mêmes paramètres.
+    """
+    artifact_path = MODELS_DIR / f'goldilock_{artifact_key(path, params)}.pkl'
+    if artifact_path.exists() and not force:
+        with open(artifact_path, 'rb') as f:
+            return pickle.load(f)
+    previous = previous_artifact(params) if incremental and not force else None
+    artifact = fit_goldilock_models(load_dataset(path), params, previous)
+    save_artifact(artifact, artifact_path)
+    save_artifact(summarize(artifact), summary_path(artifact_path))
+    return artifact
+
+
+@functools.lru_cache(maxsize=4)
+def _goldilock_models(path, version, params_json):
+    params = json.loads(params_json)
+    path_summary = summary_path(MODELS_DIR / f'goldilock_{artifact_key(path, params)}.pkl')
+    if path_summary.exists():
+        with open(path_summary, 'rb') as f:
+            return pickle.load(f)
+    summary = summarize(load_or_fit(path, params))
+    save_artifact(summary, path_summary)
+    return summary
+
+
+def goldilock_models(path=GOLDILOCK_ZONE_CSV):
+    """Résumé des modèles de la page Goldilock Zone (sans les estimateurs) pour les hyperparamètres courants, gardé
+    en mémoire pour la version courante du jeu de données."""
+    return _goldilock_models(path, dataset_version(path), json.dumps(current_params(), sort_keys=True))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Entraîne et enregistre les modèles de la page Goldilock Zone.")
+    parser.add_argument('--force', action='store_true', help="réentraîne même si l'artefact existe")
+    parser.add_argument('--full', action='store_true', help="clustering complet, sans reprendre l'artefact précédent")
+    parser.add_argument('--n-clusters', default=str(DEFAULT_PARAMS['n_clusters']),
+                        help="nombre de clusters, ou 'auto' pour le choisir par score de silhouette")
+    args = parser.parse_args(argv)
+    n_clusters = args.n_clusters if args.n_clusters == 'auto' else int(args.n_clusters)
+
+    start = time.perf_counter()
+    params = dict(DEFAULT_PARAMS, n_clusters=n_clusters)
+    artifact = load_or_fit(params=params, force=args.force, incremental=not args.full)
+    # La page sert désormais ces modèles
+    save_current_params(params)
+    if artifact['k_scores']:
+        print("Scores de silhouette :", ", ".join(f"k={k} : {score:.3f}" for k, score in artifact['k_scores'].items()))
+    print(f"Modèles prêts dans {MODELS_DIR} ({artifact['n_clusters']} clusters, "
+          f"{time.perf_counter() - start:.2f} s)")
+    if artifact.get('centroid_shift') is not None:
+        print(f"Mise à jour incrémentale : centroïdes déplacés de {artifact['centroid_shift']:.3f} au plus, "
+              f"{artifact['relabelled']:.1%} des planètes connues seraient affectées ailleurs")
+        if artifact['relabelled'] > RELABEL_WARNING:
+            print("Les clusters ont dérivé : relancez avec --full pour un clustering complet")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+"""Propagation képlérienne des orbites et animation des systèmes stellaires.
+
+L'équation de Kepler `M = E - e sin E` est résolue par la méthode de Newton sur un
+tableau planètes × instants entier : chaque itération met à jour d'un coup toutes les
+valeurs qui n'ont pas encore convergé (correction supérieure à `KEPLER_TOLERANCE`),
+et quelques itérations suffisent. Les positions dans le plan de l'orbite en découlent
+directement.
+
+Les éléments orbitaux viennent du catalogue : période, demi-grand axe et
+excentricité. Un demi-grand axe manquant est déduit de la période et de la masse de
+l'étoile (troisième loi de Kepler), et inversement ; une excentricité manquante vaut
+0. Le catalogue ne donne ni l'argument du périastre ni la position à une date : toutes
+les planètes partent de leur périastre, orienté selon l'axe x.
+
+Les animations (positions à chaque image, tracés des orbites et figure Plotly) sont
+calculées une fois par système, par échelle de temps et par version du jeu de données.
+"""
+import functools
+from dataclasses import dataclass
+
+import numpy as np
+import plotly.graph_objects as go
+
+from outer_planets.data import GOLDILOCK_ZONE_CSV, dataset_version
+
+DAYS_PER_YEAR = 365.25
+KEPLER_TOLERANCE = 1e-10
+KEPLER_MAX_ITERATIONS = 50
+N_FRAMES = 720
+# Nombre de périodes de la planète de référence couvertes par une animation
+N_ORBITS = 2
+PATH_POINTS = 256
+
+
+def solve_kepler(mean_anomaly, eccentricity):
+    """Anomalie excentrique E telle que M = E - e sin E, pour des tableaux (diffusables) M et e."""
+    mean_anomaly = np.remainder(mean_anomaly, 2 * np.pi)
+    eccentricity = np.broadcast_to(eccentricity, mean_anomaly.shape)
+    # Point de départ de Danby (1988), à quelques itérations de la solution même pour e proche de 1
+    anomaly = mean_anomaly + 0.85 * eccentricity * np.sign(np.sin(mean_anomaly))
+    # Seules les valeurs qui n'ont pas encore convergé sont recalculées à chaque itération
+    active = np.flatnonzero(eccentricity.ravel() > 0)
+    flat_anomaly, flat_mean, flat_eccentricity = anomaly.ravel(), mean_anomaly.ravel(), eccentricity.ravel()
+    for _ in range(KEPLER_MAX_ITERATIONS):
+        if not len(active):
+            break
+        E, M, e = flat_anomaly[active], flat_mean[active], flat_eccentricity[active]
+        correction = (E - e * np.sin(E) - M) / (1 - e * np.cos(E))
+        flat_anomaly[active] = E - correction
+        active = active[np.abs(correction) >= KEPLER_TOLERANCE]
+    return anomaly
+
+
+def orbit_positions(semi_major_axis, eccentricity, period, times):
+    """Positions x, y (UA) de chaque planète à chaque instant (jours), en tableaux instants × planètes."""
+    mean_anomaly = 2 * np.pi * np.asarray(times)[:, None] / period[None, :]
+    anomaly = solve_kepler(mean_anomaly, eccentricity[None, :])
+    x = semi_major_axis * (np.cos(anomaly) - eccentricity)
+    y = semi_major_axis * np.sqrt(1 - eccentricity ** 2) * np.sin(anomaly)
+    return x, y
+
+
+def orbit_paths(semi_major_axis, eccentricity, n_points=PATH_POINTS):
+    """Ellipses de toutes les orbites, mises bout à bout et séparées par NaN (une seule trace)."""
+    anomaly = np.linspace(0, 2 * np.pi, n_points)[:, None]
+    x = semi_major_axis * (np.cos(anomaly) - eccentricity)
+    y = semi_major_axis * np.sqrt(1 - eccentricity ** 2) * np.sin(anomaly)
+    separator = np.full((1, len(semi_major_axis)), np.nan)
+    return np.vstack([x, separator]).ravel(order='F'), np.vstack([y, separator]).ravel(order='F')
+
+
+@dataclass
+class OrbitalElements:
+    names: np.ndarray
+    semi_major_axis: np.ndarray
+    eccentricity: np.ndarray
+    period: np.ndarray
+
+
+def orbital_elements(data):
+    """Éléments orbitaux des planètes de `data` dont l'orbite peut être reconstituée, triés par période."""
+    period = data['Orbital Period Days'].to_numpy(dtype=np.float64, na_value=np.nan)
+    semi_major_axis = data['Orbit Semi-Major Axis'].to_numpy(dtype=np.float64, na_value=np.nan)
+    eccentricity = data['Eccentricity'].to_numpy(dtype=np.float64, na_value=np.nan)
+    stellar_mass = data['Stellar Mass'].to_numpy(dtype=np.float64, na_value=np.nan)
+    # Troisième loi de Kepler, en UA, années et masses solaires : a³ = M P²
+    with np.errstate(invalid='ignore'):
+        semi_major_axis = np.where(np.isnan(semi_major_axis),
+                                   np.cbrt(stellar_mass * (period / DAYS_PER_YEAR) ** 2), semi_major_axis)
+        period = np.where(np.isnan(period), DAYS_PER_YEAR * np.sqrt(semi_major_axis ** 3 / stellar_mass), period)
+    eccentricity = np.clip(np.nan_to_num(eccentricity), 0, 0.99)
+    known = np.flatnonzero((period > 0) & (semi_major_axis > 0))
+    known = known[np.argsort(period[known], kind='stable')]
+    return OrbitalElements(data['Planet Name'].to_numpy(dtype=object)[known], semi_major_axis[known],
+                           eccentricity[known], period[known])
+
+
+@dataclass
+class SystemAnimation:
+    host: str
+    elements: OrbitalElements
+    times: np.ndarray
+    # Positions à chaque image, tableaux images × planètes
+    x: np.ndarray
+    y: np.ndarray
+    path_x: np.ndarray
+    path_y: np.ndarray
+
+
+def system_animation(data, host, duration=None, n_frames=N_FRAMES):
+    """Positions des planètes de `data` (un système) sur `duration` jours, par défaut `N_ORBITS` périodes de la
+    planète la plus lointaine."""
+    elements = orbital_elements(data)
+    if duration is None:
+        duration = N_ORBITS * elements.period.max(initial=DAYS_PER_YEAR)
+    times = np.linspace(0, duration, n_frames)
+    x, y = orbit_positions(elements.semi_major_axis, elements.eccentricity, elements.period, times)
+    path_x, path_y = orbit_paths(elements.semi_major_axis, elements.eccentricity)
+    return SystemAnimation(host, elements, times, x, y, path_x, path_y)
+
+
+def animation_figure(animation, title=None, frame_duration=40):
+    """Figure Plotly animée : orbites, étoile et planètes, une image par instant."""
+    names = animation.elements.names.tolist()
+    extent = 1.1 * animation.elements.semi_major_axis.max(initial=1) * (1 + animation.elements.eccentricity.max(initial=0))
+    frames = [go.Frame(data=[go.Scatter(x=x, y=y)], traces=[2], name=str(i))
+              for i, (x, y) in enumerate(zip(animation.x.round(5), animation.y.round(5)))]
+    fig = go.Figure(
+        data=[
+            go.Scatter(x=animation.path_x, y=animation.path_y, mode='lines', line={'width': 1, 'color': 'lightgray'},
+                       hoverinfo='skip', name='Orbites'),
+            go.Scatter(x=[0], y=[0], mode='markers', marker={'size': 16, 'color': 'gold'}, name=animation.host),
+            go.Scatter(x=animation.x[0], y=animation.y[0], mode='markers+text', text=names,
+                       textposition='top center', marker={'size': 9, 'color': 'lightskyblue'}, name='Planètes'),
+        ],
+        frames=frames,
+    )
+    fig.update_layout(
+        title=title,
+        xaxis={'range': [-extent, extent], 'title': 'x (UA)'},
+        yaxis={'range': [-extent, extent], 'title': 'y (UA)', 'scaleanchor': 'x'},
+        height=700,
+        updatemenus=[{
+            'type': 'buttons',
+            'buttons': [
+                {'label': '▶', 'method': 'animate',
+                 'args': [None, {'frame': {'duration': frame_duration, 'redraw': False}, 'fromcurrent': True,
+                                 'transition': {'duration': 0}}]},
+                {'label': '⏸', 'method': 'animate',
+                 'args': [[None], {'frame': {'duration': 0, 'redraw': False}, 'mode': 'immediate'}]},
+            ],
+        }],
+        sliders=[{
+            'currentvalue': {'prefix': 'Jour '},
+            'steps': [{'label': f'{t:.0f}', 'method': 'animate',
+                       'args': [[str(i)], {'frame': {'duration': 0, 'redraw': False}, 'mode': 'immediate'}]}
+                      for i, t in enumerate(animation.times)],
+        }],
+    )
+    return fig
+
+
+@functools.lru_cache(maxsize=32)
+def _system_figure(path, version, host, reference, n_frames):
+    from outer_planets.host_index import host_index
+
+    data = host_index(path).select(host)
+    elements = orbital_elements(data)
+    duration = None
+    if reference is not None:
+        duration = N_ORBITS * elements.period[list(elements.names).index(reference)]
+    animation = system_animation(data, host, duration, n_frames)
+    return animation_figure(animation, title=f'Orbites du système {host}')
+
+
+def system_figure(host, reference=None, n_frames=N_FRAMES, path=GOLDILOCK_ZONE_CSV):
+    """Animation des orbites du système `host` sur `N_ORBITS` périodes de la planète `reference` (par défaut la plus
+    lointaine), calculée une fois par système et par version du jeu de données."""
+    return _system_figure(path, dataset_version(path), host, reference, n_frames)
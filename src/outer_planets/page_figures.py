@@ -0,0 +1,123 @@
+"""Figures des pages d'exploration, construites à la demande et gardées dans le cache de figures.
+
+Chaque fonction reçoit l'état des filtres de la page et retourne la figure Plotly, relue
+de `outer_planets.figure_cache` quand elle y est déjà : les données ne sont filtrées et
+la figure construite qu'en cas d'absence. Les mêmes fonctions servent aux pages et au
+précalcul du déploiement (`python -m outer_planets.figure_cache --warm`).
+"""
+from dataclasses import replace
+
+import plotly.express as px
+
+from outer_planets.data import GOLDILOCK_ZONE_CSV, dataset_version, load_dataset
+from outer_planets.figure_cache import cached_figure
+from outer_planets.filters import HZ_CLASS, HZ_COLORS
+from outer_planets.histograms import cached_histogram, histogram_figure
+from outer_planets.host_index import host_index
+from outer_planets.quality import HOT_STAR, WIDE_ORBIT
+from outer_planets.scatter import scatter_figure
+
+# Valeur par défaut (et maximale) du curseur des périodes orbitales de la page 5
+MAX_ORBITAL_PERIOD = 50000
+SCATTER_LABELS = {'Orbit Semi-Major Axis': 'Orbit Semi-Major Axis', 'Equilibrium Temperature': 'Equilibrium Temperature'}
+
+
+def _histogram_figure(page, name, spec, x, title, path, cache):
+    def build():
+        data = host_index(path).filter(spec)
+        histogram = cached_histogram((dataset_version(path), spec), data, x, color=HZ_CLASS)
+        return histogram_figure(histogram, title=title, color_discrete_map=HZ_COLORS)
+    return cached_figure(page, {'figure': name, 'spec': spec}, build, path=path, cache=cache)
+
+
+def host_types_figure(spec, path=GOLDILOCK_ZONE_CSV, cache=None):
+    return _histogram_figure('host_stars', 'host_types', spec, 'Spectral Type',
+                             'Distribution des Types Spectraux des Étoiles Hôtes', path, cache)
+
+
+def stellar_temperature_figure(spec, path=GOLDILOCK_ZONE_CSV, cache=None):
+    return _histogram_figure('host_stars', 'stellar_temperature', replace(spec, exclude=HOT_STAR),
+                             'Stellar Effective Temperature', 'Distribution des Températures des Étoiles Hôtes',
+                             path, cache)
+
+
+def orbital_periods_figure(spec, max_orbital_period=MAX_ORBITAL_PERIOD, path=GOLDILOCK_ZONE_CSV, cache=None):
+    return _histogram_figure('exoplanet_features', 'orbital_periods',
+                             replace(spec, max_orbital_period=max_orbital_period), 'Orbital Period Days',
+                             f'Distribution des Périodes Orbitales des Exoplanètes (jusqu\'à {max_orbital_period} '
+                             f'jours)', path, cache)
+
+
+def distances_figure(spec, path=GOLDILOCK_ZONE_CSV, cache=None):
+    return _histogram_figure('exoplanet_features', 'distances', replace(spec, exclude=WIDE_ORBIT),
+                             'Orbit Semi-Major Axis', 'Distribution des Distances des Exoplanètes', path, cache)
+
+
+def eccentricity_figure(spec, path=GOLDILOCK_ZONE_CSV, cache=None):
+    return _histogram_figure('exoplanet_features', 'eccentricity', spec, 'Eccentricity',
+                             'Distribution de l\'Excentricité des Orbites des Exoplanètes', path, cache)
+
+
+# Figures des pages 4 et 5, qui ne dépendent que du système et de la case « zone habitable »
+HOST_FIGURES = {
+    'host_types': host_types_figure,
+    'stellar_temperature': stellar_temperature_figure,
+    'orbital_periods': orbital_periods_figure,
+    'distances': distances_figure,
+    'eccentricity': eccentricity_figure,
+}
+
+
+def _model_key(path):
+    from outer_planets.models import artifact_key, current_params
+
+    # Artefact des modèles servis par la page : une figure qui en dépend change de clé quand on réentraîne
+    return artifact_key(path, current_params())
+
+
+def _clustered(path):
+    from outer_planets.clustering import align_labels
+    from outer_planets.models import goldilock_models
+
+    # Planètes dont toutes les caractéristiques de clustering sont renseignées, avec leur cluster
+    data = load_dataset(path)
+    clusters = align_labels(goldilock_models(path), data)
+    return data[clusters >= 0].assign(Cluster=clusters[clusters >= 0])
+
+
+def clusters_figure(x_range=None, y_range=None, path=GOLDILOCK_ZONE_CSV, cache=None):
+    def build():
+        clustered = _clustered(path)
+        return scatter_figure(clustered[clustered['Orbit Semi-Major Axis'] <= 8], x='Orbit Semi-Major Axis',
+                              y='Equilibrium Temperature', color='Cluster', x_range=x_range, y_range=y_range,
+                              hover_data=['Planet Name'], title='Clustering des Exoplanètes', labels=SCATTER_LABELS)
+    return cached_figure('goldilock_zone', {'figure': 'clusters', 'model': _model_key(path),
+                                            'x_range': x_range, 'y_range': y_range}, build, path=path, cache=cache)
+
+
+def goldilocks_figure(x_range=None, y_range=None, path=GOLDILOCK_ZONE_CSV, cache=None):
+    def build():
+        clustered = _clustered(path)
+        return scatter_figure(clustered[clustered['In Goldilock Zone'] == 1], x='Orbit Semi-Major Axis',
+                              y='Equilibrium Temperature', color='Cluster', x_range=x_range, y_range=y_range,
+                              hover_data=['Planet Name'], title='Planètes dans la Goldilock Zone',
+                              labels=SCATTER_LABELS)
+    return cached_figure('goldilock_zone', {'figure': 'goldilocks', 'model': _model_key(path),
+                                            'x_range': x_range, 'y_range': y_range}, build, path=path, cache=cache)
+
+
+def coefficients_figure(path=GOLDILOCK_ZONE_CSV, cache=None):
+    def build():
+        from outer_planets.models import goldilock_models
+
+        coefficients = goldilock_models(path)['coefficients']
+        return px.bar(x=coefficients['Feature'], y=coefficients['Coefficient'],
+                      labels={'x': 'Feature', 'y': 'Coefficient'}, title="Coefficients de régression")
+    return cached_figure('goldilock_zone', {'figure': 'coefficients', 'model': _model_key(path)}, build, path=path,
+                         cache=cache)
+
+
+def goldilock_zone_figures(path=GOLDILOCK_ZONE_CSV, cache=None):
+    """Figures de la page Goldilock Zone sans sélection."""
+    return [clusters_figure(path=path, cache=cache), goldilocks_figure(path=path, cache=cache),
+            coefficients_figure(path=path, cache=cache)]
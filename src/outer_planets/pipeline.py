@@ -0,0 +1,216 @@
+"""Pipeline incrémental des données dérivées.
+
+Les étapes sont déclarées une fois (`STAGES`) :
+
+    raw + solar_system -> with_solar_system -> goldilock_zone -> clusters -> model_features
+                                                              -> quarantine
+
+Pour chaque étape, le manifeste `data/derived/manifest.json` garde l'empreinte de
+ses entrées (hash du contenu des fichiers en amont, paramètres, version du code) et
+le hash de sa sortie. Une étape n'est recalculée que si cette empreinte a changé ou
+si sa sortie a disparu / été modifiée à la main, et un fichier n'est réécrit que si
+son contenu change réellement.
+
+Utilisation, depuis la racine du projet :
+
+    PYTHONPATH=src python -m outer_planets.pipeline [--force] [--dry-run]
+"""
+import argparse
+import hashlib
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+
+from outer_planets.data import DATA_DIR, EXOPLANETS_CSV, GOLDILOCK_ZONE_CSV, SOLAR_SYSTEM_CSV
+from outer_planets.habitability import ESI, earth_similarity
+from outer_planets.habitable_zone import in_habitable_zone
+
+DERIVED_DIR = DATA_DIR / 'derived'
+MANIFEST_PATH = DERIVED_DIR / 'manifest.json'
+
+CLUSTER_FEATURES = ['Orbital Period Days', 'Orbit Semi-Major Axis', 'Insolation Flux', 'Equilibrium Temperature',
+                    'Stellar Effective Temperature', 'Stellar Radius', 'Stellar Mass']
+CLASSIFIER_FEATURES = ['Orbit Semi-Major Axis', 'Stellar Effective Temperature', 'Stellar Radius']
+
+# Fichiers sources, non produits par le pipeline
+SOURCES = {
+    'raw': EXOPLANETS_CSV,
+    'solar_system': SOLAR_SYSTEM_CSV,
+}
+
+
+@dataclass
+class Stage:
+    name: str
+    func: Callable
+    inputs: list
+    output: Path
+    params: dict = field(default_factory=dict)
+    # À incrémenter quand la logique de `func` change, pour invalider les sorties existantes
+    version: int = 1
+
+
+def merge_solar_system(raw, solar_system):
+    return pd.concat([raw, solar_system], ignore_index=True)
+
+
+def flag_goldilock_zone(with_solar_system, model):
+    # Import local : outer_planets.quality reprend les caractéristiques déclarées ici
+    from outer_planets.quality import QUALITY, quality_flags
+
+    data = with_solar_system.copy()
+    data['In Goldilock Zone'] = in_habitable_zone(data, model=model)
+    data[ESI] = earth_similarity(data).round(4)
+    data[QUALITY] = quality_flags(data)
+    return data
+
+
+def quarantine(goldilock_zone):
+    from outer_planets.quality import quarantine_report
+
+    return quarantine_report(goldilock_zone)
+
+
+def cluster_labels(goldilock_zone, features, n_clusters, random_state):
+    from sklearn.cluster import KMeans
+    from sklearn.preprocessing import StandardScaler
+
+    from outer_planets.quality import complete_rows
+
+    cleaned = goldilock_zone[complete_rows(goldilock_zone, features)]
+    scaled_features = StandardScaler().fit_transform(cleaned[features])
+    kmeans = KMeans(n_clusters=n_clusters, n_init=10, random_state=random_state)
+    return pd.DataFrame({'No.': cleaned['No.'].to_numpy(), 'Cluster': kmeans.fit_predict(scaled_features)})
+
+
+def model_features(goldilock_zone, clusters, features):
+    from outer_planets.quality import complete_rows
+
+    data = goldilock_zone[complete_rows(goldilock_zone, features)][['No.', 'Planet Name'] + features + ['In Goldilock Zone']]
+    return data.merge(clusters, on='No.', how='left').astype({'Cluster': 'Int8'})
+
+
+STAGES = [
+    Stage('with_solar_system', merge_solar_system, ['raw', 'solar_system'],
+          DATA_DIR / 'all_exoplanets_with_solar_system.csv'),
+    Stage('goldilock_zone', flag_goldilock_zone, ['with_solar_system'], GOLDILOCK_ZONE_CSV,
+          params={'model': 'luminosity'}, version=3),
+    Stage('quarantine', quarantine, ['goldilock_zone'], DERIVED_DIR / 'quarantine.csv'),
+    Stage('clusters', cluster_labels, ['goldilock_zone'], DERIVED_DIR / 'clusters.csv',
+          params={'features': CLUSTER_FEATURES, 'n_clusters': 5, 'random_state': 42}),
+    Stage('model_features', model_features, ['goldilock_zone', 'clusters'], DERIVED_DIR / 'model_features.csv',
+          params={'features': CLASSIFIER_FEATURES}),
+]
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _relative(path):
+    return Path(path).resolve().relative_to(DATA_DIR.parent).as_posix()
+
+
+class Manifest:
+    """Hashs des fichiers suivis et empreintes des étapes, persistés en JSON.
+
+    Le manifeste ne contient que des hashs de contenu : il ne change pas quand un fichier est recopié ou régénéré à
+    l'identique (checkout, reconstruction).
+    """
+
+    def __init__(self, path=MANIFEST_PATH):
+        self.path = Path(path)
+        content = json.loads(self.path.read_text()) if self.path.exists() else {}
+        self.files = {}
+        self.stages = content.get('stages', {})
+        # Hashs déjà calculés pendant cette exécution, par taille et date de modification (jamais enregistrés)
+        self._hashes = {}
+
+    def content_hash(self, path):
+        """Hash du contenu du fichier, calculé une fois par exécution tant que le fichier ne change pas."""
+        stat = Path(path).stat()
+        key = (_relative(path), stat.st_size, stat.st_mtime_ns)
+        if key not in self._hashes:
+            self._hashes[key] = file_hash(path)
+        self.files[key[0]] = self._hashes[key]
+        return self._hashes[key]
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps({'files': self.files, 'stages': self.stages}, indent=2, sort_keys=True))
+        tmp_path.replace(self.path)
+
+
+def _fingerprint(stage, input_hashes):
+    payload = json.dumps({'inputs': input_hashes, 'params': stage.params, 'version': stage.version},
+                         sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _write_if_changed(df, path):
+    """Écrit `df` en CSV, sauf si le fichier existant a déjà exactement ce contenu."""
+    content = df.to_csv(index=False).encode()
+    if path.exists() and path.read_bytes() == content:
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix('.tmp')
+    tmp_path.write_bytes(content)
+    tmp_path.replace(path)
+    return True
+
+
+def run(stages=STAGES, force=False, dry_run=False, manifest=None):
+    """Exécute les étapes dont les entrées ont changé et retourne leur statut par étape."""
+    manifest = manifest or Manifest()
+    paths = {name: Path(path) for name, path in SOURCES.items()}
+    paths.update({stage.name: stage.output for stage in stages})
+    status = {}
+
+    for stage in stages:
+        if any(status.get(name) == 'stale' for name in stage.inputs):
+            # Seulement en --dry-run : une entrée en amont serait recalculée, donc celle-ci aussi
+            status[stage.name] = 'stale'
+            continue
+        input_hashes = {name: manifest.content_hash(paths[name]) for name in stage.inputs}
+        fingerprint = _fingerprint(stage, input_hashes)
+        recorded = manifest.stages.get(stage.name, {})
+        up_to_date = (not force and recorded.get('fingerprint') == fingerprint and stage.output.exists()
+                      and manifest.content_hash(stage.output) == recorded.get('output_sha256'))
+        if up_to_date:
+            status[stage.name] = 'up to date'
+            continue
+        if dry_run:
+            status[stage.name] = 'stale'
+            continue
+
+        inputs = [pd.read_csv(paths[name]) for name in stage.inputs]
+        written = _write_if_changed(stage.func(*inputs, **stage.params), stage.output)
+        manifest.stages[stage.name] = {'fingerprint': fingerprint, 'output': _relative(stage.output),
+                                       'output_sha256': manifest.content_hash(stage.output)}
+        status[stage.name] = 'rebuilt' if written else 'unchanged'
+
+    if not dry_run:
+        manifest.save()
+    return status
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Met à jour les données dérivées de data/.")
+    parser.add_argument('--force', action='store_true', help="recalcule toutes les étapes")
+    parser.add_argument('--dry-run', action='store_true', help="affiche les étapes à recalculer sans les exécuter")
+    args = parser.parse_args(argv)
+
+    for name, stage_status in run(force=args.force, dry_run=args.dry_run).items():
+        print(f"{name}: {stage_status}")
+
+
+if __name__ == '__main__':
+    main()
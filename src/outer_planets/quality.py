@@ -0,0 +1,185 @@
+"""Contrôle qualité des lignes du catalogue, calculé une fois à l'ingestion.
+
+Chaque planète reçoit un masque de bits (`QUALITY`, entier 16 bits) qui résume les
+conditions testées jusqu'ici à chaque réexécution des pages et des scripts :
+
+- caractéristiques manquantes pour le clustering, le classifieur ou `training.py` ;
+- orbite trop excentrique pour rester dans la zone habitable (`MAX_ECCENTRICITY`) ;
+- étoile plus chaude que `MAX_STELLAR_TEMPERATURE`, orbite plus large que
+  `MAX_SEMI_MAJOR_AXIS` (bornes des histogrammes des pages 4 et 5) ;
+- défauts de saisie (`QUARANTINE`) : nom ou étoile hôte manquant, nom en double,
+  valeur physique impossible. Ces lignes sont listées dans le rapport de quarantaine.
+
+Le pipeline ajoute la colonne à l'étape `goldilock_zone` ; un sous-ensemble valide se
+sélectionne ensuite par un seul test bit à bit (`valid_rows`, `FilterSpec.exclude`).
+Sur un tableau sans la colonne (catalogue brut, lot en streaming), seuls les bits
+demandés sont calculés.
+
+Utilisation, depuis la racine du projet :
+
+    PYTHONPATH=src python -m outer_planets.quality
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from outer_planets.data import GOLDILOCK_ZONE_CSV, load_dataset
+from outer_planets.pipeline import CLASSIFIER_FEATURES, CLUSTER_FEATURES
+
+QUALITY = 'Quality'
+
+TRAINING_COLUMNS = ['Planet Name', 'Planet Host', 'Orbital Period Days', 'Orbit Semi-Major Axis',
+                    'Stellar Effective Temperature', 'Equilibrium Temperature', 'Insolation Flux']
+# Colonnes qui doivent être strictement positives quand elles sont renseignées
+POSITIVE_COLUMNS = ['Orbital Period Days', 'Orbit Semi-Major Axis', 'Mass', 'Stellar Effective Temperature',
+                    'Stellar Radius', 'Stellar Mass', 'Distance']
+
+# Au-delà, l'orbite s'éloigne trop de la zone habitable pour que la planète y reste
+MAX_ECCENTRICITY = 0.6
+MAX_STELLAR_TEMPERATURE = 15000
+MAX_SEMI_MAJOR_AXIS = 400
+
+INCOMPLETE_CLUSTER = 1 << 0
+INCOMPLETE_CLASSIFIER = 1 << 1
+INCOMPLETE_TRAINING = 1 << 2
+ECCENTRIC = 1 << 3
+HOT_STAR = 1 << 4
+WIDE_ORBIT = 1 << 5
+MISSING_NAME = 1 << 8
+DUPLICATE_NAME = 1 << 9
+NON_PHYSICAL = 1 << 10
+
+QUARANTINE = MISSING_NAME | DUPLICATE_NAME | NON_PHYSICAL
+
+# Caractéristiques dont l'absence d'une seule valeur lève le bit correspondant
+COMPLETENESS = {
+    INCOMPLETE_CLUSTER: CLUSTER_FEATURES,
+    INCOMPLETE_CLASSIFIER: CLASSIFIER_FEATURES,
+    INCOMPLETE_TRAINING: TRAINING_COLUMNS,
+}
+
+FLAG_LABELS = {
+    INCOMPLETE_CLUSTER: 'caractéristiques de clustering manquantes',
+    INCOMPLETE_CLASSIFIER: 'caractéristiques du classifieur manquantes',
+    INCOMPLETE_TRAINING: 'colonnes de training.py manquantes',
+    ECCENTRIC: f'excentricité > {MAX_ECCENTRICITY}',
+    HOT_STAR: f'étoile > {MAX_STELLAR_TEMPERATURE} K',
+    WIDE_ORBIT: f'demi-grand axe > {MAX_SEMI_MAJOR_AXIS} UA',
+    MISSING_NAME: 'nom ou étoile hôte manquant',
+    DUPLICATE_NAME: 'nom en double',
+    NON_PHYSICAL: 'valeur physique impossible',
+}
+
+
+def _numeric(data, column):
+    # Quelques valeurs saisies à la main sont mal formées : elles comptent comme manquantes
+    return pd.to_numeric(data[column], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _above(data, column, limit):
+    with np.errstate(invalid='ignore'):
+        return _numeric(data, column) > limit
+
+
+def _missing_name(data):
+    return data[['Planet Name', 'Planet Host']].isna().any(axis=1).to_numpy()
+
+
+def _duplicate_name(data):
+    names = data['Planet Name']
+    return (names.duplicated(keep='first') & names.notna()).to_numpy()
+
+
+def _non_physical(data):
+    with np.errstate(invalid='ignore'):
+        invalid = np.zeros(len(data), dtype=bool)
+        for column in POSITIVE_COLUMNS:
+            if column in data.columns:
+                invalid |= _numeric(data, column) <= 0
+        if 'Eccentricity' in data.columns:
+            eccentricity = _numeric(data, 'Eccentricity')
+            invalid |= (eccentricity < 0) | (eccentricity >= 1)
+    return invalid
+
+
+CHECKS = {
+    **{flag: lambda data, columns=columns: data[columns].isna().any(axis=1).to_numpy()
+       for flag, columns in COMPLETENESS.items()},
+    ECCENTRIC: lambda data: _above(data, 'Eccentricity', MAX_ECCENTRICITY),
+    HOT_STAR: lambda data: _above(data, 'Stellar Effective Temperature', MAX_STELLAR_TEMPERATURE),
+    WIDE_ORBIT: lambda data: _above(data, 'Orbit Semi-Major Axis', MAX_SEMI_MAJOR_AXIS),
+    MISSING_NAME: _missing_name,
+    DUPLICATE_NAME: _duplicate_name,
+    NON_PHYSICAL: _non_physical,
+}
+ALL_FLAGS = sum(CHECKS)
+
+
+def quality_flags(data, flags=ALL_FLAGS):
+    """Masque de bits de chaque ligne de `data`, limité aux bits de `flags`."""
+    quality = np.zeros(len(data), dtype=np.uint16)
+    for flag, check in CHECKS.items():
+        if flag & flags:
+            quality[check(data)] |= flag
+    return quality
+
+
+def flagged(data, flags):
+    """Lignes dont au moins un des bits de `flags` est levé (colonne `QUALITY`, ou calculé à défaut)."""
+    if QUALITY in data.columns:
+        quality = data[QUALITY].to_numpy(dtype=np.uint16, na_value=0)
+    else:
+        quality = quality_flags(data, flags)
+    return (quality & flags) != 0
+
+
+def valid_rows(data, flags):
+    """Lignes dont aucun des bits de `flags` n'est levé."""
+    return ~flagged(data, flags)
+
+
+def complete_rows(data, features):
+    """Lignes dont toutes les `features` sont renseignées : un test bit à bit quand un bit de `COMPLETENESS`
+    couvre exactement ces colonnes, sinon un test des valeurs manquantes."""
+    for flag, columns in COMPLETENESS.items():
+        if set(columns) == set(features):
+            return valid_rows(data, flag)
+    return data[features].notna().all(axis=1).to_numpy()
+
+
+def describe(quality):
+    """Libellé des bits levés d'un masque."""
+    return ', '.join(label for flag, label in FLAG_LABELS.items() if quality & flag)
+
+
+def quarantine_report(data):
+    """Lignes en quarantaine de `data` et la raison de chacune."""
+    quality = data[QUALITY].to_numpy(dtype=np.uint16) if QUALITY in data.columns else quality_flags(data)
+    quarantined = np.flatnonzero(quality & QUARANTINE)
+    report = data.iloc[quarantined][['No.', 'Planet Name', 'Planet Host']].reset_index(drop=True)
+    report[QUALITY] = quality[quarantined]
+    report['Issues'] = [describe(value & QUARANTINE) for value in quality[quarantined]]
+    return report
+
+
+def flag_counts(quality):
+    """Nombre de lignes de chaque bit, par libellé."""
+    quality = np.asarray(quality, dtype=np.uint16)
+    return {label: int(np.count_nonzero(quality & flag)) for flag, label in FLAG_LABELS.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Résumé du contrôle qualité du catalogue.")
+    parser.add_argument('--path', default=GOLDILOCK_ZONE_CSV, help="catalogue à contrôler")
+    args = parser.parse_args(argv)
+
+    data = load_dataset(args.path)
+    quality = data[QUALITY].to_numpy(dtype=np.uint16) if QUALITY in data.columns else quality_flags(data)
+    for label, count in flag_counts(quality).items():
+        print(f"{label:<45}{count:>8}")
+    print(f"{'en quarantaine':<45}{np.count_nonzero(quality & QUARANTINE):>8}")
+
+
+if __name__ == '__main__':
+    main()
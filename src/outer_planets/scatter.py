@@ -0,0 +1,77 @@
+"""Nuages de points WebGL sous-échantillonnés côté serveur.
+
+Au-delà de `MAX_POINTS` points, le plan est découpé en une grille et une seule planète
+représentative est gardée par case et par couleur, avec le nombre de planètes qu'elle
+représente (colonne `Points`). Le sous-échantillonnage est vectorisé (`np.unique` sur les
+identifiants de case) et les points sont tracés en WebGL (`scattergl`). Sur une zone
+sélectionnée (sélection rectangulaire), la grille est recalculée sur cette zone seulement :
+dès qu'elle contient moins de `MAX_POINTS` planètes, toutes sont affichées.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+MAX_POINTS = 5000
+POINTS = 'Points'
+
+
+def _grid_cells(values, value_range, grid_size):
+    low, high = value_range
+    scale = grid_size / (high - low) if high > low else 0.0
+    return np.clip(((values - low) * scale).astype(np.int64), 0, grid_size - 1)
+
+
+def downsample(data, x, y, color=None, max_points=MAX_POINTS, x_range=None, y_range=None):
+    """Planètes de `data` dans la zone `x_range` × `y_range`, réduites à environ `max_points` points.
+
+    Renvoie un sous-ensemble des lignes avec une colonne `Points` (nombre de planètes représentées)
+    et le nombre total de planètes dans la zone.
+    """
+    x_values = data[x].to_numpy(dtype=np.float64, na_value=np.nan)
+    y_values = data[y].to_numpy(dtype=np.float64, na_value=np.nan)
+    keep = np.isfinite(x_values) & np.isfinite(y_values)
+    for values, value_range in ((x_values, x_range), (y_values, y_range)):
+        if value_range is not None:
+            keep &= (values >= value_range[0]) & (values <= value_range[1])
+    rows = np.flatnonzero(keep)
+    if len(rows) <= max_points:
+        return data.iloc[rows].assign(**{POINTS: 1}), len(rows)
+
+    x_values, y_values = x_values[rows], y_values[rows]
+    if color is None:
+        codes, n_colors = np.zeros(len(rows), dtype=np.int64), 1
+    else:
+        codes, labels = pd.factorize(data[color].iloc[rows])
+        n_colors = max(len(labels), 1)
+    # Grille carrée dimensionnée pour rester sous le budget de points, toutes couleurs confondues
+    grid_size = max(int(math.sqrt(max_points / n_colors)), 1)
+    cells = (codes * grid_size + _grid_cells(x_values, x_range or (x_values.min(), x_values.max()), grid_size)) \
+        * grid_size + _grid_cells(y_values, y_range or (y_values.min(), y_values.max()), grid_size)
+    _, first, counts = np.unique(cells, return_index=True, return_counts=True)
+    return data.iloc[rows[first]].assign(**{POINTS: counts}), len(rows)
+
+
+def selection_ranges(state):
+    """Zone `(x_range, y_range)` de la dernière sélection rectangulaire d'un `st.plotly_chart`, sinon `(None, None)`."""
+    boxes = ((state or {}).get('selection') or {}).get('box') or []
+    if not boxes:
+        return None, None
+    box = boxes[-1]
+    return tuple(sorted(box['x'])), tuple(sorted(box['y']))
+
+
+def scatter_figure(data, x, y, color=None, max_points=MAX_POINTS, x_range=None, y_range=None,
+                   hover_data=None, title=None, **kwargs):
+    """`px.scatter` en WebGL sur les planètes de la zone, sous-échantillonnées si elles sont trop nombreuses."""
+    sample, total = downsample(data, x, y, color, max_points, x_range, y_range)
+    if len(sample) < total:
+        hover_data = list(hover_data or []) + [POINTS]
+        title = f"{title} ({len(sample)} points représentant {total} planètes, sélectionnez une zone pour le détail)"
+    fig = px.scatter(sample, x=x, y=y, color=color, hover_data=hover_data, title=title, render_mode='webgl', **kwargs)
+    if x_range is not None:
+        fig.update_xaxes(range=list(x_range))
+    if y_range is not None:
+        fig.update_yaxes(range=list(y_range))
+    return fig
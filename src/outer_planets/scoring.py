@@ -0,0 +1,199 @@
+"""Classification en lot de catalogues externes par un modèle Goldilock enregistré.
+
+Le modèle est soit celui de la page Goldilock Zone (`goldilock`, artefact de
+`outer_planets.models` pour le jeu de données courant), soit un fichier `model.pkl`
+écrit par `training.py`. Le catalogue d'entrée (CSV ou Feather) est lu par morceaux
+(`outer_planets.streaming.iter_chunks`) : seules les caractéristiques du modèle sont
+envoyées aux processus, qui chargent le modèle une fois chacun, et au plus
+`2 × jobs` morceaux sont en cours à la fois. La mémoire reste donc bornée quelle que
+soit la taille du fichier, et les résultats sont écrits dans l'ordre des lignes au fur
+et à mesure, en CSV ou en Feather selon l'extension de la sortie.
+
+Les planètes dont une caractéristique manque ne sont pas classées (prédiction et
+probabilité vides).
+
+Utilisation, depuis la racine du projet :
+
+    PYTHONPATH=src python -m outer_planets.scoring data/test_planets1.csv [--output data/scores/test_planets1.csv]
+        [--model goldilock | data/training/model.pkl] [--jobs 4] [--chunksize 100000]
+"""
+import argparse
+import os
+import pickle
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from outer_planets.data import DATA_DIR
+from outer_planets.streaming import DEFAULT_CHUNKSIZE, head, iter_chunks
+
+SCORES_DIR = DATA_DIR / 'scores'
+PREDICTION = 'Predicted Goldilock Zone'
+PROBABILITY = 'P(Predicted Goldilock Zone)'
+# Colonnes d'identification recopiées de l'entrée, quand elles y sont
+KEY_COLUMNS = ['No.', 'Planet Name', 'Planet Host']
+REPORT_EVERY = 10
+
+
+def load_model(source='goldilock'):
+    """Estimateur et caractéristiques du modèle `source` : 'goldilock' ou le chemin d'un `model.pkl` de training.py."""
+    if source == 'goldilock':
+        from outer_planets.models import current_params, load_or_fit
+
+        artifact = load_or_fit(params=current_params())
+        return {'model': artifact['classifier'], 'features': artifact['params']['classifier_features']}
+    with open(source, 'rb') as f:
+        saved = pickle.load(f)
+    return {'model': saved['model'], 'features': list(saved['features'])}
+
+
+# Modèle d'un processus de classification, envoyé une fois par le pool
+_worker_model = {}
+
+
+def _init_worker(model_bytes):
+    model = pickle.loads(model_bytes)
+    if hasattr(model['model'], 'n_jobs'):
+        # Un cœur par processus : le pool occupe déjà toute la machine
+        model['model'].n_jobs = 1
+    _worker_model.update(model)
+
+
+def score_chunk(X):
+    """Prédiction (0/1, -1 si non classée) et probabilité (NaN si non classée) des lignes de `X`."""
+    model, features = _worker_model['model'], _worker_model['features']
+    complete = ~np.isnan(X).any(axis=1)
+    prediction = np.full(len(X), -1, dtype=np.int8)
+    probability = np.full(len(X), np.nan)
+    if complete.any():
+        probabilities = model.predict_proba(pd.DataFrame(X[complete], columns=features))
+        positive = list(model.classes_).index(1)
+        probability[complete] = probabilities[:, positive]
+        prediction[complete] = model.classes_[probabilities.argmax(axis=1)]
+    return prediction, probability
+
+
+def _results(keys, prediction, probability):
+    results = keys.reset_index(drop=True)
+    results[PREDICTION] = pd.array(np.where(prediction < 0, None, prediction), dtype='Int8')
+    results[PROBABILITY] = probability
+    return results
+
+
+class CsvWriter:
+    def __init__(self, path):
+        self.f = open(path, 'w', newline='')
+        self.header = True
+
+    def write(self, results):
+        results.to_csv(self.f, index=False, header=self.header)
+        self.header = False
+
+    def close(self):
+        self.f.close()
+
+
+class FeatherWriter:
+    """Fichier Feather (format Arrow IPC) écrit morceau par morceau, au schéma du premier morceau."""
+
+    def __init__(self, path):
+        self.path = path
+        self.writer = None
+
+    def write(self, results):
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(results, preserve_index=False)
+        if self.writer is None:
+            self.schema = table.schema
+            self.writer = pa.ipc.new_file(str(self.path), self.schema)
+        self.writer.write_table(table.cast(self.schema))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def score_file(input_path, output_path, model, jobs=None, chunksize=DEFAULT_CHUNKSIZE, log=sys.stderr):
+    """Classe toutes les lignes de `input_path` et écrit le résultat dans `output_path` ; retourne le nombre de
+    lignes lues et de lignes classées."""
+    features = model['features']
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    # Écriture dans un fichier temporaire puis renommage : un lecteur ne voit jamais de fichier partiel
+    tmp_path = output_path.with_suffix(output_path.suffix + '.tmp')
+    writer = (FeatherWriter if output_path.suffix == '.feather' else CsvWriter)(tmp_path)
+    jobs = jobs or os.cpu_count()
+    model_bytes = pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)
+    rows = scored = n_chunks = 0
+    start = time.perf_counter()
+
+    def report():
+        elapsed = time.perf_counter() - start
+        print(f"{rows} lignes ({scored} classées) en {elapsed:.2f} s, {rows / max(elapsed, 1e-9):.0f} lignes/s",
+              file=log)
+
+    def collect(keys, result):
+        nonlocal rows, scored, n_chunks
+        prediction, probability = result
+        writer.write(_results(keys, prediction, probability))
+        rows += len(prediction)
+        scored += int((prediction >= 0).sum())
+        n_chunks += 1
+        if n_chunks % REPORT_EVERY == 0:
+            report()
+
+    chunks = ((chunk[[c for c in KEY_COLUMNS if c in chunk.columns]],
+               chunk[features].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan))
+              for chunk in iter_chunks(input_path, chunksize=chunksize))
+    try:
+        if jobs <= 1:
+            _init_worker(model_bytes)
+            for keys, X in chunks:
+                collect(keys, score_chunk(X))
+        else:
+            with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(model_bytes,)) as pool:
+                # Au plus 2 morceaux en attente par processus : la lecture ne prend pas d'avance sur le calcul
+                pending = deque()
+                for keys, X in chunks:
+                    pending.append((keys, pool.submit(score_chunk, X)))
+                    if len(pending) >= 2 * jobs:
+                        keys, future = pending.popleft()
+                        collect(keys, future.result())
+                while pending:
+                    keys, future = pending.popleft()
+                    collect(keys, future.result())
+    finally:
+        writer.close()
+    tmp_path.replace(output_path)
+    report()
+    return rows, scored
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Classe un catalogue de planètes avec un modèle Goldilock enregistré.")
+    parser.add_argument('input', type=Path, help="catalogue à classer (CSV ou Feather)")
+    parser.add_argument('--output', type=Path,
+                        help="fichier des prédictions, .csv ou .feather (par défaut : data/scores/<entrée>.csv)")
+    parser.add_argument('--model', default='goldilock',
+                        help="'goldilock' (modèle de la page Goldilock Zone) ou chemin d'un model.pkl de training.py")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help="nombre de processus")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help="lignes par morceau")
+    args = parser.parse_args(argv)
+
+    model = load_model(args.model)
+    missing = [feature for feature in model['features'] if feature not in head(args.input, n=1).columns]
+    if missing:
+        parser.error(f"colonnes absentes de {args.input} : {', '.join(missing)}")
+    output = args.output or SCORES_DIR / (args.input.stem + '.csv')
+    rows, scored = score_file(args.input, output, model, jobs=args.jobs, chunksize=args.chunksize)
+    print(f"{scored}/{rows} planètes classées -> {output}")
+
+
+if __name__ == '__main__':
+    main()
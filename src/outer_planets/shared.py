@@ -0,0 +1,123 @@
+"""Jeux de données publiés une fois par machine et partagés par tous les processus.
+
+`publish` écrit chaque colonne d'un jeu de données dans un fichier `.npy` (les colonnes
+textuelles et catégorielles en codes entiers, leurs catégories à part), dans un dossier
+de version `data/shared/<jeu>/<version>/`. Les processus serveur y accèdent par
+memory-map en lecture seule (`attach`) : les pages de toutes les sessions et de tous les
+processus lisent les mêmes pages mémoire, une seule copie du catalogue par machine.
+
+Les lignes sont publiées dans l'ordre du CSV : les artefacts dérivés (modèles, index
+de similarité) sont identifiés par le contenu du CSV et doivent retrouver les mêmes
+lignes, quelle que soit la version lue.
+
+Rafraîchissement : une nouvelle version est écrite à côté de l'ancienne, puis le
+pointeur `CURRENT` est remplacé atomiquement (`os.replace`). `data.resolve_source`
+renvoie ce pointeur tant qu'il est plus récent que le CSV : sa date de modification fait
+partie de `dataset_version`, donc chaque processus bascule sur la nouvelle version à sa
+prochaine lecture, et les caches dérivés (index, histogrammes, modèles) suivent. Les
+anciennes versions sont supprimées au-delà de `--keep` ; un processus qui les lit encore
+garde ses fichiers ouverts (memory-map) jusqu'à sa bascule.
+
+Utilisation, depuis la racine du projet :
+
+    PYTHONPATH=src python -m outer_planets.shared [--keep 2] [csv ...]
+"""
+import argparse
+import os
+import pickle
+import shutil
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from outer_planets.data import DATA_DIR, load_dataset
+
+SHARED_DIR = DATA_DIR / 'shared'
+POINTER = 'CURRENT'
+SCHEMA = 'schema.pkl'
+# Jeux de données publiés par défaut
+SOURCES = ['all_exoplanets_2021.csv', 'all_exoplanets_with_goldilock_zone.csv', 'solar_system.csv']
+
+
+def pointer_path(csv_path):
+    """Pointeur vers la version publiée courante d'un CSV de `data/`."""
+    return SHARED_DIR / Path(csv_path).stem / POINTER
+
+
+def _write_columns(data, directory):
+    schema = []
+    for i, (name, column) in enumerate(data.items()):
+        if isinstance(column.dtype, pd.CategoricalDtype) or column.dtype == object:
+            column = column.astype('category')
+            np.save(directory / f'{i}.npy', column.cat.codes.to_numpy())
+            schema.append((name, 'category', list(column.cat.categories)))
+        elif isinstance(column.array, pd.arrays.IntegerArray):
+            # Entiers nullables : valeurs et masque des valeurs manquantes
+            np.save(directory / f'{i}.npy', column.to_numpy(dtype=column.dtype.numpy_dtype, na_value=0))
+            np.save(directory / f'{i}.mask.npy', column.isna().to_numpy())
+            schema.append((name, 'integer', None))
+        else:
+            np.save(directory / f'{i}.npy', column.to_numpy())
+            schema.append((name, 'numpy', None))
+    with open(directory / SCHEMA, 'wb') as f:
+        pickle.dump(schema, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def publish(csv_path, keep=2):
+    """Publie la version courante de `csv_path` et bascule le pointeur dessus ; retourne le dossier écrit."""
+    csv_path = Path(csv_path).resolve()
+    data = load_dataset(csv_path)
+    dataset_dir = SHARED_DIR / csv_path.stem
+    version = f'{time.time_ns()}-{os.getpid()}'
+    # Écriture dans un dossier temporaire puis renommage : une version visible est toujours complète
+    tmp_dir = dataset_dir / f'.{version}.tmp'
+    tmp_dir.mkdir(parents=True)
+    _write_columns(data, tmp_dir)
+    tmp_dir.rename(dataset_dir / version)
+
+    pointer = pointer_path(csv_path)
+    tmp_pointer = pointer.with_suffix('.tmp')
+    tmp_pointer.write_text(version)
+    tmp_pointer.replace(pointer)
+
+    versions = sorted(p for p in dataset_dir.iterdir() if p.is_dir() and not p.name.startswith('.'))
+    for old in versions[:-keep]:
+        shutil.rmtree(old, ignore_errors=True)
+    return dataset_dir / version
+
+
+def attach(pointer):
+    """DataFrame en lecture seule sur la version pointée par `pointer`, sans copie des colonnes."""
+    pointer = Path(pointer)
+    directory = pointer.parent / pointer.read_text().strip()
+    with open(directory / SCHEMA, 'rb') as f:
+        schema = pickle.load(f)
+    columns = {}
+    for i, (name, kind, extra) in enumerate(schema):
+        values = np.load(directory / f'{i}.npy', mmap_mode='r')
+        if kind == 'category':
+            columns[name] = pd.Categorical.from_codes(values, categories=extra, validate=False)
+        elif kind == 'integer':
+            columns[name] = pd.arrays.IntegerArray(values, np.load(directory / f'{i}.mask.npy', mmap_mode='r'))
+        else:
+            columns[name] = values
+    return pd.DataFrame(columns, copy=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Publie les jeux de données de data/ en mémoire partagée.")
+    parser.add_argument('csv', nargs='*', help="CSV à publier (par défaut : les jeux de données des pages)")
+    parser.add_argument('--keep', type=int, default=2, help="nombre de versions gardées par jeu de données")
+    args = parser.parse_args(argv)
+
+    for csv_path in args.csv or [DATA_DIR / name for name in SOURCES]:
+        start = time.perf_counter()
+        directory = publish(csv_path, keep=args.keep)
+        size = sum(p.stat().st_size for p in directory.iterdir())
+        print(f"{csv_path} -> {directory} ({size / 2**20:.1f} Mo, {time.perf_counter() - start:.2f} s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,268 @@
+"""Index des planètes similaires, généralisation du cas d'étude de la page 5.
+
+Chaque planète est décrite par son orbite et son étoile (`FEATURES`), en logarithme
+puis normalisées : la distance euclidienne entre deux planètes mesure alors leur
+ressemblance, sans qu'une caractéristique n'écrase les autres par son unité. Un
+KD-tree (`scipy.spatial.cKDTree`) sur ces points répond aux requêtes :
+
+- les k planètes les plus proches d'une planète donnée (`similar`) ;
+- les planètes à moins d'une distance r d'une planète, par exemple la Terre (`within`) ;
+- en lot, la planète la plus proche de chaque planète parmi un sous-ensemble, par
+  exemple les planètes de la zone habitable (`nearest_among`).
+
+Seules les planètes dont toutes les caractéristiques sont renseignées (et positives)
+sont indexées.
+
+L'index est enregistré dans `data/models/`, identifié par le hash du jeu de données.
+Quand les données changent, il est repris du dernier index enregistré (`update`) :
+la normalisation est conservée, les planètes retirées ou modifiées sont marquées
+comme supprimées dans l'arbre et les nouvelles sont gardées à part, cherchées par
+force brute. L'arbre n'est reconstruit que lorsque ces changements dépassent
+`REBUILD_FRACTION` du catalogue.
+
+Utilisation, depuis la racine du projet :
+
+    PYTHONPATH=src python -m outer_planets.similarity [--force] [--full] [--planet "Kepler-442 b"] [-k 10]
+        [--radius 0.5] [--nearest-hz fichier.csv]
+"""
+import argparse
+import functools
+import pickle
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from outer_planets.data import GOLDILOCK_ZONE_CSV, dataset_version, load_dataset
+from outer_planets.models import MODELS_DIR, dataset_hash, save_artifact
+
+KEY = 'Planet Name'
+FEATURES = ['Orbit Semi-Major Axis', 'Orbital Period Days', 'Stellar Effective Temperature', 'Stellar Radius',
+            'Stellar Mass']
+DISTANCE = 'Distance'
+# Part du catalogue (planètes supprimées + nouvelles) au-delà de laquelle `update` reconstruit l'arbre
+REBUILD_FRACTION = 0.05
+
+
+def feature_matrix(data):
+    """Noms et caractéristiques (en log10) des planètes indexables de `data`, avec leurs positions dans `data`."""
+    values = np.column_stack([data[feature].to_numpy(dtype=np.float64, na_value=np.nan) for feature in FEATURES])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values = np.log10(values)
+    rows = np.flatnonzero(np.isfinite(values).all(axis=1))
+    return data[KEY].to_numpy(dtype=object)[rows], values[rows], rows
+
+
+class SimilarityIndex:
+    """KD-tree des planètes normalisées, avec les planètes ajoutées depuis sa construction à part."""
+
+    def __init__(self, data):
+        names, values, rows = feature_matrix(data)
+        self.mean = values.mean(axis=0)
+        self.std = values.std(axis=0)
+        self.std[self.std == 0] = 1
+        self._build(names, self.scale(values), rows)
+
+    def _build(self, names, points, rows):
+        from scipy.spatial import cKDTree
+
+        self.tree = cKDTree(points)
+        self.names = names
+        self.points = points
+        self.rows = rows
+        self.removed = np.zeros(len(names), dtype=bool)
+        self.added_names = names[:0]
+        self.added_points = points[:0]
+        self.added_rows = rows[:0]
+        self._lookup = pd.Index(names)
+
+    def scale(self, values):
+        return (values - self.mean) / self.std
+
+    def __len__(self):
+        return int((~self.removed).sum()) + len(self.added_names)
+
+    def planets(self):
+        """Noms des planètes indexées, triés."""
+        return sorted(np.concatenate([self.names[~self.removed], self.added_names]))
+
+    def update(self, data):
+        """Met l'index à jour pour `data` ; retourne le nombre de planètes retirées ou modifiées et ajoutées."""
+        names, values, rows = feature_matrix(data)
+        points = self.scale(values)
+        # Planètes de l'arbre retrouvées à l'identique dans `data`
+        positions = pd.Index(names).get_indexer(self.names)
+        found = positions >= 0
+        unchanged = found.copy()
+        unchanged[found] = np.isclose(points[positions[found]], self.points[found]).all(axis=1)
+        added = np.ones(len(names), dtype=bool)
+        added[positions[unchanged]] = False
+
+        removed = int((~unchanged).sum())
+        if removed + added.sum() > REBUILD_FRACTION * len(self.names):
+            self.__init__(data)
+        else:
+            # Les planètes supprimées restent dans l'arbre, ignorées par les requêtes
+            self.removed = ~unchanged
+            self.rows = np.where(unchanged, rows[positions], -1)
+            self.added_names, self.added_points, self.added_rows = names[added], points[added], rows[added]
+        return removed, int(added.sum())
+
+    def point(self, planet):
+        """Point normalisé d'une planète indexée (nom) ou de caractéristiques données (dict)."""
+        if not isinstance(planet, str):
+            return self.scale(np.log10([planet[feature] for feature in FEATURES]))
+        i = self._lookup.get_indexer([planet])[0]
+        if i >= 0 and not self.removed[i]:
+            return self.points[i]
+        j = np.flatnonzero(self.added_names == planet)
+        if len(j):
+            return self.added_points[j[0]]
+        raise KeyError(f"{planet} n'est pas indexée (caractéristiques manquantes ?)")
+
+    def query(self, points, k):
+        """Noms, positions et distances des k planètes les plus proches de chaque point (tableaux m x k)."""
+        points = np.atleast_2d(points)
+        k_tree = min(k, len(self.names))
+        while True:
+            distances, indices = self.tree.query(points, k=k_tree, workers=-1)
+            distances, indices = distances.reshape(len(points), -1), indices.reshape(len(points), -1)
+            alive = ~self.removed[indices]
+            # On élargit la recherche tant que des voisins supprimés cachent les k plus proches
+            if alive.sum(axis=1).min() >= k or k_tree == len(self.names):
+                break
+            k_tree = min(2 * k_tree + int(self.removed.sum()), len(self.names))
+        distances = np.where(alive, distances, np.inf)
+        names = self.names[indices]
+        rows = self.rows[indices]
+        if len(self.added_names):
+            added = np.linalg.norm(points[:, None, :] - self.added_points[None, :, :], axis=2)
+            distances = np.hstack([distances, added])
+            names = np.hstack([names, np.broadcast_to(self.added_names, added.shape)])
+            rows = np.hstack([rows, np.broadcast_to(self.added_rows, added.shape)])
+        k = min(k, len(self))
+        nearest = np.argsort(distances, axis=1, kind='stable')[:, :k]
+        take = functools.partial(np.take_along_axis, indices=nearest, axis=1)
+        return take(names), take(rows), take(distances)
+
+    def similar(self, planet, k=10):
+        """Noms, positions et distances des k planètes les plus proches de `planet`, elle exceptée."""
+        names, rows, distances = (values[0] for values in self.query(self.point(planet), k + 1))
+        keep = names != planet
+        return names[keep][:k], rows[keep][:k], distances[keep][:k]
+
+    def within(self, planet, radius):
+        """Noms, positions et distances des planètes à moins de `radius` de `planet` (elle comprise), par distance."""
+        point = self.point(planet)
+        indices = np.asarray(self.tree.query_ball_point(point, radius), dtype=np.intp)
+        indices = indices[~self.removed[indices]]
+        names = np.concatenate([self.names[indices], self.added_names])
+        rows = np.concatenate([self.rows[indices], self.added_rows])
+        distances = np.concatenate([np.linalg.norm(self.points[indices] - point, axis=1),
+                                    np.linalg.norm(self.added_points - point, axis=1)])
+        order = np.argsort(distances, kind='stable')
+        order = order[distances[order] <= radius]
+        return names[order], rows[order], distances[order]
+
+    def nearest_among(self, candidates):
+        """Pour chaque planète indexée, la plus proche parmi `candidates` (noms), elle exceptée."""
+        from scipy.spatial import cKDTree
+
+        names = np.concatenate([self.names[~self.removed], self.added_names])
+        points = np.concatenate([self.points[~self.removed], self.added_points])
+        selected = pd.Index(names).isin(candidates)
+        if selected.sum() < 2:
+            raise ValueError("il faut au moins deux planètes candidates indexées")
+        candidate_names = names[selected]
+        distances, indices = cKDTree(points[selected]).query(points, k=2, workers=-1)
+        # Une planète candidate est sa propre voisine la plus proche : on prend alors la suivante
+        itself = candidate_names[indices[:, 0]] == names
+        nearest = np.where(itself, indices[:, 1], indices[:, 0])
+        return pd.DataFrame({KEY: names, 'Nearest': candidate_names[nearest],
+                             DISTANCE: np.where(itself, distances[:, 1], distances[:, 0])})
+
+
+def index_path(path):
+    return MODELS_DIR / f'similarity_{dataset_hash(path)[:16]}.pkl'
+
+
+def previous_index():
+    """Dernier index enregistré (quel que soit le jeu de données), ou None."""
+    for previous_path in sorted(MODELS_DIR.glob('similarity_*.pkl'), key=lambda p: p.stat().st_mtime_ns, reverse=True):
+        with open(previous_path, 'rb') as f:
+            return pickle.load(f)
+    return None
+
+
+def load_or_build(path=GOLDILOCK_ZONE_CSV, force=False, incremental=True):
+    """Index enregistré pour ce jeu de données, mis à jour depuis le précédent ou construit s'il manque."""
+    path_index = index_path(path)
+    if path_index.exists() and not force:
+        with open(path_index, 'rb') as f:
+            return pickle.load(f)
+    data = load_dataset(path)
+    index = previous_index() if incremental and not force else None
+    if index is None:
+        index = SimilarityIndex(data)
+    else:
+        index.update(data)
+    save_artifact(index, path_index)
+    return index
+
+
+@functools.lru_cache(maxsize=4)
+def _similarity_index(path, version):
+    return load_or_build(path)
+
+
+def similarity_index(path=GOLDILOCK_ZONE_CSV):
+    """Index des planètes similaires de `path`, gardé en mémoire pour la version courante du jeu de données."""
+    return _similarity_index(path, dataset_version(path))
+
+
+def neighbours_table(data, names, rows, distances):
+    """Lignes de `data` des planètes trouvées, avec leur distance, dans l'ordre des résultats.
+
+    Les lignes sont retrouvées par nom et non par `rows` : ces positions sont celles du catalogue sur lequel l'index
+    a été construit, qui peut être rangé autrement que `data`. Une planète absente de `data` est omise.
+    """
+    planets = pd.Index(data[KEY].to_numpy(dtype=object))
+    first = ~planets.duplicated()
+    positions = planets[first].get_indexer(names)
+    found = positions >= 0
+    selected = np.flatnonzero(first)[positions[found]]
+    return data.iloc[selected].assign(**{DISTANCE: np.asarray(distances)[found]})[[KEY, DISTANCE] + FEATURES +
+                                                                                   ['In Goldilock Zone']]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Construit l'index des planètes similaires et l'interroge.")
+    parser.add_argument('--force', action='store_true', help="reconstruit même si l'index existe")
+    parser.add_argument('--full', action='store_true', help="construction complète, sans reprendre l'index précédent")
+    parser.add_argument('--planet', default='Kepler-442 b', help="planète de référence")
+    parser.add_argument('-k', type=int, default=10, help="nombre de planètes similaires affichées")
+    parser.add_argument('--radius', type=float, help="affiche aussi les planètes à moins de cette distance de la Terre")
+    parser.add_argument('--nearest-hz', type=Path,
+                        help="fichier CSV où écrire, pour chaque planète, la plus proche de la zone habitable")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    index = load_or_build(force=args.force, incremental=not args.full)
+    print(f"Index prêt ({len(index)} planètes, {time.perf_counter() - start:.2f} s)")
+    data = load_dataset(GOLDILOCK_ZONE_CSV)
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print(f"\nPlanètes les plus proches de {args.planet} :")
+        print(neighbours_table(data, *index.similar(args.planet, args.k)).to_string(index=False))
+        if args.radius is not None:
+            print(f"\nPlanètes à moins de {args.radius} de la Terre :")
+            print(neighbours_table(data, *index.within('Earth', args.radius)).to_string(index=False))
+    if args.nearest_hz:
+        start = time.perf_counter()
+        nearest = index.nearest_among(data.loc[data['In Goldilock Zone'] == 1, KEY])
+        nearest.to_csv(args.nearest_hz, index=False)
+        print(f"\n{len(nearest)} planètes -> {args.nearest_hz} ({time.perf_counter() - start:.2f} s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""Profil de démarrage des pages Streamlit.
+
+Chaque page est chargée dans un processus neuf (comme après le démarrage d'un
+serveur) pour mesurer séparément :
+
+- le temps de chaque instruction d'import de la page, les plus lentes en tête ;
+- le premier rendu (chargement des données et des modèles compris) ;
+- un second rendu, une fois les caches remplis.
+
+Les bibliothèques lourdes chargées par la page (scikit-learn, pyarrow...) sont
+listées, pour repérer celles qui pourraient être importées plus tard.
+
+Utilisation, depuis la racine du projet :
+
+    PYTHONPATH=src python -m outer_planets.startup [--pages 3 6] [--top 3] [--output startup.json]
+"""
+import argparse
+import ast
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+PAGES = [ROOT / 'src' / '0_🪐_Outer_Planets.py'] + sorted((ROOT / 'src' / 'pages').glob('*.py'))
+HEAVY_MODULES = ['streamlit', 'sklearn', 'scipy', 'pyarrow', 'matplotlib', 'plotly', 'pandas', 'numpy']
+
+
+def page_imports(page):
+    """Instructions d'import de premier niveau d'une page, avec leur texte."""
+    source = Path(page).read_text()
+    tree = ast.parse(source)
+    return [(ast.get_source_segment(source, node), ast.Module(body=[node], type_ignores=[]))
+            for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def profile_page(page):
+    """Profil d'une page, à appeler dans un processus neuf."""
+    # Imports de la page chronométrés avant tout autre : streamlit et ses dépendances comptent dans le premier
+    already_loaded = set(sys.modules)
+    imports = []
+    for text, module in page_imports(page):
+        start = time.perf_counter()
+        exec(compile(module, str(page), 'exec'), {})
+        imports.append({'statement': text, 'seconds': time.perf_counter() - start})
+
+    from streamlit.testing.v1 import AppTest
+
+    start = time.perf_counter()
+    app = AppTest.from_file(str(page), default_timeout=600).run()
+    first_render = time.perf_counter() - start
+    start = time.perf_counter()
+    app.run()
+    rerun = time.perf_counter() - start
+    # Modules lourds chargés par les imports de la page ou pendant son rendu
+    heavy = [name for name in HEAVY_MODULES if name in sys.modules and name not in already_loaded]
+    return {
+        'page': Path(page).name,
+        'imports': sum(entry['seconds'] for entry in imports),
+        'first_render': first_render,
+        'rerun': rerun,
+        'heavy_modules': heavy,
+        'errors': [exception.value for exception in app.exception],
+        'import_statements': sorted(imports, key=lambda entry: entry['seconds'], reverse=True),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Temps d'import et de premier rendu de chaque page Streamlit.")
+    parser.add_argument('--pages', nargs='+', default=[], help="préfixes des pages à profiler (ex. 3 6)")
+    parser.add_argument('--top', type=int, default=3, help="nombre d'imports les plus lents affichés par page")
+    parser.add_argument('--output', type=Path, help="fichier JSON où écrire les résultats")
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(profile_page(args.worker)))
+        return
+
+    pages = [page for page in PAGES if not args.pages or page.name.startswith(tuple(args.pages))]
+    results = []
+    print(f"{'page':<45}{'imports (s)':>12}{'1er rendu (s)':>15}{'rerun (s)':>11}  modules lourds")
+    for page in pages:
+        output = subprocess.run([sys.executable, '-m', 'outer_planets.startup', '--worker', str(page)],
+                                cwd=ROOT, capture_output=True, text=True, check=True)
+        result = json.loads(output.stdout.splitlines()[-1])
+        results.append(result)
+        print(f"{result['page']:<45}{result['imports']:>12.3f}{result['first_render']:>15.3f}{result['rerun']:>11.3f}"
+              f"  {', '.join(result['heavy_modules'])}")
+        for entry in result['import_statements'][:args.top]:
+            print(f"    {entry['seconds']:.3f} s  {entry['statement']}")
+        for error in result['errors']:
+            print(f"    erreur : {error}")
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+"""Lecture par morceaux et statistiques en une passe pour les catalogues plus grands que la mémoire.
+
+`CatalogStats` consomme un catalogue morceau par morceau et ne garde que des
+agrégats de taille bornée : effectif, moyenne/variance (Welford / Chan), min/max,
+valeurs manquantes, quantiles approchés (échantillon « réservoir ») et comptages
+de valeurs pour les colonnes catégorielles. Deux `CatalogStats` peuvent être
+fusionnés, ce qui permet de répartir la lecture entre plusieurs processus.
+"""
+import functools
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CHUNKSIZE = 100_000
+# Colonnes dont on garde le comptage exact des valeurs
+COUNT_COLUMNS = ['Discovery Method', 'Discovery Facility', 'Discovery Year', 'Spectral Type']
+# Taille de l'échantillon utilisé pour les quantiles approchés, par colonne
+RESERVOIR_SIZE = 10_000
+
+
+def iter_chunks(path, columns=None, chunksize=DEFAULT_CHUNKSIZE):
+    """Itère sur un CSV, un fichier Feather ou une version partagée par morceaux de `chunksize` lignes."""
+    from outer_planets.shared import POINTER, attach
+
+    path = Path(path)
+    if path.name == POINTER:
+        # Version en mémoire partagée : les morceaux sont des tranches sans copie
+        data = attach(path)
+        if columns is not None:
+            data = data[columns]
+        for offset in range(0, len(data), chunksize):
+            yield data.iloc[offset:offset + chunksize]
+    elif path.suffix == '.feather':
+        import pyarrow as pa
+
+        with pa.memory_map(str(path)) as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                if columns is not None:
+                    batch = batch.select(columns)
+                for offset in range(0, batch.num_rows, chunksize):
+                    yield batch.slice(offset, chunksize).to_pandas()
+    else:
+        with pd.read_csv(path, usecols=columns, chunksize=chunksize) as reader:
+            yield from reader
+
+
+def head(path, n=5):
+    """Premières lignes d'un catalogue, sans le lire en entier."""
+    chunks = iter_chunks(path, chunksize=n)
+    try:
+        return next(chunks)
+    finally:
+        chunks.close()
+
+
+class ColumnStats:
+    """Agrégats en une passe d'une colonne numérique."""
+
+    def __init__(self, reservoir_size=RESERVOIR_SIZE, seed=0):
+        self.count = 0
+        self.nulls = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.reservoir = np.empty(0)
+        self.reservoir_size = reservoir_size
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        missing = np.isnan(values)
+        self.nulls += int(missing.sum())
+        values = values[~missing]
+        if values.size:
+            chunk = ColumnStats(self.reservoir_size)
+            chunk.count = values.size
+            chunk.mean = values.mean()
+            chunk.m2 = ((values - chunk.mean) ** 2).sum()
+            chunk.min, chunk.max = values.min(), values.max()
+            self._sample(values)
+            self._combine_moments(chunk)
+
+    def _sample(self, values):
+        # Algorithme R vectorisé : la j-ième valeur vue remplace une case au hasard avec
+        # probabilité k / (j + 1) ; les affectations répétées gardent la dernière, comme en séquentiel
+        free = self.reservoir_size - self.reservoir.size
+        if free > 0:
+            self.reservoir = np.concatenate([self.reservoir, values[:free]])
+            values = values[free:]
+        if values.size:
+            seen = self.count + free + np.arange(values.size)
+            slots = self._rng.integers(0, seen + 1)
+            kept = slots < self.reservoir_size
+            self.reservoir[slots[kept]] = values[kept]
+
+    def _combine_moments(self, other):
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def merge(self, other):
+        """Fusionne les agrégats d'un autre morceau du même catalogue."""
+        self.nulls += other.nulls
+        if other.count:
+            # Échantillon fusionné : tirage pondéré par le nombre de valeurs vues de chaque côté
+            pool = np.concatenate([self.reservoir, other.reservoir])
+            weights = np.concatenate([np.full(self.reservoir.size, self.count / max(self.reservoir.size, 1)),
+                                      np.full(other.reservoir.size, other.count / max(other.reservoir.size, 1))])
+            size = min(self.reservoir_size, pool.size)
+            self.reservoir = self._rng.choice(pool, size=size, replace=False, p=weights / weights.sum())
+            self._combine_moments(other)
+        return self
+
+    @property
+    def std(self):
+        return np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+
+    def quantile(self, q):
+        """Quantile approché, exact tant que la colonne a moins de `reservoir_size` valeurs."""
+        if not self.reservoir.size:
+            return np.full(np.shape(q), np.nan)
+        return np.quantile(self.reservoir, q)
+
+
+class CatalogStats:
+    """Statistiques en une passe d'un catalogue lu par morceaux."""
+
+    def __init__(self, count_columns=COUNT_COLUMNS, reservoir_size=RESERVOIR_SIZE):
+        self.rows = 0
+        self.count_columns = list(count_columns)
+        self.reservoir_size = reservoir_size
+        self.numeric = {}
+        self.nulls = {}
+        self.value_counts_ = {}
+
+    def update(self, chunk):
+        if not self.nulls:
+            # Le premier morceau fixe le schéma : colonnes numériques et colonnes comptées
+            for column in chunk.columns:
+                self.nulls[column] = 0
+                if pd.api.types.is_numeric_dtype(chunk[column]):
+                    self.numeric[column] = ColumnStats(self.reservoir_size, seed=len(self.numeric))
+            self.value_counts_ = {column: pd.Series(dtype='int64')
+                                  for column in self.count_columns if column in chunk.columns}
+
+        self.rows += len(chunk)
+        for column, nulls in chunk.isna().sum().items():
+            self.nulls[column] = self.nulls.get(column, 0) + int(nulls)
+        for column, stats in self.numeric.items():
+            stats.update(pd.to_numeric(chunk[column], errors='coerce'))
+        for column, counts in self.value_counts_.items():
+            self.value_counts_[column] = counts.add(chunk[column].value_counts(), fill_value=0).astype('int64')
+        return self
+
+    def merge(self, other):
+        self.rows += other.rows
+        for column, nulls in other.nulls.items():
+            self.nulls[column] = self.nulls.get(column, 0) + nulls
+        for column, stats in other.numeric.items():
+            if column in self.numeric:
+                self.numeric[column].merge(stats)
+            else:
+                self.numeric[column] = stats
+        for column, counts in other.value_counts_.items():
+            self.value_counts_[column] = (self.value_counts_.get(column, pd.Series(dtype='int64'))
+                                          .add(counts, fill_value=0).astype('int64'))
+        return self
+
+    @classmethod
+    def from_file(cls, path, chunksize=DEFAULT_CHUNKSIZE, **kwargs):
+        stats = cls(**kwargs)
+        for chunk in iter_chunks(path, chunksize=chunksize):
+            stats.update(chunk)
+        return stats
+
+    def describe(self):
+        """Équivalent de `DataFrame.describe()` calculé à partir des agrégats."""
+        return pd.DataFrame({
+            column: [stats.count, stats.mean if stats.count else np.nan, stats.std,
+                     stats.min if stats.count else np.nan, *stats.quantile([0.25, 0.5, 0.75]),
+                     stats.max if stats.count else np.nan]
+            for column, stats in self.numeric.items()
+        }, index=['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max'])
+
+    def null_counts(self):
+        return pd.Series(self.nulls, name='null count')
+
+    def value_counts(self, column):
+        """Comptage des valeurs de `column`, trié par effectif décroissant comme `Series.value_counts`."""
+        counts = self.value_counts_[column]
+        # Les colonnes catégorielles comptent aussi les catégories absentes : on les retire
+        return counts[counts > 0].sort_values(ascending=False, kind='stable').rename('count')
+
+
+@functools.lru_cache(maxsize=8)
+def _catalog_stats(path, mtime_ns):
+    return CatalogStats.from_file(path)
+
+
+def catalog_stats(path):
+    """Statistiques du fichier `path`, calculées une fois par processus et par version du fichier."""
+    path = Path(path).resolve()
+    return _catalog_stats(path, path.stat().st_mtime_ns)
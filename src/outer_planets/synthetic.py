@@ -0,0 +1,202 @@
+"""Générateur vectorisé de catalogues synthétiques, pour les tests de charge.
+
+Les catalogues ont les 23 colonnes de `all_exoplanets_2021.csv` et des distributions
+corrélées plausibles : les étoiles suivent des relations masse-rayon-température de
+la séquence principale, le demi-grand axe découle de la période orbitale et de la
+masse stellaire (3e loi de Kepler), le flux et la température d'équilibre de la
+luminosité et de la distance à l'étoile. Les planètes d'un même système partagent
+leur étoile. Le catalogue est produit et écrit par morceaux, en CSV ou en Feather.
+
+Utilisation, depuis la racine du projet :
+
+    PYTHONPATH=src python -m outer_planets.synthetic 1000000 data/synthetic_1M.feather --seed 42
+"""
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = [
+    "No.", "Planet Name", "Planet Host", "Num Stars", "Num Planets", "Discovery Method",
+    "Discovery Year", "Discovery Facility", "Orbital Period Days", "Orbit Semi-Major Axis",
+    "Mass", "Eccentricity", "Insolation Flux", "Equilibrium Temperature", "Spectral Type",
+    "Stellar Effective Temperature", "Stellar Radius", "Stellar Mass", "Stellar Metallicity",
+    "Stellar Metallicity Ratio", "Stellar Surface Gravity", "Distance", "Gaia Magnitude"
+]
+
+# Méthodes de découverte, proportions proches du catalogue 2021 et installation associée
+DISCOVERY_METHODS = {
+    'Transit': (0.75, ['Kepler', 'K2', 'Transiting Exoplanet Survey Satellite (TESS)', 'SuperWASP']),
+    'Radial Velocity': (0.20, ['W. M. Keck Observatory', 'La Silla Observatory', 'Haute-Provence Observatory']),
+    'Microlensing': (0.027, ['OGLE', 'KMTNet']),
+    'Imaging': (0.011, ['Paranal Observatory', 'Gemini Observatory']),
+    'Transit Timing Variations': (0.005, ['Kepler']),
+    'Eclipse Timing Variations': (0.003, ['Multiple Observatories']),
+    'Orbital Brightness Modulation': (0.002, ['Kepler']),
+    'Pulsar Timing': (0.002, ['Arecibo Observatory']),
+}
+FACILITIES = sorted({facility for _, facilities in DISCOVERY_METHODS.values() for facility in facilities})
+# Table (méthode, j) -> code de la j-ième installation de la méthode, pour un tirage vectorisé
+_FACILITY_COUNTS = np.array([len(facilities) for _, facilities in DISCOVERY_METHODS.values()])
+_FACILITY_CODES = np.array([
+    [FACILITIES.index(facilities[j % len(facilities)]) for j in range(_FACILITY_COUNTS.max())]
+    for _, facilities in DISCOVERY_METHODS.values()
+])
+SPECTRAL_CLASSES = np.array(list('MKGFABO'))
+# Bornes inférieures de température effective (K) des classes M, K, G, F, A, B, O
+SPECTRAL_TEFF = np.array([0, 3900, 5300, 6000, 7300, 10000, 33000])
+SPECTRAL_TYPES = [f'{c}{d} V' for c in SPECTRAL_CLASSES for d in range(10)]
+
+# Proportion de valeurs manquantes par colonne, du même ordre que dans le catalogue 2021
+MISSING_RATES = {
+    'Orbital Period Days': 0.035, 'Orbit Semi-Major Axis': 0.4, 'Mass': 0.56, 'Eccentricity': 0.63,
+    'Insolation Flux': 0.92, 'Equilibrium Temperature': 0.8, 'Spectral Type': 0.8,
+    'Stellar Effective Temperature': 0.08, 'Stellar Radius': 0.1, 'Stellar Mass': 0.16,
+    'Stellar Metallicity': 0.3, 'Stellar Surface Gravity': 0.13, 'Distance': 0.02, 'Gaia Magnitude': 0.04,
+}
+
+DEFAULT_CHUNKSIZE = 1_000_000
+
+
+def _hosts(rng, n_rows):
+    """Nombre de planètes de chaque système, assez de systèmes pour couvrir `n_rows` planètes."""
+    n_planets = np.minimum(rng.geometric(0.55, size=n_rows), 8)
+    n_hosts = int(np.searchsorted(np.cumsum(n_planets), n_rows)) + 1
+    n_planets = n_planets[:n_hosts]
+    # Le dernier système est tronqué pour obtenir exactement `n_rows` planètes
+    n_planets[-1] -= n_planets.sum() - n_rows
+    return n_planets
+
+
+def generate_chunk(n_rows, rng, first_no=1, missing=True):
+    """Génère `n_rows` planètes numérotées à partir de `first_no`."""
+    n_planets = _hosts(rng, n_rows)
+    n_hosts = n_planets.size
+    host_ids = np.arange(first_no, first_no + n_hosts)
+
+    # Étoiles : masse log-normale, rayon et température par relations de la séquence principale
+    stellar_mass = np.clip(rng.lognormal(np.log(0.9), 0.35, n_hosts), 0.08, 3.0)
+    stellar_radius = stellar_mass ** 0.8 * rng.lognormal(0, 0.08, n_hosts)
+    teff = np.clip(5778 * stellar_mass ** 0.55 * rng.lognormal(0, 0.04, n_hosts), 2300, 12000)
+    luminosity = stellar_radius ** 2 * (teff / 5778) ** 4
+    logg = 4.438 + np.log10(stellar_mass / stellar_radius ** 2)
+    metallicity = rng.normal(0, 0.2, n_hosts)
+    distance = rng.lognormal(np.log(400), 0.9, n_hosts)
+    gaia_magnitude = 4.67 - 2.5 * np.log10(luminosity) + 5 * np.log10(distance / 10)
+    num_stars = 1 + rng.binomial(2, 0.05, n_hosts)
+    spectral_class = np.searchsorted(SPECTRAL_TEFF, teff, side='right') - 1
+    spectral_type = spectral_class * 10 + rng.integers(0, 10, n_hosts)
+    method_names = list(DISCOVERY_METHODS)
+    method_weights = np.array([weight for weight, _ in DISCOVERY_METHODS.values()])
+    method = rng.choice(len(method_names), size=n_hosts, p=method_weights / method_weights.sum())
+    facility = _FACILITY_CODES[method, (rng.random(n_hosts) * _FACILITY_COUNTS[method]).astype(int)]
+    year = np.clip(np.round(2023 - rng.exponential(6, n_hosts)), 1992, 2023).astype(np.int16)
+
+    # Planètes : les propriétés stellaires sont répétées pour chaque planète du système
+    host = np.repeat(np.arange(n_hosts), n_planets)
+    rank = np.arange(n_rows) - np.repeat(np.cumsum(n_planets) - n_planets, n_planets)
+    period = 10 ** rng.normal(1.2, 0.8, n_rows) * 1.8 ** rank
+    # 3e loi de Kepler : a³ = M P² (a en UA, P en années, M en masses solaires)
+    semi_major_axis = np.cbrt(stellar_mass[host] * (period / 365.25) ** 2)
+    insolation = luminosity[host] / semi_major_axis ** 2
+    # Température d'équilibre pour un albédo de 0.3 (255 K pour la Terre)
+    equilibrium_temperature = 254.9 * insolation ** 0.25
+
+    host_names = pd.Series(host_ids.astype(str)).radd('SYN-').to_numpy(dtype=object)
+    planet_letters = np.array(list('bcdefghi'))[rank]
+    data = pd.DataFrame({
+        'No.': np.arange(first_no, first_no + n_rows),
+        'Planet Name': pd.Series(host_names[host]) + ' ' + planet_letters,
+        'Planet Host': host_names[host],
+        'Num Stars': num_stars[host].astype(np.int8),
+        'Num Planets': n_planets[host].astype(np.int8),
+        'Discovery Method': pd.Categorical.from_codes(method[host], method_names),
+        'Discovery Year': year[host],
+        'Discovery Facility': pd.Categorical.from_codes(facility[host], FACILITIES),
+        'Orbital Period Days': period,
+        'Orbit Semi-Major Axis': semi_major_axis,
+        'Mass': rng.lognormal(np.log(20), 1.8, n_rows),
+        'Eccentricity': rng.beta(0.867, 3.03, n_rows),
+        'Insolation Flux': insolation,
+        'Equilibrium Temperature': equilibrium_temperature,
+        'Spectral Type': pd.Categorical.from_codes(spectral_type[host], SPECTRAL_TYPES),
+        'Stellar Effective Temperature': teff[host],
+        'Stellar Radius': stellar_radius[host],
+        'Stellar Mass': stellar_mass[host],
+        'Stellar Metallicity': metallicity[host],
+        'Stellar Metallicity Ratio': pd.Categorical.from_codes(np.zeros(n_rows, dtype=np.int8), ['[Fe/H]']),
+        'Stellar Surface Gravity': logg[host],
+        'Distance': distance[host],
+        'Gaia Magnitude': gaia_magnitude[host],
+    }, columns=COLUMNS)
+
+    if missing:
+        for column, rate in MISSING_RATES.items():
+            data[column] = data[column].mask(rng.random(n_rows) < rate)
+    return data
+
+
+def iter_catalog(n_rows, seed=0, chunksize=DEFAULT_CHUNKSIZE, missing=True):
+    """Itère sur les morceaux d'un catalogue de `n_rows` planètes, reproductible pour un `seed` donné.
+
+    Un catalogue vide donne un seul morceau vide, qui porte les colonnes et les types du catalogue.
+    """
+    if n_rows == 0:
+        yield generate_chunk(1, np.random.default_rng(seed), missing=missing).iloc[:0]
+        return
+    seeds = np.random.SeedSequence(seed).spawn((n_rows + chunksize - 1) // chunksize)
+    for i, chunk_seed in enumerate(seeds):
+        start = i * chunksize
+        yield generate_chunk(min(chunksize, n_rows - start), np.random.default_rng(chunk_seed),
+                             first_no=start + 1, missing=missing)
+
+
+def write_catalog(path, n_rows, seed=0, chunksize=DEFAULT_CHUNKSIZE, missing=True):
+    """Écrit le catalogue morceau par morceau, en Feather si `path` finit par `.feather`, sinon en CSV."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    chunks = iter_catalog(n_rows, seed=seed, chunksize=chunksize, missing=missing)
+    if path.suffix == '.feather':
+        import pyarrow as pa
+
+        writer = None
+        with pa.OSFile(str(path), 'wb') as sink:
+            for chunk in chunks:
+                batch = pa.RecordBatch.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pa.ipc.new_file(sink, batch.schema)
+                writer.write_batch(batch)
+            writer.close()
+    else:
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+    return path
+
+
+def _row_count(value):
+    rows = int(value)
+    if rows < 0:
+        raise argparse.ArgumentTypeError("le nombre de planètes doit être positif ou nul")
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Génère un catalogue synthétique d'exoplanètes.")
+    parser.add_argument('rows', type=_row_count, help="nombre de planètes")
+    parser.add_argument('output', help="fichier de sortie (.csv ou .feather)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument('--no-missing', action='store_true', help="ne pas introduire de valeurs manquantes")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    path = write_catalog(args.output, args.rows, seed=args.seed, chunksize=args.chunksize,
+                         missing=not args.no_missing)
+    elapsed = time.perf_counter() - start
+    print(f"{args.rows} planètes écrites dans {path} en {elapsed:.1f} s ({args.rows / elapsed:,.0f} lignes/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,16 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
 
-# Chargement des données
-data_path = './data/all_exoplanets_2021.csv'
-data = pd.read_csv(data_path)
+from outer_planets.data import EXOPLANETS_CSV, resolve_source
+from outer_planets.instrumentation import finish_rerun, span, start_rerun
+from outer_planets.streaming import catalog_stats, head
+
+start_rerun('data_overview')
+
+# Statistiques calculées en une passe sur le catalogue lu par morceaux (une seule fois par processus) :
+# le catalogue complet n'est jamais chargé en mémoire
+with span('load'):
+    data_path = resolve_source(EXOPLANETS_CSV)
+    stats = catalog_stats(data_path)
 
 # Configuration de la page Streamlit
 st.set_page_config(page_title="Outer Planets", page_icon="🪐", layout="wide")
@@ -21,13 +27,13 @@ Analysez les distributions des différentes caractéristiques pour mieux compren
 
 # Informations sur le jeu de données
 st.header("Informations sur le jeu de données")
-st.write("""
+st.write(f"""
 ### Quelles sont les données utilisées pour ce projet ?
 
 Les données utilisées pour ce projet sont issues du site [Exoplanet Archive](https://exoplanetarchive.ipac.caltech.edu/). Ce site a été créé par le California Institute of Technology (Caltech) et la NASA, toutes les données sont donc publiques, fiabilisées et vérifiées.  
 Les données sont des caractéristiques d'exoplanètes découvertes par plusieurs laboratoires. 
 Nous utilisons les données de 2021, car elles sont actuellement les plus fiabilisées, complètes et nettoyées.
-Le dataset possède 4575 lignes et 23 colonnes.
+Le dataset possède {stats.rows} lignes et {len(stats.nulls)} colonnes.
 Elles sont mises à jour régulièrement et contiennent les caractéristiques suivantes :  
 - **No** : Numéro d'identification unique attribué à chaque exoplanète dans la base de données.
 - **Planet Name** : Nom de l'exoplanète
@@ -72,12 +78,20 @@ Elles sont mises à jour régulièrement et contiennent les caractéristiques su
 
 # Affichage des premières lignes du jeu de données
 st.header("Aperçu des données")
-st.dataframe(data.head())
+with span('load'):
+    first_rows = head(data_path)
+with span('render'):
+    st.dataframe(first_rows)
 
 # Statistiques descriptives
 st.header("Statistiques descriptives")
-st.write(data.describe())
+with span('features'):
+    description = stats.describe()
+with span('render'):
+    st.write(description)
 
 
 st.write("---")
 st.write("Projet réalisé par PERROT--NASI Matéo et TOMATIS Margot. Pour plus d'informations, vous pouvez nous retrouver sur nos github.")
+
+finish_rerun()
@@ -1,10 +1,18 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 
-# Chargement des données
-data_path = './data/solar_system.csv'
-data = pd.read_csv(data_path)
+from outer_planets.data import load_solar_system
+from outer_planets.habitable_zone import FIXED_HZ, in_habitable_zone
+from outer_planets.host_index import host_index
+from outer_planets.instrumentation import finish_rerun, span, start_rerun
+from outer_planets.orbits import orbital_elements, system_figure
+from outer_planets.scatter import scatter_figure
+
+start_rerun('solar_system')
+
+# Chargement des données (parsées une seule fois par processus, partagées entre sessions)
+with span('load'):
+    data = load_solar_system()
 
 # Configuration de la page Streamlit
 st.set_page_config(page_title="Outer Planets", page_icon="🪐", layout="wide")
@@ -25,47 +33,80 @@ st.write(data.head())
 
 # Visualisation de la distance des planètes par rapport au Soleil
 st.subheader("Distance des Planètes par Rapport au Soleil")
-fig_distance = px.bar(data, x='Planet Name', y='Orbit Semi-Major Axis',
-                      labels={'Orbit Semi-Major Axis': 'Axe Semi-Majeur de l\'Orbite (UA)', 'Planet Name': 'Planète'},
-                      title='Distance des Planètes par Rapport au Soleil')
-st.plotly_chart(fig_distance)
+with span('figure'):
+    fig_distance = px.bar(data, x='Planet Name', y='Orbit Semi-Major Axis',
+                          labels={'Orbit Semi-Major Axis': 'Axe Semi-Majeur de l\'Orbite (UA)', 'Planet Name': 'Planète'},
+                          title='Distance des Planètes par Rapport au Soleil')
+with span('render'):
+    st.plotly_chart(fig_distance)
 
 # Visualisation des températures d'équilibre des planètes
 st.subheader("Températures d'Équilibre des Planètes")
-fig_temperature = px.bar(data, x='Planet Name', y='Equilibrium Temperature',
-                         labels={'Equilibrium Temperature': 'Température d\'Équilibre (K)', 'Planet Name': 'Planète'},
-                         title='Températures d\'Équilibre des Planètes du Système Solaire')
-st.plotly_chart(fig_temperature)
+with span('figure'):
+    fig_temperature = px.bar(data, x='Planet Name', y='Equilibrium Temperature',
+                             labels={'Equilibrium Temperature': 'Température d\'Équilibre (K)', 'Planet Name': 'Planète'},
+                             title='Températures d\'Équilibre des Planètes du Système Solaire')
+with span('render'):
+    st.plotly_chart(fig_temperature)
 
 # Visualisation du flux d'insolation des planètes
 st.subheader("Flux d'Insolation des Planètes")
-fig_insolation = px.bar(data, x='Planet Name', y='Insolation Flux',
-                        labels={'Insolation Flux': 'Flux d\'Insolation (W/m^2)', 'Planet Name': 'Planète'},
-                        title='Flux d\'Insolation des Planètes du Système Solaire')
-st.plotly_chart(fig_insolation)
+with span('figure'):
+    fig_insolation = px.bar(data, x='Planet Name', y='Insolation Flux',
+                            labels={'Insolation Flux': 'Flux d\'Insolation (W/m^2)', 'Planet Name': 'Planète'},
+                            title='Flux d\'Insolation des Planètes du Système Solaire')
+with span('render'):
+    st.plotly_chart(fig_insolation)
 
-# Déterminer les planètes dans la zone habitable
-data['In Goldilock Zone'] = data.apply(
-    lambda row: 1 if row['Orbit Semi-Major Axis'] >= 0.95 and row['Orbit Semi-Major Axis'] <= 1.37 else 0, axis=1)
-goldilocks_planets = data[data['In Goldilock Zone'] == 1]
+# Déterminer les planètes dans la zone habitable (limites fixes de 0.95 à 1.37 UA)
+with span('features'):
+    data['In Goldilock Zone'] = in_habitable_zone(data, model='fixed')
+    inner_hz, outer_hz = FIXED_HZ
+with span('filter'):
+    goldilocks_planets = data[data['In Goldilock Zone'] == 1]
 
 # Afficher les planètes dans la Goldilock Zone
 st.subheader("Planètes dans la Zone Habitable")
 st.write(goldilocks_planets[['Planet Name', 'Orbit Semi-Major Axis', 'Equilibrium Temperature', 'Insolation Flux']])
 
 # Visualisation des planètes dans la Goldilock Zone
-fig_goldilocks = px.scatter(data, x='Orbit Semi-Major Axis', y='Equilibrium Temperature',
-                            color='In Goldilock Zone', color_discrete_map={1: 'green', 0: 'red'},
-                            labels={'Orbit Semi-Major Axis': 'Axe Semi-Majeur de l\'Orbite (UA)',
-                                    'Equilibrium Temperature': 'Température d\'Équilibre (K)'},
-                            title='Planètes du Système Solaire dans la Zone Habitable')
-fig_goldilocks.add_vline(x=0.95, line_dash="dash", line_color="blue", annotation_text="Limite intérieure de la zone habitable")
-fig_goldilocks.add_vline(x=1.37, line_dash="dash", line_color="orange", annotation_text="Limite extérieure de la zone habitable")
-st.plotly_chart(fig_goldilocks)
+with span('figure'):
+    fig_goldilocks = scatter_figure(data, x='Orbit Semi-Major Axis', y='Equilibrium Temperature',
+                                    color='In Goldilock Zone', color_discrete_map={1: 'green', 0: 'red'},
+                                    hover_data=['Planet Name'],
+                                    labels={'Orbit Semi-Major Axis': 'Axe Semi-Majeur de l\'Orbite (UA)',
+                                            'Equilibrium Temperature': 'Température d\'Équilibre (K)'},
+                                    title='Planètes du Système Solaire dans la Zone Habitable')
+    fig_goldilocks.add_vline(x=inner_hz, line_dash="dash", line_color="blue", annotation_text="Limite intérieure de la zone habitable")
+    fig_goldilocks.add_vline(x=outer_hz, line_dash="dash", line_color="orange", annotation_text="Limite extérieure de la zone habitable")
+with span('render'):
+    st.plotly_chart(fig_goldilocks)
+
+# Orbites animées du système solaire ou de n'importe quel système stellaire du catalogue
+st.subheader("Orbites des Planètes")
+st.write("""
+Les positions des planètes sont calculées en résolvant l'équation de Kepler à partir de leur période orbitale, de leur demi-grand axe et de leur excentricité. Choisissez un système et la planète dont la période fixe l'échelle de temps de l'animation (deux orbites).
+""")
+with span('load'):
+    systems = host_index()
+orbit_system = st.selectbox("Choisissez un système stellaire :", options=systems.hosts,
+                            index=systems.hosts.index('Sun') if 'Sun' in systems.hosts else 0)
+with span('features'):
+    orbit_planets = orbital_elements(systems.select(orbit_system)).names.tolist()
+if orbit_planets:
+    reference_planet = st.selectbox("Échelle de temps :", options=orbit_planets, index=len(orbit_planets) - 1)
+    with span('figure'):
+        fig_orbits = system_figure(orbit_system, reference_planet)
+    with span('render'):
+        st.plotly_chart(fig_orbits)
+else:
+    st.write("Aucune planète de ce système n'a une période ou un demi-grand axe connu.")
 
 # Conclusion
 st.write("""
 En conclusion, cette exploration des zones habitables dans notre propre système solaire révèle les conditions qui pourraient permettre la vie telle que nous la connaissons. 
 Bien que notre Terre soit actuellement la seule planète connue pour abriter la vie, cette analyse met en lumière l'importance des zones habitables et de la recherche continue pour découvrir 
 d'autres mondes potentiellement habitables au-delà de notre système solaire.
-""")
\ No newline at end of file
+""")
+
+finish_rerun()
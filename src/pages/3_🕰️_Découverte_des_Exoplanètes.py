@@ -1,16 +1,17 @@
 import streamlit as st
-import pandas as pd
-from sklearn.linear_model import LogisticRegression
-from sklearn.preprocessing import StandardScaler
-from sklearn.cluster import KMeans
 import plotly.express as px
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
 
-# Chargement des données
-data_path = './data/all_exoplanets_with_goldilock_zone.csv'
-data = pd.read_csv(data_path)
+from outer_planets.data import GOLDILOCK_ZONE_CSV, dataset_version, resolve_source
+from outer_planets.histograms import cached_histogram, histogram_figure
+from outer_planets.host_index import ALL_SYSTEMS, host_index
+from outer_planets.instrumentation import finish_rerun, span, start_rerun
+from outer_planets.streaming import catalog_stats
+
+start_rerun('discoveries')
+
+# Chargement des données, triées par système stellaire (une seule fois par processus, partagées entre sessions)
+with span('load'):
+    systems = host_index()
 
 # Configuration de la page Streamlit
 st.set_page_config(page_title="Outer Planets", page_icon="🪐", layout="wide")
@@ -25,32 +26,26 @@ st.title("🕰️ Découverte des exoplanètes")
 st.header("Quand et comment les Exoplanètes ont-elles été découvertes ?")
 st.write("Les exoplanètes ont été découvertes a des époques différentes et avec des technologies différentes.\nVoici des graphiques illustrants cette idée.")
 
-# Liste des noms d'hôtes uniques et option "Tous les systèmes"
-host_names = ['Tous les systèmes'] + list(data['Planet Host'].unique())
-
 # Sélection du système stellaire
-system_choice = st.selectbox("Choisissez un système stellaire :", options=host_names)
+system_choice = st.selectbox("Choisissez un système stellaire :", options=systems.options())
 
-# Filtrer les données en fonction du système stellaire sélectionné
-if system_choice == 'Tous les systèmes':
-    filtered_data = data
-else:
-    filtered_data = data[data['Planet Host'] == system_choice]
+# Planètes du système stellaire sélectionné (plage contiguë de l'index, sans copie)
+with span('filter'):
+    filtered_data = systems.select(system_choice)
 
 
 # GRAPH 1
 st.header("Chronologie des Découvertes")
-# Conversion de la colonne de date en format datetime si ce n'est pas déjà fait
-filtered_data['Discovery Year'] = pd.to_datetime(filtered_data['Discovery Year'], format='%Y', errors='coerce')
-
 st.write("""
 Ce graphique permet de visualiser comment le nombre de découvertes d'exoplanètes a augmenté au fil des années, en mettant en évidence les avancées technologiques et les méthodes de détection telles que la méthode des transits et la méthode de la vitesse radiale. Les pics peuvent correspondre à des missions spatiales spécifiques ou à des améliorations dans les instruments de détection.
 """)
-# Conversion de la colonne de date en format datetime si ce n'est pas déjà fait
-filtered_data['Discovery Year'] = pd.to_datetime(filtered_data['Discovery Year'], format='%Y', errors='coerce')
-
-fig = px.histogram(filtered_data, x='Discovery Year', title='Années de découverte')
-st.plotly_chart(fig)
+# Une barre par année, comptée côté serveur et gardée en cache pour ce système
+with span('figure'):
+    discoveries = cached_histogram((dataset_version(GOLDILOCK_ZONE_CSV), system_choice), filtered_data,
+                                   'Discovery Year', discrete=True)
+    fig = histogram_figure(discoveries, title='Années de découverte')
+with span('render'):
+    st.plotly_chart(fig)
 
 # GRAPH 2
 st.header("Méthodes de Découvertes")
@@ -59,7 +54,16 @@ st.write("""
 Ce graphique permet de visualiser comment les méthodes de découvertes ayant permit de découvrir le plus de planète.
 """)
 
-method_counts = filtered_data['Discovery Method'].value_counts().reset_index()
-method_counts.columns = ['Discovery Method', 'Count']
-fig = px.pie(method_counts, values='Count', names='Discovery Method', title='Méthodes de découverte')
-st.plotly_chart(fig)
+with span('features'):
+    if system_choice == ALL_SYSTEMS:
+        # Comptage déjà calculé en une passe sur tout le catalogue
+        method_counts = catalog_stats(resolve_source(GOLDILOCK_ZONE_CSV)).value_counts('Discovery Method').reset_index()
+    else:
+        method_counts = filtered_data['Discovery Method'].value_counts().reset_index()
+    method_counts.columns = ['Discovery Method', 'Count']
+with span('figure'):
+    fig = px.pie(method_counts, values='Count', names='Discovery Method', title='Méthodes de découverte')
+with span('render'):
+    st.plotly_chart(fig)
+
+finish_rerun()
@@ -1,16 +1,18 @@
 import streamlit as st
-import pandas as pd
-from sklearn.linear_model import LogisticRegression
-from sklearn.preprocessing import StandardScaler
-from sklearn.cluster import KMeans
-import plotly.express as px
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
-
-# Chargement des données
-data_path = './data/all_exoplanets_with_goldilock_zone.csv'
-data = pd.read_csv(data_path)
+
+from outer_planets.data import load_goldilock_zone
+from outer_planets.filters import FilterSpec
+from outer_planets.host_index import ALL_SYSTEMS, host_index
+from outer_planets.instrumentation import finish_rerun, span, start_rerun
+from outer_planets.page_figures import (MAX_ORBITAL_PERIOD, distances_figure, eccentricity_figure,
+                                        orbital_periods_figure)
+from outer_planets.similarity import neighbours_table, similarity_index
+
+start_rerun('exoplanet_features')
+
+# Chargement des données, triées par système stellaire (une seule fois par processus, partagées entre sessions)
+with span('load'):
+    systems = host_index()
 
 # Configuration de la page Streamlit
 st.set_page_config(page_title="Outer Planets", page_icon="🪐", layout="wide")
@@ -18,8 +20,6 @@ st.set_page_config(page_title="Outer Planets", page_icon="🪐", layout="wide")
 # Sidebar avec logo
 st.sidebar.image("./OP-logo-2.png", use_column_width=True)
 
-host_names = ['Tous les systèmes'] + list(data['Planet Host'].unique())
-
 # Titre
 st.title("🌑 Caractéristiques des Exoplanètes")
 
@@ -28,51 +28,38 @@ Les exoplanètes sont des planètes situées en dehors de notre système solaire
 """)
 
 # Sélection du système stellaire
-system_choice = st.selectbox("Choisissez un système stellaire :", options=host_names)
-
-# Filtrer les données en fonction du système stellaire sélectionné
-if system_choice == 'Tous les systèmes':
-    filtered_data = data
-else:
-    filtered_data = data[data['Planet Host'] == system_choice]
+system_choice = st.selectbox("Choisissez un système stellaire :", options=systems.options())
 
 # Checkbox pour afficher les planètes dans la zone habitable
 show_goldilock_zone = st.checkbox("Afficher les planètes dans la zone habitable")
 
-# Filtrer les données pour les planètes dans la zone habitable si l'option est cochée
-if show_goldilock_zone:
-    filtered_data['In Goldilock Zone'] = filtered_data['In Goldilock Zone'].astype(int)
-    filtered_data = filtered_data[filtered_data['In Goldilock Zone'] == 1]
-
-# Filtrer les données pour les planètes avec une excentricité inférieure à 0.6
-filtered_data.loc[filtered_data["Eccentricity"] > 0.6, "In Goldilock Zone"] = 0
-
-# Créer une nouvelle colonne pour la couleur des barres
-filtered_data['Color'] = filtered_data['In Goldilock Zone'].apply(lambda x: 'In Goldilock Zone' if x == 1 else 'Other Exoplanets')
+# Filtres de la page : système stellaire et, si l'option est cochée, planètes de la zone habitable (orbite
+# d'excentricité au plus 0.6). La couleur des barres est la classe de zone habitable, calculée au chargement.
+# Les figures sont relues du cache de figures (outer_planets.figure_cache) quand cet état y est déjà.
+spec = FilterSpec(host=system_choice, goldilock_only=show_goldilock_zone)
+with span('filter'):
+    filtered_data = systems.filter(spec)
 
 # Affichage du système stellaire sélectionné
 st.write(f"Système stellaire sélectionné : **{system_choice}**")
+if system_choice != ALL_SYSTEMS:
+    with span('features'):
+        system = systems.system_summary(system_choice)
+    st.write(f"{system['Planets']:.0f} planète(s) connue(s), dont {system['Goldilock Planets']:.0f} dans la zone "
+             f"habitable. Étoile : {system['Stellar Effective Temperature']:.0f} K, "
+             f"{system['Stellar Radius']:.2f} rayon(s) solaire(s), {system['Stellar Mass']:.2f} masse(s) solaire(s).")
 
 # GRAPH 1
 st.header("Analyse des Caractéristiques des Exoplanètes")
-# Filtrer les données pour les planètes dans la zone habitable si l'option est cochée
-if show_goldilock_zone:
-    filtered_data['In Goldilock Zone'] = filtered_data['In Goldilock Zone'].astype(int)
-    filtered_data = filtered_data[filtered_data['In Goldilock Zone'] == 1]
-
 # Widget slider pour permettre à l'utilisateur de spécifier une limite supérieure pour les périodes orbitales
 max_orbital_period = st.slider("Limite supérieure pour les périodes orbitales (jours) :",
-                               min_value=0, max_value=50000, value=50000)
-
-# Filtrer les données pour les périodes orbitales inférieures ou égales à la limite supérieure spécifiée
-filtered_orbital_data = filtered_data[filtered_data['Orbital Period Days'] <= max_orbital_period]
+                               min_value=0, max_value=MAX_ORBITAL_PERIOD, value=MAX_ORBITAL_PERIOD)
 
-# Graphique de distribution des périodes orbitales avec la plage spécifiée par l'utilisateur
-fig_orbital_periods = px.histogram(filtered_orbital_data[filtered_orbital_data["Orbital Period Days"] <= 50000], x='Orbital Period Days',
-                                   title=f'Distribution des Périodes Orbitales des Exoplanètes (jusqu\'à {max_orbital_period} jours)',
-                                   color='Color',
-                                   color_discrete_map={'In Goldilock Zone': 'yellow', 'Other Exoplanets': 'lightskyblue'})
-st.plotly_chart(fig_orbital_periods)
+# Graphique de distribution des périodes orbitales inférieures ou égales à la limite supérieure spécifiée
+with span('figure'):
+    fig_orbital_periods = orbital_periods_figure(spec, max_orbital_period)
+with span('render'):
+    st.plotly_chart(fig_orbital_periods)
 
 st.write("""
 Ce graphique montre comment sont réparties les périodes orbitales des exoplanètes, fournissant des insights sur la diversité des systèmes planétaires découverts. Les périodes orbitales peuvent varier de quelques jours à plusieurs années, ce qui peut indiquer la distance des exoplanètes par rapport à leur étoile hôte et leurs conditions orbitales.
@@ -80,11 +67,11 @@ Ce graphique montre comment sont réparties les périodes orbitales des exoplan
 
 # GRAPH 2
 st.header("Distances et Observabilité")
-# Graphique de distribution des distances des exoplanètes
-fig_distances = px.histogram(filtered_data[filtered_data["Orbit Semi-Major Axis"] <= 400], x='Orbit Semi-Major Axis',
-                             title='Distribution des Distances des Exoplanètes', color='Color',
-                             color_discrete_map={'In Goldilock Zone': 'yellow', 'Other Exoplanets': 'lightskyblue'})
-st.plotly_chart(fig_distances)
+# Graphique de distribution des distances des exoplanètes (demi-grand axe jusqu'à 400 UA)
+with span('figure'):
+    fig_distances = distances_figure(spec)
+with span('render'):
+    st.plotly_chart(fig_distances)
 
 st.write("""
 Ce graphique montre la distribution des distances des exoplanètes en UA, illustrant les défis d'observation associés à ces distances. Les exoplanètes plus proches sont souvent plus faciles à étudier en détail, tandis que celles plus éloignées nécessitent des techniques d'observation plus avancées.
@@ -93,20 +80,56 @@ Ce graphique montre la distribution des distances des exoplanètes en UA, illust
 # GRAPH 3
 st.header("Distribution de l'excentricité")
 # Graphique de distribution de l'excentricité des orbites des exoplanètes
-fig_eccentricity = px.histogram(filtered_data, x='Eccentricity',
-                                title='Distribution de l\'Excentricité des Orbites des Exoplanètes', color='Color',
-                                color_discrete_map={'In Goldilock Zone': 'yellow', 'Other Exoplanets': 'lightskyblue'})
+with span('figure'):
+    fig_eccentricity = eccentricity_figure(spec)
 
-st.plotly_chart(fig_eccentricity)
+with span('render'):
+    st.plotly_chart(fig_eccentricity)
 
 # GRAPH 4
-# Exemple spécifique de l'exoplanète Kepler-186 f
-planet_data = filtered_data[filtered_data['Planet Name'] == 'Kepler-186 f']
+# Exemple spécifique d'une exoplanète de la zone habitable
+CASE_STUDY = 'Kepler-442 b'
+with span('filter'):
+    planet_data = filtered_data[filtered_data['Planet Name'] == CASE_STUDY]
 
-st.header("Cas d'Étude : Kepler-186 f")
+st.header(f"Cas d'Étude : {CASE_STUDY}")
 st.write("""
-Kepler-186 f est une exoplanète située dans la zone habitable de son étoile hôte, Kepler-186. 
-Elle a été découverte par le télescope spatial Kepler en 2014 et représente un cas intéressant 
-pour l'étude des exoplanètes potentiellement habitables.
+Kepler-442 b est une exoplanète située dans la zone habitable de son étoile hôte, Kepler-442, une étoile de type K 
+un peu plus froide que le Soleil. Elle a été découverte par le télescope spatial Kepler en 2015 et représente un cas 
+intéressant pour l'étude des exoplanètes potentiellement habitables.
+
+Kepler-186 f, souvent citée en exemple, orbite à 0,43 UA de son étoile : juste au-delà de la limite extérieure 
+de la zone habitable calculée par cette application (environ 0,39 UA pour Kepler-186), elle n'y est donc pas comptée.
 """)
 st.write(planet_data)
+
+# Planètes qui ressemblent le plus à la planète du cas d'étude, ou à la planète choisie (index chargé une fois par version)
+with span('load'):
+    planets = load_goldilock_zone()
+    similarity = similarity_index()
+
+st.header("Planètes Similaires")
+st.write("""
+Quelles planètes ressemblent le plus à une planète donnée ? La ressemblance est mesurée sur l'orbite (demi-grand axe, 
+période orbitale) et sur l'étoile hôte (température, rayon, masse), après normalisation. Seules les planètes dont 
+toutes ces caractéristiques sont connues sont comparées.
+""")
+planet_options = similarity.planets()
+reference = st.selectbox("Choisissez une planète :", options=planet_options,
+                         index=planet_options.index(CASE_STUDY) if CASE_STUDY in planet_options else 0)
+n_similar = st.slider("Nombre de planètes similaires :", min_value=1, max_value=50, value=10)
+with span('model'):
+    similar_planets = neighbours_table(planets, *similarity.similar(reference, n_similar))
+with span('render'):
+    st.dataframe(similar_planets, hide_index=True)
+
+st.subheader("Planètes proches de la Terre")
+radius = st.slider("Distance maximale à la Terre :", min_value=0.1, max_value=2.0, value=0.3, step=0.1)
+with span('model'):
+    earth_like = neighbours_table(planets, *similarity.within('Earth', radius))
+st.write(f"{len(earth_like) - 1} planète(s) à moins de {radius:.1f} de la Terre, dont "
+         f"{int(earth_like['In Goldilock Zone'].iloc[1:].sum())} dans la zone habitable.")
+with span('render'):
+    st.dataframe(earth_like.iloc[1:], hide_index=True)
+
+finish_rerun()
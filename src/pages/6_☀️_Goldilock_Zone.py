@@ -1,16 +1,19 @@
 import streamlit as st
 import pandas as pd
-from sklearn.linear_model import LogisticRegression
-from sklearn.preprocessing import StandardScaler
-from sklearn.cluster import KMeans
-import plotly.express as px
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
-
-# Chargement des données
-data_path = './data/all_exoplanets_with_goldilock_zone.csv'
-data = pd.read_csv(data_path)
+
+from outer_planets.clustering import align_labels
+from outer_planets.data import load_goldilock_zone
+from outer_planets.habitability import ALL_METHODS, habitability_ranking
+from outer_planets.instrumentation import finish_rerun, span, start_rerun
+from outer_planets.models import goldilock_models
+from outer_planets.page_figures import clusters_figure, coefficients_figure, goldilocks_figure
+from outer_planets.scatter import selection_ranges
+
+start_rerun('goldilock_zone')
+
+# Chargement des données (parsées une seule fois par processus, partagées entre sessions)
+with span('load'):
+    data = load_goldilock_zone()
 
 # Configuration de la page Streamlit
 st.set_page_config(page_title="Outer Planets", page_icon="🪐", layout="wide")
@@ -29,21 +32,20 @@ La Goldilock Zone, ou zone habitable, est la région autour d'une étoile où le
 
 st.write(data.head())
 
-num_goldilocks = data['In Goldilock Zone'].sum()
-total_planets = len(data)
+with span('features'):
+    num_goldilocks = data['In Goldilock Zone'].sum()
+    total_planets = len(data)
 st.write(
     f"Nombre de planètes dans la Goldilock Zone : {num_goldilocks} sur {total_planets} ({num_goldilocks / total_planets:.2%})")
 
 st.header("Calcul de la Goldilock Zone")
 st.write("""
 ```python
-def is_in_goldilock_zone(row):
-    T_star = row['Stellar Effective Temperature']  # Température effective de l'étoile
-    R_star = row['Stellar Radius']  # Rayon stellaire
-    a_planet = row['Orbit Semi-Major Axis']  # Axe semi-major de l'orbite de la planète
-
-    if pd.isna(T_star) or pd.isna(R_star) or pd.isna(a_planet):
-        return 0
+def is_in_goldilock_zone(data):
+    # Calcul sur des colonnes entières (tableaux NumPy) plutôt que ligne par ligne
+    T_star = data['Stellar Effective Temperature'].to_numpy()  # Température effective de l'étoile
+    R_star = data['Stellar Radius'].to_numpy()  # Rayon stellaire
+    a_planet = data['Orbit Semi-Major Axis'].to_numpy()  # Axe semi-major de l'orbite de la planète
 
     # Calcul de la luminosité stellaire en unités solaires
     T_sun = 5778  # Température effective du Soleil en Kelvin
@@ -53,8 +55,8 @@ def is_in_goldilock_zone(row):
     inner_hz = np.sqrt(L_star) * 0.75
     outer_hz = np.sqrt(L_star) * 1.77
 
-    # Vérification si la planète est dans la zone habitable
-    return 1 if inner_hz <= a_planet <= outer_hz else 0
+    # Vérification si la planète est dans la zone habitable (une valeur manquante donne 0)
+    return ((inner_hz <= a_planet) & (a_planet <= outer_hz)).astype(int)
 ```
 """)
 
@@ -63,29 +65,12 @@ st.header("Visualisation des Données de la Goldilock Zone")
 # Clustering
 st.header("Analyse de Clustering des Exoplanètes")
 
-# Sélection des caractéristiques pertinentes pour le clustering
-features = data[['Orbital Period Days', 'Orbit Semi-Major Axis', 'Insolation Flux', 'Equilibrium Temperature',
-                 'Stellar Effective Temperature', 'Stellar Radius', 'Stellar Mass']]
-
-features_cleaned = features.dropna()
-
-# Normalisation des données
-scaler = StandardScaler()
-scaled_features = scaler.fit_transform(features_cleaned)
-
-# Application de K-means
-kmeans = KMeans(n_clusters=5)
-clusters = kmeans.fit_predict(scaled_features)
-
-# Création d'un DataFrame pour les données nettoyées et normalisées
-cleaned_data = data.dropna(subset=features_cleaned.columns).copy()
-
-# Supprimer la colonne 'Cluster' si elle existe déjà
-if 'Cluster' in cleaned_data.columns:
-    cleaned_data.drop(columns=['Cluster'], inplace=True)
-
-# Ajouter la nouvelle colonne 'Cluster'
-cleaned_data['Cluster'] = clusters
+# Modèles entraînés hors ligne (normalisation + K-means à graine fixée), rechargés depuis le registre :
+# ils ne sont réentraînés que si les données ou les hyperparamètres changent
+with span('model'):
+    models = goldilock_models()
+    # Clusters rangés comme les lignes de `data`, retrouvés par nom de planète
+    clusters = align_labels(models, data)
 
 # Explication des Clusters
 st.write("""
@@ -97,68 +82,64 @@ st.write("""
 ### Visualisation Interactive des Clusters avec Plotly
 Ce graphique interactif permet d'explorer les clusters en survolant les points pour voir les détails des exoplanètes. Il montre la répartition des exoplanètes selon l'axe semi-majeur et la température d'équilibre, avec une coloration par cluster.
 """)
-fig_plotly = px.scatter(cleaned_data[cleaned_data['Orbit Semi-Major Axis'] <= 8], x='Orbit Semi-Major Axis', y='Equilibrium Temperature', color='Cluster',
-                        title='Clustering des Exoplanètes', labels={'Orbit Semi-Major Axis': 'Orbit Semi-Major Axis',
-                                                                    'Equilibrium Temperature': 'Equilibrium Temperature'})
-st.plotly_chart(fig_plotly)
-
-# Afficher les planètes dans la Goldilock Zone
-goldilocks_data = cleaned_data[cleaned_data['In Goldilock Zone'] == 1]
+# Rendu WebGL, sous-échantillonné côté serveur ; une sélection rectangulaire réaffiche la zone en détail.
+# Les figures sont relues du cache de figures (outer_planets.figure_cache) quand cette zone y est déjà.
+with span('figure'):
+    x_range, y_range = selection_ranges(st.session_state.get('clusters_chart'))
+    fig_plotly = clusters_figure(x_range, y_range)
+with span('render'):
+    st.plotly_chart(fig_plotly, key='clusters_chart', on_select='rerun', selection_mode='box')
+
+# Meilleures candidates de la Goldilock Zone, classées par indice de similarité avec la Terre (ESI)
 st.header("Planètes dans la Goldilock Zone")
-st.write(goldilocks_data[
-             ['Planet Name', 'Planet Host', 'Orbital Period Days', 'Orbit Semi-Major Axis', 'Insolation Flux',
-              'Equilibrium Temperature', 'Stellar Effective Temperature', 'Stellar Radius', 'Stellar Mass', 'Cluster']])
+st.write("""
+L'indice de similarité avec la Terre (ESI) va de 0 à 1 (la Terre) : il compare le rayon, la densité, la vitesse de libération et la température d'équilibre de chaque planète à celles de la Terre. Le rayon est estimé à partir de la masse, et seules les planètes de masse connue ont un ESI.
+""")
+with span('load'):
+    ranking = habitability_ranking()
+n_candidates = st.slider("Nombre de planètes affichées :", min_value=5, max_value=100, value=20, step=5)
+method_choice = st.selectbox("Méthode de découverte :", options=[ALL_METHODS] + list(ranking.methods))
+with span('filter'):
+    best = ranking.top(n_candidates, method=None if method_choice == ALL_METHODS else method_choice,
+                       goldilock_only=True)
+    # Cluster vide pour les planètes sans toutes les caractéristiques de clustering
+    candidates = data.iloc[best].assign(Cluster=pd.array(clusters[best], dtype='Int8'))
+    candidates = candidates.assign(Cluster=candidates['Cluster'].where(candidates['Cluster'] >= 0))
+with span('render'):
+    st.dataframe(candidates[['Planet Name', 'Planet Host', 'ESI', 'Discovery Method', 'Mass', 'Orbital Period Days',
+                             'Orbit Semi-Major Axis', 'Insolation Flux', 'Equilibrium Temperature',
+                             'Stellar Effective Temperature', 'Stellar Radius', 'Stellar Mass', 'Cluster']],
+                 hide_index=True)
 
 # Visualisation des planètes dans la Goldilock Zone avec Plotly
 st.write("""
 ### Distribution des Planètes dans la Goldilock Zone selon les Clusters
 Ce graphique montre la répartition des planètes situées dans la Goldilock Zone en fonction de leur axe semi-majeur et de leur température d'équilibre. Il permet d'identifier les clusters de planètes potentiellement habitables.
 """)
-fig_goldilocks = px.scatter(goldilocks_data, x='Orbit Semi-Major Axis', y='Equilibrium Temperature', color='Cluster',
-                            title='Planètes dans la Goldilock Zone',
-                            labels={'Orbit Semi-Major Axis': 'Orbit Semi-Major Axis',
-                                    'Equilibrium Temperature': 'Equilibrium Temperature'})
-st.plotly_chart(fig_goldilocks)
+with span('figure'):
+    x_range, y_range = selection_ranges(st.session_state.get('goldilocks_chart'))
+    fig_goldilocks = goldilocks_figure(x_range, y_range)
+with span('render'):
+    st.plotly_chart(fig_goldilocks, key='goldilocks_chart', on_select='rerun', selection_mode='box')
 
 # CLASSIFICATION
 st.header("Modèle de classification pour les Exoplanètes")
 
-features = ['Orbit Semi-Major Axis', 'Stellar Effective Temperature', 'Stellar Radius']
-target = 'In Goldilock Zone'
-
-# Sélection des données pertinentes
-data = data[features + [target]].dropna()
-
-# Séparation des données en ensemble d'entraînement et ensemble de test
-X = data[features]
-y = data[target]
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-# Initialisation et entraînement du modèle de régression logistique
-model = LogisticRegression()
-model.fit(X_train, y_train)
-
-# Prédictions sur l'ensemble de test
-y_pred = model.predict(X_test)
-
-# Évaluation du modèle
+# Évaluation du modèle (régression logistique entraînée hors ligne, évaluée sur 20 % des données)
 st.subheader("Performance du modèle de classification:")
 
 # Affichage du rapport de classification
 st.write("Le rapport de classification fournit des détails sur la précision, le rappel et le F1-score pour chaque classe.")
-st.text(classification_report(y_test, y_pred))
+st.text(models['classification_report'])
 
 # Affichage de la matrice de confusion
 st.write("La matrice de confusion montre les prédictions correctes et incorrectes faites par le modèle.")
-st.write(pd.DataFrame(confusion_matrix(y_test, y_pred),
+st.write(pd.DataFrame(models['confusion_matrix'],
                      columns=['Prédit négatif', 'Prédit positif'],
                      index=['Vrai négatif', 'Vrai positif']))
 
 # Visualisation des coefficients de régression
-coefficients = pd.DataFrame({
-    'Feature': features,
-    'Coefficient': model.coef_[0]
-})
+coefficients = models['coefficients']
 st.subheader("Coefficients du modèle de classification:")
 
 # Affichage des coefficients de régression avec une explication
@@ -167,7 +148,9 @@ st.write(coefficients)
 
 # Visualisation interactive des coefficients de régression avec Plotly
 st.write("Graphique interactif montrant l'importance relative de chaque feature.")
-fig_classification_report = px.bar(x=coefficients['Feature'], y=coefficients['Coefficient'],
-                                   labels={'x': 'Feature', 'y': 'Coefficient'},
-                                   title="Coefficients de régression")
-st.plotly_chart(fig_classification_report)
+with span('figure'):
+    fig_classification_report = coefficients_figure()
+with span('render'):
+    st.plotly_chart(fig_classification_report)
+
+finish_rerun()
@@ -0,0 +1,123 @@
+"""Synchronisation avec l'archive TAP, contre l'archive locale de remplacement (`archive.make_server`)."""
+import asyncio
+import datetime
+import io
+import random
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from outer_planets.archive import _CONDITION, ARCHIVE_COLUMNS, UPDATED, ArchiveClient, make_server, merge_delta
+
+SINCE = datetime.date(2021, 1, 1)
+UNTIL = datetime.date(2021, 3, 1)
+PAGE_SIZE = 7
+
+
+def archive_rows(names, updated):
+    """Lignes aux colonnes de `pscomppars` pour les planètes `names`, mises à jour aux dates `updated`."""
+    rows = pd.DataFrame({column: np.nan for column in ARCHIVE_COLUMNS}, index=range(len(names)))
+    rows['pl_name'] = names
+    rows['hostname'] = [name.rsplit(' ', 1)[0] for name in names]
+    rows['pl_orbper'] = np.arange(1, len(names) + 1, dtype=np.float64)
+    rows[UPDATED] = updated
+    return rows
+
+
+@pytest.fixture
+def stand_in():
+    """Archive locale de 80 planètes, dont 20 mises à jour le même jour, démarrée sur un port libre."""
+    rng = np.random.default_rng(0)
+    days = [str(SINCE + datetime.timedelta(days=int(day))) for day in rng.integers(1, 59, size=60)]
+    days += ['2021-02-10'] * 20
+    names = [f'Star-{i // 3} {"bcd"[i % 3]}' for i in range(len(days))]
+
+    def start(fail_rate=0.0):
+        server = make_server(archive_rows(names, days), port=0, fail_rate=fail_rate)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server, f'http://localhost:{server.server_address[1]}/TAP/sync'
+
+    servers = []
+    yield start, set(names)
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def fetch(endpoint, **kwargs):
+    client = ArchiveClient(endpoint, concurrency=4, page_size=PAGE_SIZE, backoff=0, **kwargs)
+    return client, asyncio.run(client.fetch_delta(SINCE, UNTIL))
+
+
+def test_fetch_delta_splits_windows_and_pages(stand_in):
+    start, names = stand_in
+    server, endpoint = start()
+    client, delta = fetch(endpoint)
+
+    assert set(delta['pl_name']) == names
+    assert not delta['pl_name'].duplicated().any()
+    # 4 fenêtres initiales de 80 planètes en pages de 7 : elles ont dû être coupées en fenêtres plus courtes
+    windows = {tuple(value for column, _, value in _CONDITION.findall(query) if column == UPDATED)
+               for query in server.queries}
+    assert len(windows) > 4
+    # Les 20 planètes du 2021-02-10 ne tiennent que dans une fenêtre d'un jour, lue par pages
+    assert any('pl_name >' in query for query in server.queries)
+
+
+def test_fetch_delta_retries_failed_requests(stand_in):
+    random.seed(0)
+    start, names = stand_in
+    server, endpoint = start(fail_rate=0.5)
+    client, delta = fetch(endpoint, retries=20)
+
+    assert server.failures > 0
+    assert client.requests == len(server.queries) + server.failures
+    assert set(delta['pl_name']) == names
+
+
+def test_fetch_delta_keeps_latest_update(monkeypatch):
+    async def query(self, adql):
+        # Deux fenêtres renvoient la même planète : seule la mise à jour la plus récente est gardée
+        return archive_rows(['Star-0 b', 'Star-0 b'], ['2021-01-05', '2021-02-05'])
+
+    monkeypatch.setattr(ArchiveClient, 'query', query)
+    _, delta = fetch('http://localhost/TAP/sync')
+    assert delta[['pl_name', UPDATED]].values.tolist() == [['Star-0 b', '2021-02-05']]
+
+
+def test_merge_delta_updates_in_place_and_appends_new(tmp_path):
+    catalog = tmp_path / 'catalog.csv'
+    local = archive_rows(['Star-0 b', 'Star-0 c', 'Star-1 b'], ['2020-12-01'] * 3).rename(columns=ARCHIVE_COLUMNS)
+    local.insert(0, 'No.', [1, 2, 5])
+    local[['No.'] + list(ARCHIVE_COLUMNS.values())].to_csv(catalog, index=False)
+    before = catalog.read_text().splitlines(keepends=True)
+
+    delta = archive_rows(['Star-0 c', 'Star-2 b', 'Star-2 c'], ['2021-01-10'] * 3)
+    delta['pl_orbper'] = [20.0, 30.0, 40.0]
+    content, added, updated = merge_delta(catalog, delta)
+    lines = content.splitlines(keepends=True)
+    merged = pd.read_csv(io.StringIO(content))
+
+    assert (added, updated) == (2, 1)
+    assert not merged['No.'].duplicated().any()
+    assert merged['No.'].tolist() == [1, 2, 5, 6, 7]
+    assert merged['Planet Name'].tolist() == ['Star-0 b', 'Star-0 c', 'Star-1 b', 'Star-2 b', 'Star-2 c']
+    assert merged.loc[1, 'Orbital Period Days'] == 20.0
+    # Les lignes des planètes inchangées restent identiques, octet pour octet
+    assert lines[:2] + lines[3:4] == before[:2] + before[3:4]
+
+
+def test_merge_delta_is_idempotent(tmp_path):
+    catalog = tmp_path / 'catalog.csv'
+    delta = archive_rows(['Star-0 b'], ['2021-01-10'])
+    local = delta.rename(columns=ARCHIVE_COLUMNS)
+    local.insert(0, 'No.', [1])
+    local[['No.'] + list(ARCHIVE_COLUMNS.values())].to_csv(catalog, index=False)
+
+    content, added, updated = merge_delta(catalog, delta)
+    assert (added, updated) == (0, 1)
+    assert content == catalog.read_text()
+
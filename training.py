@@ -1,73 +1,199 @@
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import pickle
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from sklearn.model_selection import train_test_split
+import matplotlib
+from sklearn.model_selection import StratifiedKFold, cross_val_score, train_test_split
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import classification_report, confusion_matrix
 
-# Load the data
-data = pd.read_csv('data/all_exoplanets_2021.csv')
-print("Initial number of rows:", data.shape[0])
-
-# Define the columns to check for missing values
-columns_to_check = [
-    'Planet Name', 'Planet Host', 'Orbital Period Days',
-    'Orbit Semi-Major Axis', 'Stellar Effective Temperature',
-    'Equilibrium Temperature', 'Insolation Flux'
-]
-
-# Drop rows with missing values in the specified columns
-df_cleaned = data.dropna(subset=columns_to_check)
-print("Number of rows after removing specified columns with NAs:", df_cleaned.shape[0])
-
-
-# Define the Goldilock zone boundaries based on stellar effective temperature
-def calculate_goldilock_boundaries(stellar_temp):
-    inner_boundary = 0.95 * np.sqrt(stellar_temp / 5780)  # Adjusted boundaries for more accuracy
-    outer_boundary = 1.37 * np.sqrt(stellar_temp / 5780)  # Adjusted boundaries for more accuracy
-    return inner_boundary, outer_boundary
-
-
-# Create a function to determine if a planet is in the Goldilock zone
-def is_in_goldilock_zone(row):
-    inner_boundary, outer_boundary = calculate_goldilock_boundaries(row['Stellar Effective Temperature'])
-    return 1 if inner_boundary <= row['Orbit Semi-Major Axis'] <= outer_boundary else 0
-
-
-# Apply the function to create a new column 'Is In Goldilock'
-df_cleaned['Is In Goldilock'] = df_cleaned.apply(is_in_goldilock_zone, axis=1)
-
-# Print the first few rows to verify the new column
-print(df_cleaned[['Planet Name', 'Planet Host', 'Orbit Semi-Major Axis', 'Stellar Effective Temperature',
-                  'Is In Goldilock']].head())
-
-# Select features and target variable
-features = ['Orbit Semi-Major Axis', 'Stellar Effective Temperature', 'Insolation Flux']
-X = df_cleaned[features]
-y = df_cleaned['Is In Goldilock']
-
-# Split the data into training and testing sets
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=42)
-
-# Train a Random Forest classifier
-clf = RandomForestClassifier(n_estimators=100, random_state=42)
-clf.fit(X_train, y_train)
-
-# Make predictions
-y_pred = clf.predict(X_test)
-
-# Evaluate the model
-print("Confusion Matrix:")
-print(confusion_matrix(y_test, y_pred))
-print("\nClassification Report:")
-print(classification_report(y_test, y_pred))
-
-# Plot feature importances
-importances = clf.feature_importances_
-indices = np.argsort(importances)[::-1]
-plt.figure()
-plt.title("Feature Importances")
-plt.bar(range(X.shape[1]), importances[indices], color="r", align="center")
-plt.xticks(range(X.shape[1]), [features[i] for i in indices], rotation=90)
-plt.xlim([-1, X.shape[1]])
-plt.show()
+matplotlib.use('Agg')  # Headless: figures are written to files, never shown in a window
+import matplotlib.pyplot as plt  # noqa: E402
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'src'))
+from outer_planets.data import DATA_DIR, EXOPLANETS_CSV, resolve_source  # noqa: E402
+from outer_planets.habitable_zone import in_habitable_zone  # noqa: E402
+from outer_planets.quality import INCOMPLETE_TRAINING, TRAINING_COLUMNS, valid_rows  # noqa: E402
+from outer_planets.streaming import iter_chunks  # noqa: E402
+
+DEFAULT_OUTPUT_DIR = DATA_DIR / 'training'
+
+# Search space: every subset of at least 3 candidate features, crossed with the hyperparameter grid
+CANDIDATE_FEATURES = ['Orbit Semi-Major Axis', 'Stellar Effective Temperature', 'Insolation Flux',
+                      'Orbital Period Days', 'Equilibrium Temperature']
+PARAM_GRID = {
+    'n_estimators': [100, 300],
+    'max_depth': [None, 8],
+    'min_samples_leaf': [1, 5],
+}
+CV_FOLDS = 5
+SCORING = 'balanced_accuracy'
+
+
+def load_training_data():
+    # Stream the data chunk by chunk (from data/columnar/ when `python -m outer_planets.columnar` has been run),
+    # keeping only the columns used here and dropping rows flagged with missing training columns by the shared
+    # quality checks (outer_planets.quality), so the whole catalog never has to fit in memory
+    initial_rows = 0
+    cleaned_chunks = []
+    for chunk in iter_chunks(resolve_source(EXOPLANETS_CSV), columns=TRAINING_COLUMNS + ['Stellar Radius']):
+        initial_rows += len(chunk)
+        cleaned_chunks.append(chunk[valid_rows(chunk, INCOMPLETE_TRAINING)])
+    df_cleaned = pd.concat(cleaned_chunks, ignore_index=True)
+    print("Initial number of rows:", initial_rows)
+    print("Number of rows after removing specified columns with NAs:", df_cleaned.shape[0])
+
+    # Flag planets in the Goldilock zone (boundaries scaled by sqrt(Teff / 5780), computed column-wise)
+    df_cleaned['Is In Goldilock'] = in_habitable_zone(df_cleaned, model='teff')
+
+    # Print the first few rows to verify the new column
+    print(df_cleaned[['Planet Name', 'Planet Host', 'Orbit Semi-Major Axis', 'Stellar Effective Temperature',
+                      'Is In Goldilock']].head())
+    return df_cleaned
+
+
+def search_space():
+    subsets = [list(subset) for size in range(3, len(CANDIDATE_FEATURES) + 1)
+               for subset in itertools.combinations(CANDIDATE_FEATURES, size)]
+    grid = [dict(zip(PARAM_GRID, values)) for values in itertools.product(*PARAM_GRID.values())]
+    return [{'features': features, 'params': params} for features in subsets for params in grid]
+
+
+def candidate_key(candidate):
+    return json.dumps(candidate, sort_keys=True)
+
+
+# Training data of a search worker, sent once per process by the pool initializer
+_worker_data = {}
+
+
+def _init_worker(X, y):
+    _worker_data['X'], _worker_data['y'] = X, y
+
+
+def evaluate_candidate(candidate):
+    # One core per candidate: the process pool already uses the whole machine
+    clf = RandomForestClassifier(random_state=42, n_jobs=1, **candidate['params'])
+    cv = StratifiedKFold(n_splits=CV_FOLDS, shuffle=True, random_state=42)
+    scores = cross_val_score(clf, _worker_data['X'][candidate['features']], _worker_data['y'],
+                             cv=cv, scoring=SCORING)
+    return dict(candidate, cv_score=float(scores.mean()), cv_std=float(scores.std()))
+
+
+def load_checkpoint(checkpoint_path):
+    """Results recorded in `checkpoint_path`, dropping a last record cut short by a killed process."""
+    if not checkpoint_path.exists():
+        return []
+    content = checkpoint_path.read_bytes()
+    # Each record is written with its newline: whatever follows the last newline was interrupted mid-write
+    *complete, partial = content.split(b'\n')
+    if partial.strip():
+        print(f"Dropping an interrupted record at the end of {checkpoint_path}")
+        with open(checkpoint_path, 'r+b') as f:
+            f.truncate(len(content) - len(partial))
+    return [json.loads(line) for line in complete if line.strip()]
+
+
+def run_search(X_train, y_train, checkpoint_path, jobs):
+    """Cross-validated search over the search space, resumed from `checkpoint_path` if it exists."""
+    results = load_checkpoint(checkpoint_path)
+    done = {candidate_key({'features': r['features'], 'params': r['params']}) for r in results}
+    pending = [candidate for candidate in search_space() if candidate_key(candidate) not in done]
+    print(f"Search: {len(done)} candidates already evaluated, {len(pending)} to go on {jobs} processes")
+
+    with open(checkpoint_path, 'a') as checkpoint, \
+            ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(X_train, y_train)) as pool:
+        futures = [pool.submit(evaluate_candidate, candidate) for candidate in pending]
+        for i, future in enumerate(as_completed(futures), start=1):
+            result = future.result()
+            # Each finished candidate is written right away, so an interrupted search resumes here
+            checkpoint.write(json.dumps(result) + '\n')
+            checkpoint.flush()
+            results.append(result)
+            if i % 10 == 0 or i == len(futures):
+                print(f"  {i}/{len(futures)} candidates evaluated")
+    return pd.DataFrame(results).sort_values('cv_score', ascending=False, ignore_index=True)
+
+
+def plot_feature_importances(importances, features, path):
+    indices = np.argsort(importances)[::-1]
+    plt.figure()
+    plt.title("Feature Importances")
+    plt.bar(range(len(features)), importances[indices], color="r", align="center")
+    plt.xticks(range(len(features)), [features[i] for i in indices], rotation=90)
+    plt.xlim([-1, len(features)])
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless training of the Goldilock zone classifier.")
+    parser.add_argument('--output-dir', type=Path, default=DEFAULT_OUTPUT_DIR)
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help="number of search processes")
+    parser.add_argument('--restart', action='store_true', help="ignore the checkpoint of a previous search")
+    args = parser.parse_args(argv)
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+
+    df_cleaned = load_training_data()
+    X = df_cleaned[CANDIDATE_FEATURES]
+    y = df_cleaned['Is In Goldilock']
+
+    # Split the data into training and testing sets
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=42)
+
+    # The checkpoint is tied to the training data and the search space, so a catalog refresh starts a new search
+    fingerprint = hashlib.sha256(pd.util.hash_pandas_object(X_train.assign(target=y_train)).to_numpy().tobytes()
+                                 + json.dumps([CANDIDATE_FEATURES, PARAM_GRID, CV_FOLDS, SCORING]).encode())
+    checkpoint_path = args.output_dir / f'search_{fingerprint.hexdigest()[:16]}.jsonl'
+    if args.restart:
+        checkpoint_path.unlink(missing_ok=True)
+    search_results = run_search(X_train, y_train, checkpoint_path, args.jobs)
+    search_results.to_csv(args.output_dir / 'search_results.csv', index=False)
+    best = search_results.iloc[0]
+    features = list(best['features'])
+    print(f"Best candidate: {features} {best['params']} ({SCORING} {best['cv_score']:.3f} ± {best['cv_std']:.3f})")
+
+    # Train the best Random Forest classifier on all cores
+    clf = RandomForestClassifier(random_state=42, n_jobs=-1, **best['params'])
+    clf.fit(X_train[features], y_train)
+
+    # Make predictions
+    y_pred = clf.predict(X_test[features])
+
+    # Evaluate the model
+    print("Confusion Matrix:")
+    print(confusion_matrix(y_test, y_pred))
+    print("\nClassification Report:")
+    print(classification_report(y_test, y_pred, zero_division=0))
+
+    # Write metrics, feature importances and the model to files
+    metrics = {
+        'features': features,
+        'params': best['params'],
+        'cv_score': best['cv_score'],
+        'cv_std': best['cv_std'],
+        'scoring': SCORING,
+        'confusion_matrix': confusion_matrix(y_test, y_pred, labels=[0, 1]).tolist(),
+        'classification_report': classification_report(y_test, y_pred, output_dict=True, zero_division=0),
+    }
+    (args.output_dir / 'metrics.json').write_text(json.dumps(metrics, indent=2))
+    pd.DataFrame({'Feature': features, 'Importance': clf.feature_importances_}) \
+        .sort_values('Importance', ascending=False) \
+        .to_csv(args.output_dir / 'feature_importances.csv', index=False)
+    plot_feature_importances(clf.feature_importances_, features, args.output_dir / 'feature_importances.png')
+    with open(args.output_dir / 'model.pkl', 'wb') as f:
+        pickle.dump({'model': clf, 'features': features, 'target': 'Is In Goldilock'}, f)
+    print(f"Metrics, feature importances and model written to {args.output_dir}")
+
+
+if __name__ == '__main__':
+    main()